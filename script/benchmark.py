@@ -0,0 +1,231 @@
+import argparse
+import glob
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import numpy as np
+# 添加根目录到 sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.car import Car
+from src.core.fuzzy import FuzzyDriver
+from src.core.ga_fuzzy import random_individual, repair_membership_functions, generate_offspring, \
+    generate_offspring_matrix
+from src.core.trainer import STRUCTURE, FIXED_INDICES, BOUNDS, build_cars, build_population
+from src.core.track_geometry import TrackGeometry
+from src.util.track_file_util import load_track_data, load_track_start
+
+# 基线只对测量它的机器有意义，由 --save-baseline 在本地生成，不纳入版本管理
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+TRACK_DIR = "src/config/track_info"
+
+
+def measure(func, min_time=0.2, repeat=3):
+    """
+    重复调用 func 直到总时间不少于 min_time，取 repeat 轮中最快的一轮
+    :param func: Callable[[], int] 被测函数，返回本次完成的工作量（如步数、调用次数）
+
+    :return: float 每秒完成的工作量
+    """
+    best = 0.0
+    for _ in range(repeat):
+        work, start = 0, time.perf_counter()
+        while True:
+            work += func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, work / elapsed)
+    return best
+
+
+def random_individuals(n):
+    """生成 n 个修复后、能够生成查找表的随机个体"""
+    individuals = []
+    while len(individuals) < n:
+        individual = repair_membership_functions(random_individual(), STRUCTURE, FIXED_INDICES)
+        try:
+            FuzzyDriver(individual)
+        except ValueError:
+            continue
+        individuals.append(individual)
+    return individuals
+
+
+def bench_driver(results, args):
+    """FuzzyDriver 的构建与推理"""
+    individuals = itertools.cycle(random_individuals(100))
+
+    def build():
+        FuzzyDriver(next(individuals))
+        return 1
+    results["fuzzy_driver_init"] = {"rate": measure(build, args.min_time), "unit": "builds/s"}
+
+    driver = FuzzyDriver(random_individuals(1)[0])
+    inputs = np.random.uniform([0, 0, 0, 0], [2, 500, 300, 300], (1000, 4)).tolist()
+
+    def predict():
+        for speed, front, left, right in inputs:
+            driver.predict(speed, front, left, right)
+        return len(inputs)
+    results["fuzzy_driver_predict"] = {"rate": measure(predict, args.min_time), "unit": "calls/s"}
+
+
+def bench_car(results, args):
+    """Car 中逐线段计算的传感器与出界检测"""
+    track_outer, track_inner, _ = load_track_data(os.path.join(TRACK_DIR, "train.json"))
+    car = Car(pos=[200, 750])
+    positions = np.random.uniform([150, 100], [900, 780], (200, 2)).tolist()
+    angles = np.random.uniform(0, 360, 200).tolist()
+
+    def sense():
+        for pos, angle in zip(positions, angles):
+            car.find_nearest_obstacle(pos, angle, track_outer)
+        return len(positions)
+    results["car_find_nearest_obstacle"] = {"rate": measure(sense, args.min_time), "unit": "calls/s"}
+
+    def crossed():
+        for (x, y), angle in zip(positions, angles):
+            rad = np.radians(angle)
+            car.has_crossed_polygon((x, y), (x + np.cos(rad) * 2, y - np.sin(rad) * 2), track_inner)
+        return len(positions)
+    results["car_has_crossed_polygon"] = {"rate": measure(crossed, args.min_time), "unit": "calls/s"}
+
+
+def bench_ga(results, args):
+    """遗传算子：逐个体与种群矩阵两种实现"""
+    parents = random_individuals(10)
+
+    def offspring():
+        generate_offspring(parents, args.offspring, STRUCTURE, BOUNDS, FIXED_INDICES, 0.8, 0.2, 0.1)
+        return args.offspring
+    results["generate_offspring"] = {"rate": measure(offspring, args.min_time), "unit": "offspring/s"}
+
+    rng = np.random.default_rng(0)
+
+    def offspring_matrix():
+        generate_offspring_matrix(parents, args.offspring, STRUCTURE, BOUNDS, FIXED_INDICES, 0.8, 0.2, 0.1, rng)
+        return args.offspring
+    results["generate_offspring_matrix"] = {"rate": measure(offspring_matrix, args.min_time), "unit": "offspring/s"}
+
+
+def bench_generations(results, args):
+    """每条赛道上 N 辆车 M 步的完整一代仿真，统计存活车辆的仿真步数"""
+    individuals = random_individuals(args.cars)
+    for track_file in sorted(glob.glob(os.path.join(TRACK_DIR, "*.json"))):
+        name = os.path.splitext(os.path.basename(track_file))[0]
+        geometry = TrackGeometry.from_file(track_file)
+        pos, angle = load_track_start(track_file, [200, 750], 0)
+
+        def car_generation():
+            cars = build_cars(individuals, pos, angle)
+            steps = 0
+            for _ in range(args.steps):
+                alive = sum(1 for car in cars if car.update_info_fuzzy(geometry, geometry.check_line))
+                if not alive:
+                    break
+                steps += alive
+            return steps
+
+        def population_generation():
+            _, population = build_population(individuals, geometry, pos, angle)
+            steps = 0
+            for _ in range(args.steps):
+                alive = len(population.step())
+                if not alive:
+                    break
+                steps += alive
+            return steps
+
+        results[f"generation_car[{name}]"] = {"rate": measure(car_generation, args.min_time), "unit": "steps/s"}
+        results[f"generation_population[{name}]"] = {"rate": measure(population_generation, args.min_time),
+                                                     "unit": "steps/s"}
+
+
+BENCHMARKS = {"driver": bench_driver, "car": bench_car, "ga": bench_ga, "generation": bench_generations}
+
+
+def compare(results, baseline, threshold):
+    """
+    与基线比较，速度下降超过 threshold 的项目记为退化
+    :return: List[str] 退化的项目
+    """
+    regressions = []
+    print(f"{'benchmark':40s} {'rate':>14s} {'baseline':>14s} {'change':>8s}")
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("rate")
+        change = result["rate"] / base - 1 if base else None
+        flag = ""
+        if change is not None and change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:40s} {result['rate']:14.1f} {base if base else float('nan'):14.1f} "
+              f"{'' if change is None else f'{change:+.1%}':>8s} {result['unit']}{flag}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="无界面性能测试：仿真与模糊控制的热点路径，并与基线比较")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="只运行指定的测试组")
+    parser.add_argument("--cars", type=int, default=50, help="整代仿真的车辆数量")
+    parser.add_argument("--steps", type=int, default=500, help="整代仿真的最大步数")
+    parser.add_argument("--offspring", type=int, default=1000, help="每次生成的子代数量")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每项测试每轮至少运行多少秒")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="基线 JSON 文件")
+    parser.add_argument("--threshold", type=float, default=0.3, help="速度低于基线多少比例记为退化")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="把本次结果写入基线文件；基线文件不存在时只输出结果，不进行比较")
+    parser.add_argument("--output", default=None, help="把本次结果写入 JSON 文件")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if not args.only or name in args.only:
+            # 每组单独设置随机种子，只运行部分测试组时输入与完整运行相同
+            random.seed(0)
+            np.random.seed(0)
+            bench(results, args)
+
+    report = {
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "numpy": np.__version__,
+                    "cpu_count": os.cpu_count()},
+        "settings": {"cars": args.cars, "steps": args.steps, "offspring": args.offspring},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    baseline = {}
+    if not os.path.exists(args.baseline):
+        print(f"基线文件 {args.baseline} 不存在，不进行比较；先用 --save-baseline 在本机生成基线")
+    else:
+        with open(args.baseline, "r") as f:
+            stored = json.load(f)
+        if stored.get("machine") != report["machine"]:
+            print(f"警告: 基线测量于 {stored.get('machine')}，与本机 {report['machine']} 不同，不进行比较")
+        elif stored.get("settings") != report["settings"]:
+            print(f"警告: 基线的测试参数 {stored.get('settings')} 与本次 {report['settings']} 不同，不进行比较")
+        else:
+            baseline = stored.get("results", {})
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        # 只运行部分测试组时保留基线中其余项目
+        report["results"] = {**baseline, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"基线已保存到 {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} 项性能退化超过 {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,5 +10,9 @@ track_inner = [(200, 200), (600, 200), (650, 250), (600, 350), (500, 400), (400,
                (300, 400), (200, 350), (150, 250), (200, 200)]
 check_line = []
 
-save_track_data("src/config/track_info/auto_2.json", track_outer, track_inner, check_line)
+# 车辆起点与初始朝向
+start_pos = [400, 475]
+start_angle = 0
+
+save_track_data("src/config/track_info/auto_2.json", track_outer, track_inner, check_line, start_pos, start_angle)
 print("Track data saved to src/config/track_info/auto_2.json")
@@ -20,5 +20,9 @@ track_inner = [
 ]
 check_line = [[(150, 600), (250, 600)]]
 
-save_track_data("src/config/track_info/player.json", track_outer, track_inner, check_line)
+# 车辆起点与初始朝向
+start_pos = [200, 750]
+start_angle = 0
+
+save_track_data("src/config/track_info/player.json", track_outer, track_inner, check_line, start_pos, start_angle)
 print("Track data saved to src/config/track_info/player.json")
@@ -22,5 +22,9 @@ check_line = [[(350, 745), (350, 780)], [(550, 630), (550, 680)], [(850, 550), (
               [(750, 350), (750, 425)], [(500, 100), (500, 150)], [(150, 150), (200, 150)], 
               [(250, 350), (250, 400)], [(150, 600), (250, 600)]]
 
-save_track_data("src/config/track_info/train.json", track_outer, track_inner, check_line)
+# 车辆起点与初始朝向
+start_pos = [200, 750]
+start_angle = 0
+
+save_track_data("src/config/track_info/train.json", track_outer, track_inner, check_line, start_pos, start_angle)
 print("Track data saved to src/config/track_info/train.json")
@@ -1,40 +1,49 @@
 import pygame
 import os
+import argparse
 import sys
+import numpy as np
 # 添加根目录到 sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.core.car import Car
 from src.core.ga_fuzzy import random_individual, repair_membership_functions
 from src.util.individual_file_util import read_individual
+from src.util.hall_of_fame_util import HallOfFame
 from src.util.track_file_util import load_track_data
+from src.core.track_geometry import TrackGeometry
+from src.core.table_cache import TableCache
 from src.ui.init_ui import init_ui_auto
 from src.ui.state_ui import state_ui_auto
+from src.ui.render_loop import RenderLoop
 
-# 初始化 Pygame
-pygame.init()
+# 命令行参数
+parser = argparse.ArgumentParser(description="自动驾驶演示模式")
+parser.add_argument("--elite-file", default="data/ga_train/elite_individual.txt", help="精英个体文件路径")
+parser.add_argument("--hall-of-fame", default=None,
+                    help="从该名人堂目录中选择这条赛道上最好的个体（没有时选择全部赛道中最好的个体），默认读取精英个体文件")
+parser.add_argument("--fitness", choices=["progress", "checkpoints"], default="progress",
+                    help="从名人堂中选择时比较哪种适应度计算方式训练出的个体")
+args = parser.parse_args()
 
 # 屏幕设置
 WIDTH, HEIGHT = 1000, 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Pygame Racing Game - Complex Track")
-
-# 颜色定义
-WHITE = (255, 255, 255)
-RED = (255, 0, 0)
-BLACK = (0, 0, 0)
-GREEN = (0, 255, 0)
-
-# 加载界面
-init_ui_auto(screen)
+FPS = 100  # 仿真与绘制的帧率
 
 # 加载赛道数据
 track_outer, track_inner, check_line = load_track_data("src/config/track_info/auto_2.json")
-track = [track_outer, track_inner]
+track = TrackGeometry(track_outer, track_inner, check_line)
+# 窗口、事件与绘制都在主线程中，仿真在仿真线程中只发布车辆位姿快照，不等待屏幕刷新
+viewer = RenderLoop(track_outer, track_inner, check_line, hud=state_ui_auto, size=(WIDTH, HEIGHT), fps=FPS)
 
-font = pygame.font.SysFont(None, 36)  # 默认字体，大小36
+# 加载界面
+viewer.show(init_ui_auto)
 
-# 读取之前的elite    
-elite = read_individual("data/ga_train/elite_individual.txt")
+# 读取之前的elite；指定名人堂时优先选择名人堂中这条赛道上最好的个体，其次是历史最好的个体
+best = None
+if args.hall_of_fame:
+    hall_of_fame = HallOfFame(args.hall_of_fame)
+    best = hall_of_fame.best("auto_2", args.fitness) or hall_of_fame.best(kind=args.fitness)
+elite = [best] if best else read_individual(args.elite_file)
              
 # 车辆参数
 structure = [5, 5, 5]
@@ -42,41 +51,36 @@ fixed_indices = [0, 1, 13, 14, 15, 16, 28, 29, 30, 31, 43, 44]
 lower_bounds = [0] * 60
 upper_bounds = [2] * 15 + [500] * 15 + [300] * 30
 bounds = (lower_bounds, upper_bounds)
-if elite:
-    car = Car(individual=elite[0], pos=[400, 475], angle=0, max_speed=2)
-else:
-    individual = random_individual()
-    # 修复模糊隶属函数参数
-    individual = repair_membership_functions(individual, structure, fixed_indices)
-    car = Car(individual=individual, pos=[400, 475], angle=0, max_speed=2)
 
-running = True
-# 遗传算法开始
-while running:
-    screen.fill(WHITE)
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
-    car_points = car.update_info_fuzzy(track, check_line)
-    if car_points:
-        # 绘制车辆
-        pygame.draw.polygon(screen, RED, car_points)
+def drive():
+    """仿真线程：生成车辆并按 FPS 仿真，车辆出界或窗口关闭后返回"""
+    if elite:
+        # 查找表缓存：之前运行过的 elite 不再重新生成查找表
+        car = Car(individual=elite[0], pos=[400, 475], angle=0, max_speed=2, table_cache=TableCache())
     else:
-        running = False
-        print("Car out of track!")
-    
-    # 绘制赛道
-    pygame.draw.polygon(screen, BLACK, track_outer, 3)
-    pygame.draw.polygon(screen, BLACK, track_inner, 3)
+        individual = random_individual()
+        # 修复模糊隶属函数参数
+        individual = repair_membership_functions(individual, structure, fixed_indices)
+        car = Car(individual=individual, pos=[400, 475], angle=0, max_speed=2)
+
+    running = True
+    clock = pygame.time.Clock()
+    while running:
+        # 主线程收到的窗口事件，不会阻塞
+        for command, _ in viewer.poll():
+            if command == "quit":
+                running = False
     
-    # 绘制检查线
-    for line in check_line:
-        pygame.draw.line(screen, GREEN, line[0], line[1], 2)
-        
-    # 在右上角打印现在小车的速度、前面障碍物的距离、左右障碍物的距离
-    state_ui_auto(screen, car.speed, car.front_dist, car.left_dist, car.right_dist)
-    pygame.time.delay(10)
+        car_points = car.update_info_fuzzy(track, check_line)
+        if not car_points:
+            running = False
+            print("Car out of track!")
         
-pygame.quit()
\ No newline at end of file
+        # 发布车辆位姿，并在右上角打印现在小车的速度、前面障碍物的距离、左右障碍物的距离
+        viewer.publish(np.array([(car.pos[0], car.pos[1], car.angle)]), np.array([car_points is not None]),
+                       car.speed, car.front_dist, car.left_dist, car.right_dist)
+        clock.tick(FPS)
+
+
+viewer.run(drive)
@@ -1,19 +1,24 @@
 import math
 import logging
-import pygame
 from src.core.fuzzy import FuzzyDriver
+from src.core.track_geometry import TrackGeometry
+from src.util.profile_util import PROFILER
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class Car:
-    def __init__(self, individual=None, pos=[0, 0], angle=0, max_speed=2):
+    def __init__(self, individual=None, pos=[0, 0], angle=0, max_speed=2, driver=None, table_cache=None,
+                 stall_steps=None):
         """
         车辆个体，适用于遗传算法优化路径跟踪
         :param individual: List[float] 模糊控制参数（遗传算法中的基因）
         :param pos: List[float] 车的初始位置坐标
         :param angle: float 车的朝向角度（0° 指向右）
         :param max_speed: float 最大速度
+        :param driver: FuzzyDriver 已经生成好的模糊控制器，设置后不再由 individual 生成
+        :param table_cache: TableCache 查找表磁盘缓存，可选
+        :param stall_steps: int 连续多少步没有通过新的检查线就判定为停滞并淘汰，None 表示不检测
         :param speed: float 速度
         :param front_dist: float 前方障碍物距离
         :param left_dist: float 左侧障碍物距离
@@ -21,8 +26,10 @@ class Car:
         :param max_speed: float 最大速度
         """
         self.individual = individual  # 模糊控制参数
-        if individual:
-            self.driver = FuzzyDriver(individual)
+        if driver is not None:
+            self.driver = driver
+        elif individual:
+            self.driver = FuzzyDriver(individual, table_cache=table_cache)
         self.fitness = 0  # 适应度，初始为 0
         self.pos = list(pos)  # 位置坐标
         self.last_pos = list(pos)  # 上一时刻位置坐标
@@ -34,36 +41,66 @@ class Car:
         self.right_dist = 0 # 右侧障碍物距离
         self.alive = True  # 是否存活
         self.valid_checkpoints = 0  # 有效检查点编号
+        self.stall_steps = stall_steps  # 停滞判定的步数
+        self.steps_since_checkpoint = 0  # 距离上次通过检查线的步数
+        self.steps = 0  # 已仿真的步数
+        self.progress = 0.0  # 沿赛道中心线前进的距离（跨圈累计，后退为负）
+        self.arc_pos = None  # 上一步在中心线上的弧长位置
 
     def update_info_fuzzy(self, track, check_line):
         """
         通过模糊控制更新车辆位置
-        :param track: List[Tuple[float, float]] 赛道坐标
+        :param track: TrackGeometry 或 List[List[Tuple[float, float]]] 赛道坐标
         :param check_line: List[Tuple[Tuple[float, float], Tuple[float, float]]] 检查线坐标
         """
         if not self.alive:
             return None
+        # 分阶段计时，关闭时只有这一次属性读取
+        timed = PROFILER.enabled
+        if timed:
+            PROFILER.mark()
         
-        track_outer, track_inner = track
-        outer_distances = self.find_nearest_obstacle(self.pos, self.angle, track_outer)
-        inner_distances = self.find_nearest_obstacle(self.pos, self.angle, track_inner)
-        # 取更小的那一组距离
-        self.front_dist = min(outer_distances[0], inner_distances[0])
-        self.left_dist = min(outer_distances[1], inner_distances[1])
-        self.right_dist = min(outer_distances[2], inner_distances[2])
+        if isinstance(track, TrackGeometry):
+            # 预编译的赛道几何数据，向量化求交
+            self.front_dist, self.left_dist, self.right_dist = track.sensor_distances(self.pos, self.angle)
+        else:
+            track_outer, track_inner = track
+            outer_distances = self.find_nearest_obstacle(self.pos, self.angle, track_outer)
+            inner_distances = self.find_nearest_obstacle(self.pos, self.angle, track_inner)
+            # 取更小的那一组距离
+            self.front_dist = min(outer_distances[0], inner_distances[0])
+            self.left_dist = min(outer_distances[1], inner_distances[1])
+            self.right_dist = min(outer_distances[2], inner_distances[2])
+        if timed:
+            PROFILER.lap("sensing")
         
         # 出界检测
-        if self.has_crossed_polygon(self.last_pos, self.pos, track_outer) or self.has_crossed_polygon(self.last_pos, self.pos, track_inner):
+        if self.has_crossed_track(self.last_pos, self.pos, track):
             self.alive = False
             
         # 检测是否到检查线
+        fitness = self.fitness
         self.update_fitness(check_line)
         
+        # 停滞检测：长时间没有通过新的检查线（绕圈、原地打转、爬行）的车辆提前淘汰
+        self.steps_since_checkpoint = 0 if self.fitness != fitness else self.steps_since_checkpoint + 1
+        if self.stall_steps and check_line and self.steps_since_checkpoint >= self.stall_steps:
+            self.alive = False
+        
+        # 沿赛道中心线的连续进度
+        self.steps += 1
+        if isinstance(track, TrackGeometry) and track.centerline is not None:
+            self.update_progress(track.centerline)
+        
         # 记录上一时刻的位置
         self.last_pos = self.pos.copy()
+        if timed:
+            PROFILER.lap("collision")
         
         # 模糊控制
         acceleration, rotation = self.driver.predict(self.speed, self.front_dist, self.left_dist, self.right_dist)
+        if timed:
+            PROFILER.lap("inference")
         
         # 判断是否搁浅
         if self.speed ==0 and acceleration <= 0 and rotation == 0:
@@ -87,19 +124,22 @@ class Car:
         (self.pos[0] + math.cos(rad + 2.5) * 10, self.pos[1] - math.sin(rad + 2.5) * 10),
         (self.pos[0] + math.cos(rad - 2.5) * 10, self.pos[1] - math.sin(rad - 2.5) * 10)
         ]
+        if timed:
+            PROFILER.lap("physics")
         
         return car_points
         
     def update_info_player(self, keys, track, check_line):
         """
         通过玩家操作更新车辆位置
-        :param track: List[Tuple[float, float]] 赛道坐标
+        :param track: TrackGeometry 或 List[List[Tuple[float, float]]] 赛道坐标
         :param check_line: List[Tuple[Tuple[float, float], Tuple[float, float]]] 检查线坐标
         """
         if not self.alive:
             return None
         
-        track_outer, track_inner = track
+        # 延迟导入 pygame，保证无界面训练时不依赖 pygame
+        import pygame
         
         # 获取玩家操作
         left = keys[pygame.K_LEFT]
@@ -107,12 +147,23 @@ class Car:
         accelerate = keys[pygame.K_SPACE]
         
         # 出界检测
-        if self.has_crossed_polygon(self.last_pos, self.pos, track_outer) or self.has_crossed_polygon(self.last_pos, self.pos, track_inner):
+        if self.has_crossed_track(self.last_pos, self.pos, track):
             self.alive = False
             
         # 检测是否到检查线
+        fitness = self.fitness
         self.update_fitness(check_line)
         
+        # 停滞检测：长时间没有通过新的检查线（绕圈、原地打转、爬行）的车辆提前淘汰
+        self.steps_since_checkpoint = 0 if self.fitness != fitness else self.steps_since_checkpoint + 1
+        if self.stall_steps and check_line and self.steps_since_checkpoint >= self.stall_steps:
+            self.alive = False
+        
+        # 沿赛道中心线的连续进度
+        self.steps += 1
+        if isinstance(track, TrackGeometry) and track.centerline is not None:
+            self.update_progress(track.centerline)
+        
         # 记录上一时刻的位置
         self.last_pos = self.pos.copy()
         
@@ -216,6 +267,19 @@ class Car:
                 return True
         return False
 
+    def has_crossed_track(self, last_pos, car_pos, track):
+        """
+        判断车辆从 last_pos 移动到 car_pos 时是否穿过赛道内外边界。
+        
+        :param track: TrackGeometry 或 List[List[(x, y)]] 赛道坐标 [track_outer, track_inner]
+        :return: bool 是否出界
+        """
+        if isinstance(track, TrackGeometry):
+            return track.crossed_boundary(last_pos, car_pos)
+        track_outer, track_inner = track
+        return (self.has_crossed_polygon(last_pos, car_pos, track_outer)
+                or self.has_crossed_polygon(last_pos, car_pos, track_inner))
+
 
     def update_fitness(self, check_line):
         """ 更新某辆车的适应度 """
@@ -223,4 +287,22 @@ class Car:
             A, B = check_line[self.valid_checkpoints]
             if self.has_crossed_line(A, B, self.last_pos, self.pos):
                 self.valid_checkpoints = (self.valid_checkpoints + 1) % len(check_line)
-                self.fitness += 1
\ No newline at end of file
+                self.fitness += 1
+
+    def update_progress(self, centerline):
+        """ 由当前位置在中心线上的弧长更新连续进度 """
+        arc_pos = centerline.arc_position(self.pos)
+        if self.arc_pos is not None:
+            self.progress += float(centerline.wrap(arc_pos - self.arc_pos))
+        self.arc_pos = arc_pos
+
+    def score(self, time_weight=0):
+        """
+        用于选择的适应度：赛道预计算了中心线时为沿赛道的连续进度，否则为通过的检查线数
+        :param time_weight: float 到达最近一条检查线所用步数的惩罚权重，0 表示不考虑用时；
+                            应明显小于最大速度，保证多通过一条检查线总能提高适应度
+        :return: float
+        """
+        if self.arc_pos is None:
+            return self.fitness
+        return self.progress - time_weight * (self.steps - self.steps_since_checkpoint)
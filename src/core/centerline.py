@@ -0,0 +1,141 @@
+import numpy as np
+
+
+def resample_polygon(points, spacing):
+    """
+    沿闭合多边形按弧长等间距重新采样
+    :param points: np.ndarray (n, 2) 多边形顶点
+    :param spacing: float 采样间距
+
+    :return: np.ndarray (m, 2) 采样点
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    ends = np.roll(points, -1, axis=0)
+    lengths = np.hypot(*(ends - points).T)
+    cumulative = np.concatenate([[0], np.cumsum(lengths)])
+    n = max(3, int(round(cumulative[-1] / spacing)))
+    targets = np.linspace(0, cumulative[-1], n, endpoint=False)
+    seg = np.clip(np.searchsorted(cumulative, targets, side="right") - 1, 0, len(points) - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(lengths[seg] > 0, (targets - cumulative[seg]) / lengths[seg], 0)
+    return points[seg] + t[:, None] * (ends[seg] - points[seg])
+
+
+def closest_on_segments(points, seg_start, seg_end):
+    """
+    点到一组线段的最近点
+    :param points: np.ndarray (n, 2) 查询点
+    :param seg_start: np.ndarray (E, 2) 线段起点
+    :param seg_end: np.ndarray (E, 2) 线段终点
+
+    :return: (np.ndarray (n,) 最近线段编号, np.ndarray (n,) 在该线段上的参数 t, np.ndarray (n,) 距离)
+    """
+    d = seg_end - seg_start
+    length2 = np.maximum((d ** 2).sum(axis=-1), 1e-12)
+    rel = points[:, None, :] - seg_start  # (n, E, 2)
+    t = np.clip((rel * d).sum(axis=-1) / length2, 0, 1)
+    dist = np.hypot(rel[..., 0] - t * d[:, 0], rel[..., 1] - t * d[:, 1])
+    k = dist.argmin(axis=1)
+    r = np.arange(len(points))
+    return k, t[r, k], dist[r, k]
+
+
+class Centerline:
+    def __init__(self, track_outer, track_inner, check_line=(), spacing=10, resolution=5, smooth=5, start_pos=None,
+                 start_angle=0):
+        """
+        赛道中心线：取外边界等间距采样点与内边界最近点的中点，平滑后按弧长重新采样。
+        保存累计弧长索引，并在均匀网格上预计算每个位置最近的中心线线段，
+        使任意位置到“沿赛道走了多远”的换算只需查表和三次投影
+        :param track_outer: List[Tuple[float, float]] 赛道外边界顶点
+        :param track_inner: List[Tuple[float, float]] 赛道内边界顶点
+        :param check_line: List[Tuple[Tuple[float, float], Tuple[float, float]]] 检查线坐标，
+                           用前两条检查线确定前进方向；不足两条时用车辆起点的朝向，都没有时沿外边界顶点顺序
+        :param spacing: float 中心线采样间距（像素）
+        :param resolution: float 最近线段网格的间距（像素）
+        :param smooth: int 滑动平均的窗口大小，1 表示不平滑
+        :param start_pos: List[float] 车辆起点，可选
+        :param start_angle: float 车辆初始朝向
+        """
+        outer = resample_polygon(track_outer, spacing)
+        inner = np.asarray(track_inner, dtype=float).reshape(-1, 2)
+        inner_end = np.roll(inner, -1, axis=0)
+        k, t, _ = closest_on_segments(outer, inner, inner_end)
+        nearest = inner[k] + t[:, None] * (inner_end[k] - inner[k])
+        points = (outer + nearest) / 2
+
+        # 循环滑动平均，消除内弯处多个外边界点对应同一个内边界顶点造成的折返
+        if smooth > 1:
+            kernel = np.ones(smooth) / smooth
+            pad = smooth // 2
+            wrapped = np.concatenate([points[-pad:], points, points[:pad]]) if pad else points
+            points = np.stack([np.convolve(wrapped[:, i], kernel, mode="valid") for i in range(2)], axis=-1)
+        self._set_points(resample_polygon(points, spacing))
+
+        # 最近线段网格
+        bounds = np.concatenate([np.asarray(track_outer, dtype=float).reshape(-1, 2), inner])
+        self.origin = np.floor(bounds.min(axis=0)) - 2 * resolution
+        self.resolution = float(resolution)
+        nx, ny = (np.ceil((bounds.max(axis=0) + 2 * resolution - self.origin) / resolution).astype(int) + 1)
+        self.grid = np.empty((ny, nx), dtype=np.int32)
+        xs = self.origin[0] + np.arange(nx) * resolution
+        for y in range(ny):
+            cells = np.stack([xs, np.full(nx, self.origin[1] + y * resolution)], axis=-1)
+            self.grid[y] = closest_on_segments(cells, self.points, self.seg_end)[0]
+
+        # 前进方向：第一条检查线到第二条检查线的弧长应为正，或者从起点沿初始朝向前进时弧长增加
+        lines = np.asarray(check_line, dtype=float).reshape(-1, 2, 2)
+        if len(lines) >= 2:
+            s0, s1 = self.project(lines[:2].mean(axis=1))
+        elif start_pos is not None:
+            rad = np.radians(start_angle)
+            ahead = (start_pos[0] + np.cos(rad) * spacing, start_pos[1] - np.sin(rad) * spacing)
+            s0, s1 = self.project([start_pos, ahead])
+        else:
+            s0, s1 = 0, 1
+        if self.wrap(s1 - s0) < 0:
+            m = len(self.points)
+            self._set_points(self.points[::-1].copy())
+            # 线段 k 反向后变为线段 m - 2 - k
+            self.grid = ((m - 2 - self.grid) % m).astype(np.int32)
+
+    def _set_points(self, points):
+        """设置中心线顶点并计算线段与累计弧长"""
+        self.points = np.ascontiguousarray(points)
+        self.seg_end = np.roll(self.points, -1, axis=0)
+        self.seg_dir = self.seg_end - self.points
+        self.seg_length = np.hypot(*self.seg_dir.T)
+        self.cumulative = np.concatenate([[0], np.cumsum(self.seg_length)])  # 每个顶点处的累计弧长
+        self.length = float(self.cumulative[-1])  # 一圈的长度
+
+    def wrap(self, delta):
+        """将弧长差折算到 [-length/2, length/2)，跨过起点时也能得到正确的前进距离"""
+        return (delta + self.length / 2) % self.length - self.length / 2
+
+    def project(self, positions):
+        """
+        将位置投影到中心线上
+        :param positions: np.ndarray (n, 2) 位置坐标
+
+        :return: np.ndarray (n,) 对应的弧长，范围 [0, length]，投影到最后一段的终点时为 length
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        ny, nx = self.grid.shape
+        ix = np.clip(np.round((positions[:, 0] - self.origin[0]) / self.resolution), 0, nx - 1).astype(np.intp)
+        iy = np.clip(np.round((positions[:, 1] - self.origin[1]) / self.resolution), 0, ny - 1).astype(np.intp)
+        m = len(self.points)
+        # 网格只精确到格点，再在最近线段及其前后相邻线段上精确投影
+        candidates = (self.grid[iy, ix][:, None] + np.array([-1, 0, 1])) % m  # (n, 3)
+        rel = positions[:, None, :] - self.points[candidates]
+        d = self.seg_dir[candidates]
+        length2 = np.maximum(self.seg_length[candidates] ** 2, 1e-12)
+        t = np.clip((rel * d).sum(axis=-1) / length2, 0, 1)
+        dist = np.hypot(rel[..., 0] - t * d[..., 0], rel[..., 1] - t * d[..., 1])
+        best = dist.argmin(axis=1)
+        r = np.arange(len(positions))
+        k = candidates[r, best]
+        return self.cumulative[k] + t[r, best] * self.seg_length[k]
+
+    def arc_position(self, pos):
+        """单个位置的弧长"""
+        return float(self.project([pos])[0])
@@ -1,14 +1,91 @@
 import numpy as np
 import skfuzzy as fuzz
 import skfuzzy.control as ctrl
+from src.core.fuzzy_inference import (ACCEL_OPTIONS, ROTATION_OPTIONS, OUTPUT_PARAMS, build_accel_table,
+                                      build_rotation_table, encode, grid_points, lookup)
 
 class FuzzyDriver:
     def __init__(self, individual, 
                  speed_step=0.2, 
                  front_step=20, 
                  left_step=20, 
-                 right_step=20):
-        # 原有模糊系统初始化代码
+                 right_step=20,
+                 engine="native",
+                 table_cache=None,
+                 lazy=False,
+                 interpolate=False):
+        """
+        模糊控制驾驶员，只保存加速度与转向查找表（离散选项的 int8 编号）和网格步长
+        :param individual: List[float] 模糊控制参数（遗传算法中的基因）
+        :param engine: str 查找表的生成方式，native 为向量化的 Mamdani 推理，
+                       skfuzzy 为逐格调用 skfuzzy（会保留 skfuzzy 控制系统，仅用于对照验证）
+        :param table_cache: TableCache 查找表磁盘缓存，已缓存的个体不再重新生成（仅 native）
+        :param lazy: bool 是否推迟到第一次查表时才生成查找表，个体不合法时的异常也随之推迟
+        :param interpolate: bool 查表时是否双线性插值，默认取最近的网格点；插值时可以使用更粗的网格
+        """
+        self.individual = individual
+        # 查表参数
+        self.speed_step = speed_step
+        self.front_step = front_step
+        self.left_step = left_step
+        self.right_step = right_step
+        self.engine = engine
+        self.table_cache = table_cache
+        self.interpolate = interpolate
+
+        self._accel_codes = None
+        self._rotation_codes = None
+        if not lazy:
+            self.build()
+
+    @classmethod
+    def from_tables(cls, accel_table, rotation_table, speed_step=0.2, front_step=20, left_step=20, right_step=20,
+                    individual=None, interpolate=False):
+        """
+        由已经生成好的查找表构建驾驶员，如 fuzzy_inference.build_tables 批量生成的表
+        :param accel_table: np.ndarray (speed, front) 加速度查找表
+        :param rotation_table: np.ndarray (left, right) 转向查找表
+        :param individual: List[float] 生成查找表的个体，可选，用于 reference_check
+        """
+        driver = cls(individual, speed_step, front_step, left_step, right_step, lazy=True, interpolate=interpolate)
+        driver._accel_codes = encode(accel_table, ACCEL_OPTIONS)
+        driver._rotation_codes = encode(rotation_table, ROTATION_OPTIONS)
+        return driver
+
+    def build(self):
+        """生成查找表，已生成时直接返回"""
+        if self._accel_codes is not None:
+            return
+        if self.engine == "skfuzzy":
+            accel_table, rotation_table = self._build_skfuzzy(self.individual)
+        else:
+            accel_table, rotation_table = self._build_native(self.individual)
+        self._accel_codes = encode(accel_table, ACCEL_OPTIONS)
+        self._rotation_codes = encode(rotation_table, ROTATION_OPTIONS)
+
+    def _build_native(self, individual):
+        """直接由隶属函数参数计算整张表，不构建 skfuzzy 控制系统"""
+        table_steps = (self.speed_step, self.front_step, self.left_step, self.right_step)
+        table_cache = self.table_cache
+        cached = table_cache.get(individual, table_steps) if table_cache is not None else None
+        if cached is not None:
+            if cached[0] is None:
+                raise ValueError("查找表缓存中记录该个体无法生成查找表")
+            return cached
+
+        try:
+            accel_table, _, _ = build_accel_table(individual, self.speed_step, self.front_step)
+            rotation_table, _, _ = build_rotation_table(individual, self.left_step, self.right_step)
+        except ValueError:
+            if table_cache is not None:
+                table_cache.put(individual, table_steps)
+            raise
+        if table_cache is not None:
+            table_cache.put(individual, table_steps, accel_table, rotation_table)
+        return accel_table, rotation_table
+
+    def _build_skfuzzy(self, individual):
+        """原有的 skfuzzy 模糊系统，逐个网格点推理生成查找表"""
         self.speed = ctrl.Antecedent(np.arange(0, 2, 0.01), 'speed')
         self.front_dist = ctrl.Antecedent(np.arange(0, 500, 0.1), 'front_dist')
         self.left_dist = ctrl.Antecedent(np.arange(0, 300, 0.1), 'left_dist')
@@ -23,9 +100,7 @@ class FuzzyDriver:
         self.acceleration.automf(names=['DB', 'DS', 'Z', 'AS', 'AB'])
         self.rotation.automf(names=['RB', 'RS', 'Z', 'LS', 'LB'])
 
-        individual = individual + individual[-15:] + [-2, -2, -1.5, -1.7, -1, -0.2, -0.4, 0, 0.1, 0.05, 
-                                                      0.1, 0.15, 0.12, 0.2, 0.2, -4, -4, -2, -4, -2, 
-                                                      0, -2, 0, 2, 0, 2, 4, 2, 4, 4]
+        individual = list(individual) + list(individual[-15:]) + OUTPUT_PARAMS
         self.apply_individual_to_fuzzy(individual)
 
         self.acceleration_ctrl = ctrl.ControlSystem(self.define_acceleration_rules())
@@ -35,15 +110,50 @@ class FuzzyDriver:
         self._accel_sim = ctrl.ControlSystemSimulation(self.acceleration_ctrl)
         self._rotate_sim = ctrl.ControlSystemSimulation(self.rotation_ctrl)
 
-        # 查表参数
-        self.speed_step = speed_step
-        self.front_step = front_step
-        self.left_step = left_step
-        self.right_step = right_step
-
         # 预生成查找表
-        self.accel_table, self.speed_points, self.front_points = self._build_accel_table()
-        self.rotation_table, self.left_points, self.right_points = self._build_rotation_table()
+        accel_table, _, _ = self._build_accel_table()
+        rotation_table, _, _ = self._build_rotation_table()
+        return accel_table, rotation_table
+
+    def reference_check(self):
+        """
+        用 skfuzzy 重新生成查找表，检查与当前查找表是否一致（每个驾驶员约需 10 秒，仅用于验证）
+        :return: bool
+        """
+        if self.individual is None:
+            raise ValueError("没有个体参数，无法生成 skfuzzy 对照查找表")
+        reference = FuzzyDriver(self.individual, self.speed_step, self.front_step, self.left_step,
+                                self.right_step, engine="skfuzzy")
+        return (np.array_equal(reference.accel_table, self.accel_table) and
+                np.array_equal(reference.rotation_table, self.rotation_table))
+
+    @property
+    def accel_table(self):
+        """加速度查找表 (speed, front)"""
+        self.build()
+        return ACCEL_OPTIONS[self._accel_codes]
+
+    @property
+    def rotation_table(self):
+        """转向查找表 (left, right)"""
+        self.build()
+        return ROTATION_OPTIONS[self._rotation_codes]
+
+    @property
+    def speed_points(self):
+        return grid_points(2, self.speed_step)
+
+    @property
+    def front_points(self):
+        return grid_points(500, self.front_step)
+
+    @property
+    def left_points(self):
+        return grid_points(300, self.left_step)
+
+    @property
+    def right_points(self):
+        return grid_points(300, self.right_step)
 
     def apply_individual_to_fuzzy(self, individual):
         param_index = 0
@@ -152,19 +262,40 @@ class FuzzyDriver:
 
     def predict(self, speed, front_dist, left_dist, right_dist):
         """使用查找表快速预测"""
-        # 计算加速度索引
-        speed_idx = self._find_nearest_index(speed, self.speed_points)
-        front_idx = self._find_nearest_index(front_dist, self.front_points)
-        
-        # 计算转向索引
-        left_idx = self._find_nearest_index(left_dist, self.left_points)
-        right_idx = self._find_nearest_index(right_dist, self.right_points)
+        self.build()
+        if self.interpolate:
+            acceleration, rotation = self.predict_batch(speed, front_dist, left_dist, right_dist)
+            return float(acceleration), float(rotation)
+
+        # 计算最近点的索引，标量直接用 Python 运算（round 与 np.round 一样四舍六入五成双）
+        n_speed, n_front = self._accel_codes.shape
+        n_left, n_right = self._rotation_codes.shape
+        speed_idx = min(max(round(speed / self.speed_step), 0), n_speed - 1)
+        front_idx = min(max(round(front_dist / self.front_step), 0), n_front - 1)
+        left_idx = min(max(round(left_dist / self.left_step), 0), n_left - 1)
+        right_idx = min(max(round(right_dist / self.right_step), 0), n_right - 1)
         
         return (
-            self.accel_table[speed_idx, front_idx],
-            self.rotation_table[left_idx, right_idx]
+            ACCEL_OPTIONS[self._accel_codes[speed_idx, front_idx]],
+            ROTATION_OPTIONS[self._rotation_codes[left_idx, right_idx]]
         )
 
-    def _find_nearest_index(self, value, points):
-        """找到最近点的索引"""
-        return np.clip(int(np.round(value / (points[1]-points[0]))), 0, len(points)-1)
+    def predict_batch(self, speed, front_dist, left_dist, right_dist, interpolate=None):
+        """
+        批量查表，输入为数组
+        :param speed: np.ndarray 速度
+        :param front_dist: np.ndarray 前方障碍物距离
+        :param left_dist: np.ndarray 左侧障碍物距离
+        :param right_dist: np.ndarray 右侧障碍物距离
+        :param interpolate: bool 是否双线性插值，默认使用 self.interpolate
+
+        :return: (np.ndarray 加速度, np.ndarray 转向)
+        """
+        self.build()
+        if interpolate is None:
+            interpolate = self.interpolate
+        acceleration = lookup(self._accel_codes, ACCEL_OPTIONS, speed, front_dist,
+                              self.speed_step, self.front_step, interpolate)
+        rotation = lookup(self._rotation_codes, ROTATION_OPTIONS, left_dist, right_dist,
+                          self.left_step, self.right_step, interpolate)
+        return acceleration, rotation
@@ -0,0 +1,377 @@
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+
+# 输入变量的论域，与 FuzzyDriver 中 ctrl.Antecedent 的论域相同
+SPEED_UNIVERSE = np.arange(0, 2, 0.01)
+FRONT_UNIVERSE = np.arange(0, 500, 0.1)
+SIDE_UNIVERSE = np.arange(0, 300, 0.1)
+
+# 个体的基因数：速度、前方距离、左右距离各 5 个模糊集 × 3 个参数
+GENE_NUM = 45
+
+# 输出变量的论域与离散化选项
+ACCEL_OPTIONS = np.array([-2, -1, 0, 0.1, 0.2])
+ROTATION_OPTIONS = np.array([-4, -2, 0, 2, 4], dtype=float)
+
+# 输出模糊集的三角隶属函数参数（固定，不参与遗传算法）
+OUTPUT_PARAMS = [-2, -2, -1.5, -1.7, -1, -0.2, -0.4, 0, 0.1, 0.05,
+                 0.1, 0.15, 0.12, 0.2, 0.2, -4, -4, -2, -4, -2,
+                 0, -2, 0, 2, 0, 2, 4, 2, 4, 4]
+
+# 规则表：行为第一个输入的模糊集 (NB, NS, Z, PS, PB)，列为第二个输入的模糊集，值为输出模糊集编号
+# 加速度输出 (DB, DS, Z, AS, AB)，与 FuzzyDriver.define_acceleration_rules 一致
+ACCEL_RULES = np.array([
+    [0, 3, 4, 4, 4],
+    [0, 2, 3, 4, 4],
+    [0, 2, 2, 3, 4],
+    [0, 2, 2, 3, 4],
+    [0, 1, 2, 2, 2],
+])
+# 转向输出 (RB, RS, Z, LS, LB)，与 FuzzyDriver.define_rotation_rules 一致
+ROTATION_RULES = np.array([
+    [2, 1, 0, 0, 0],
+    [3, 2, 1, 0, 0],
+    [4, 3, 2, 1, 0],
+    [4, 4, 3, 2, 1],
+    [4, 4, 4, 3, 2],
+])
+
+# 没有任何规则被激活时的错误信息，与 skfuzzy 相同
+EMPTY_OUTPUT_MESSAGE = "Crisp output cannot be calculated, likely because the system is too sparse."
+
+
+def trimf(x, abc):
+    """
+    三角隶属函数，计算方式与 skfuzzy.trimf 相同，abc 可以带有批量维度
+    :param x: np.ndarray 自变量
+    :param abc: np.ndarray (..., 3) 三角形参数 a <= b <= c，与 x 广播
+
+    :return: np.ndarray 隶属度
+    """
+    a, b, c = abc[..., 0], abc[..., 1], abc[..., 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        left = (x - a) / (b - a)
+        right = (c - x) / (c - b)
+    y = np.where((a != b) & (a < x) & (x < b), left, 0.0)
+    y = np.where((b != c) & (b < x) & (x < c), right, y)
+    return np.where(x == b, 1.0, y)
+
+
+def valid_params(params):
+    """
+    判断每组三角隶属函数参数是否满足 a <= b <= c
+    :param params: np.ndarray (..., 3) 三角形参数
+
+    :return: np.ndarray (...) bool
+    """
+    params = np.asarray(params, dtype=float)
+    return (params[..., 0] <= params[..., 1]) & (params[..., 1] <= params[..., 2])
+
+
+def check_params(params):
+    """检查三角隶属函数参数满足 a <= b <= c，与 skfuzzy.trimf 的断言一致"""
+    if not np.all(valid_params(params)):
+        raise ValueError("abc requires the three elements a <= b <= c.")
+
+
+def input_memberships(params, universe, values):
+    """
+    计算输入值对各模糊集的隶属度。skfuzzy 先在论域上采样隶属函数再线性插值，
+    这里只在输入值两侧的论域点上计算三角函数，再按 np.interp 的公式插值，结果与 skfuzzy 一致
+    :param params: np.ndarray (..., 5, 3) 五个模糊集的三角形参数
+    :param universe: np.ndarray 论域
+    :param values: np.ndarray (M,) 输入值
+
+    :return: np.ndarray (..., M, 5)
+    """
+    # skfuzzy 会把超出论域的输入截断到论域边界
+    values = np.clip(values, universe[0], universe[-1])
+    j = np.minimum(np.searchsorted(universe, values, side="right") - 1, len(universe) - 2)
+    x0, x1 = universe[j], universe[j + 1]
+
+    abc = params[..., None, :, :]  # (..., 1, 5, 3)
+    y0 = trimf(x0[:, None], abc)
+    y1 = trimf(x1[:, None], abc)
+    slope = (y1 - y0) / (x1 - x0)[:, None]
+    values = values[:, None]
+    mu = np.where(values == x0[:, None], y0, slope * (values - x0[:, None]) + y0)
+    return np.where(values == universe[-1], y1, mu)
+
+
+def _upsampled_universe(universe, term_mfs, cuts):
+    """
+    与 skfuzzy 的 find_memberships 相同：在输出论域中加入每个模糊集隶属度等于截断值的点
+    :param universe: np.ndarray (P,) 输出论域
+    :param term_mfs: np.ndarray (T, P) 输出模糊集在论域上的隶属度
+    :param cuts: np.ndarray (..., T) 每个输出模糊集的截断值
+
+    :return: np.ndarray (..., P + T * (P - 1)) 排序后的点，重复点不影响重心计算
+    """
+    mf0, mf1 = term_mfs[:, :-1], term_mfs[:, 1:]  # (T, P-1)
+    x0, x1 = universe[:-1], universe[1:]
+    y = cuts[..., None]  # (..., T, 1)
+    crossing = np.where(y == 0.0, (mf0 > y) != (mf1 > y), (mf0 >= y) != (mf1 >= y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        points = x0 + (y - mf0) * (x1 - x0) / (mf1 - mf0)
+    points = np.where(crossing, points, universe[0])
+    points = points.reshape(*cuts.shape[:-1], cuts.shape[-1] * (len(universe) - 1))
+    base = np.broadcast_to(universe, (*cuts.shape[:-1], len(universe)))
+    return np.sort(np.concatenate([base, points], axis=-1), axis=-1)
+
+
+def _centroid(x, mfx):
+    """
+    与 skfuzzy.defuzzify.centroid 相同的分段重心计算，沿最后一维逐段累加以保证数值一致
+    :param x: np.ndarray (..., P) 排序后的点
+    :param mfx: np.ndarray (..., P) 隶属度
+
+    :return: np.ndarray (...)
+    """
+    x1, x2 = x[..., :-1], x[..., 1:]
+    y1, y2 = mfx[..., :-1], mfx[..., 1:]
+    # 跳过高度为 0 或宽度为 0 的段
+    valid = ~(((y1 == y2) & (y1 == 0.0)) | (x1 == x2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        general = (2.0 / 3.0 * (x2 - x1) * (y2 + 0.5 * y1)) / (y1 + y2) + x1
+    cases = [y1 == y2, (y1 == 0.0) & (y2 != 0.0), (y2 == 0.0) & (y1 != 0.0)]
+    moment = np.select(cases, [0.5 * (x1 + x2), 2.0 / 3.0 * (x2 - x1) + x1, 1.0 / 3.0 * (x2 - x1) + x1], general)
+    area = np.select(cases, [(x2 - x1) * y1, 0.5 * (x2 - x1) * y2, 0.5 * (x2 - x1) * y1],
+                     0.5 * (x2 - x1) * (y1 + y2))
+    area = np.where(valid, area, 0.0)
+    # cumsum 按顺序逐项相加，与 skfuzzy 的循环累加结果一致（np.sum 为两两求和，末位可能不同）
+    sum_moment_area = np.cumsum(np.where(valid, moment * area, 0.0), axis=-1)[..., -1]
+    sum_area = np.cumsum(area, axis=-1)[..., -1]
+    return sum_moment_area / np.fmax(sum_area, np.finfo(float).eps)
+
+
+def mamdani(mu_a, mu_b, rules, out_universe, out_params):
+    """
+    Mamdani 推理：min 求规则激活度，max 聚合同一输出模糊集，截断后取最大并用重心法解模糊
+    :param mu_a: np.ndarray (..., A, 5) 第一个输入在各网格点的隶属度
+    :param mu_b: np.ndarray (..., B, 5) 第二个输入在各网格点的隶属度
+    :param rules: np.ndarray (5, 5) 规则表
+    :param out_universe: np.ndarray (P,) 输出论域
+    :param out_params: np.ndarray (5, 3) 输出模糊集的三角形参数
+
+    :return: (np.ndarray (..., A, B) 解模糊后的连续输出, np.ndarray (..., A, B) 没有任何规则被激活的网格点)
+    """
+    firing = np.fmin(mu_a[..., :, None, :, None], mu_b[..., None, :, None, :])  # (..., A, B, 5, 5)
+    cuts = np.stack([firing[..., rules == t].max(axis=-1) for t in range(len(out_params))], axis=-1)
+
+    term_mfs = trimf(out_universe, np.asarray(out_params, dtype=float)[:, None, :])  # (T, P)
+    x = _upsampled_universe(out_universe, term_mfs, cuts)  # (..., A, B, Q)
+    output_mf = np.zeros(x.shape)
+    for t in range(len(term_mfs)):
+        upsampled = np.interp(x, out_universe, term_mfs[t])
+        output_mf = np.maximum(output_mf, np.minimum(cuts[..., t, None], upsampled))
+    return _centroid(x, output_mf), output_mf.sum(axis=-1) == 0
+
+
+def discretize(values, options):
+    """将连续输出离散化为最近的选项，等距时取较小的选项，与 FuzzyDriver._discretize_* 一致"""
+    return options[np.argmin(np.abs(values[..., None] - options), axis=-1)]
+
+
+def encode(table, options):
+    """将离散化后的查找表编码为选项编号（int8），options[编号] 即可还原"""
+    return np.searchsorted(options, table).astype(np.int8)
+
+
+def lookup(codes, options, a, b, step_a, step_b, interpolate=False, rows=()):
+    """
+    批量查表。默认取最近的网格点（与 FuzzyDriver.predict 相同），interpolate 为 True 时双线性插值
+    :param codes: np.ndarray (..., A, B) 查找表的选项编号
+    :param options: np.ndarray 离散选项，options[编号] 为查找表的值
+    :param a: np.ndarray 第一个输入（如速度）
+    :param b: np.ndarray 第二个输入（如前方距离）
+    :param step_a: float 第一个输入的步长
+    :param step_b: float 第二个输入的步长
+    :param rows: Tuple[np.ndarray] codes 前面几维的索引，如群体中每辆车的编号
+
+    :return: np.ndarray 查表结果，形状与 a、b 广播后相同
+    """
+    n_a, n_b = codes.shape[-2:]
+    a = np.asarray(a, dtype=float) / step_a
+    b = np.asarray(b, dtype=float) / step_b
+    if not interpolate:
+        i = np.clip(np.round(a), 0, n_a - 1).astype(np.intp)
+        j = np.clip(np.round(b), 0, n_b - 1).astype(np.intp)
+        return options[codes[(*rows, i, j)]]
+
+    # 双线性插值，超出网格的输入取边界值
+    a = np.clip(a, 0, n_a - 1)
+    b = np.clip(b, 0, n_b - 1)
+    i = np.minimum(np.floor(a).astype(np.intp), max(n_a - 2, 0))
+    j = np.minimum(np.floor(b).astype(np.intp), max(n_b - 2, 0))
+    wa = a - i
+    wb = b - j
+    i1 = np.minimum(i + 1, n_a - 1)
+    j1 = np.minimum(j + 1, n_b - 1)
+    return ((1 - wa) * (1 - wb) * options[codes[(*rows, i, j)]] + (1 - wa) * wb * options[codes[(*rows, i, j1)]] +
+            wa * (1 - wb) * options[codes[(*rows, i1, j)]] + wa * wb * options[codes[(*rows, i1, j1)]])
+
+
+@lru_cache(maxsize=None)
+def grid_points(upper, step):
+    """
+    查找表某一维度的采样点 0, step, ..., upper，同一组参数共享同一个只读数组
+    :param upper: float 论域上限
+    :param step: float 步长
+    """
+    points = np.arange(0, upper + 1e-9, step)
+    points.setflags(write=False)
+    return points
+
+
+def build_accel_tables(individuals, speed_step=0.2, front_step=20):
+    """
+    批量生成加速度查找表
+    :param individuals: np.ndarray (N, 基因数) 个体矩阵（前 30 个基因为速度与前方距离的隶属函数参数）
+
+    :return: (tables (N, speed, front), valid (N,), speed_points, front_points)，
+             valid 为 False 的个体参数不合法或无法解模糊，对应的表无意义
+    """
+    params = np.asarray(individuals, dtype=float)[:, :30].reshape(-1, 2, 5, 3)
+    speed_points = grid_points(2, speed_step)
+    front_points = grid_points(500, front_step)
+    mu_speed = input_memberships(params[:, 0], SPEED_UNIVERSE, speed_points)
+    mu_front = input_memberships(params[:, 1], FRONT_UNIVERSE, front_points)
+    out_params = np.asarray(OUTPUT_PARAMS[:15], dtype=float).reshape(5, 3)
+    output, empty = mamdani(mu_speed, mu_front, ACCEL_RULES, ACCEL_OPTIONS, out_params)
+    valid = valid_params(params).all(axis=(1, 2)) & ~empty.any(axis=(1, 2))
+    return discretize(output, ACCEL_OPTIONS), valid, speed_points, front_points
+
+
+def build_rotation_tables(individuals, left_step=20, right_step=20):
+    """
+    批量生成转向查找表，右侧距离的隶属函数与左侧相同（个体的后 15 个基因）
+    :param individuals: np.ndarray (N, 基因数) 个体矩阵
+
+    :return: (tables (N, left, right), valid (N,), left_points, right_points)
+    """
+    params = np.asarray(individuals, dtype=float)[:, -15:].reshape(-1, 5, 3)
+    left_points = grid_points(300, left_step)
+    right_points = grid_points(300, right_step)
+    mu_left = input_memberships(params, SIDE_UNIVERSE, left_points)
+    mu_right = mu_left if right_step == left_step else input_memberships(params, SIDE_UNIVERSE, right_points)
+    out_params = np.asarray(OUTPUT_PARAMS[15:], dtype=float).reshape(5, 3)
+    output, empty = mamdani(mu_left, mu_right, ROTATION_RULES, ROTATION_OPTIONS, out_params)
+    valid = valid_params(params).all(axis=1) & ~empty.any(axis=(1, 2))
+    return discretize(output, ROTATION_OPTIONS), valid, left_points, right_points
+
+
+class LRUCache:
+    def __init__(self, max_entries=2048):
+        """
+        容量有限的内存缓存，超过容量时淘汰最久未使用的条目
+        :param max_entries: int 最多保存的条目数
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """读取条目，未命中返回 None"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """写入条目"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+def _build_unique(genes, steps, build, cache=None, chunk_size=256):
+    """
+    对基因片段相同的个体只生成一次子表，设置了缓存时先查缓存
+    :param genes: np.ndarray (N, G) 子表依赖的基因片段
+    :param steps: Tuple[float, float] 子表两个维度的步长
+    :param build: Callable build_accel_tables 或 build_rotation_tables
+    :param cache: LRUCache 子表缓存，键为 (基因片段, 步长)
+
+    :return: (tables (N, ...), valid (N,))
+    """
+    if len(genes) == 0:
+        tables, valid, _, _ = build(genes, *steps)
+        return tables, valid
+
+    results = [None] * len(genes)
+    missing = {}  # 键 -> 使用该子表的个体编号
+    for i, row in enumerate(genes):
+        key = (row.tobytes(), *steps)
+        results[i] = cache.get(key) if cache is not None else None
+        if results[i] is None:
+            missing.setdefault(key, []).append(i)
+
+    keys = list(missing)
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start:start + chunk_size]
+        tables, valid, _, _ = build(genes[[missing[key][0] for key in chunk]], *steps)
+        for key, table, ok in zip(chunk, tables, valid):
+            if cache is not None:
+                cache.put(key, (table, ok))
+            for i in missing[key]:
+                results[i] = (table, ok)
+    return np.stack([table for table, _ in results]), np.array([ok for _, ok in results])
+
+
+def build_tables(individuals, speed_step=0.2, front_step=20, left_step=20, right_step=20, chunk_size=256,
+                 accel_cache=None, rotation_cache=None):
+    """
+    一次性为整代个体生成加速度与转向查找表，按块计算以限制中间数组的内存。
+    加速度表只依赖前 30 个基因，转向表只依赖后 15 个基因（右侧距离复用左侧的隶属函数），
+    两张子表分别按基因片段去重并缓存，交叉后保持不变的一半可以直接复用父代的子表
+    :param individuals: List[List[float]] 或 np.ndarray (N, 基因数) 个体矩阵
+    :param chunk_size: int 每块的个体数
+    :param accel_cache: LRUCache 加速度子表缓存，可选
+    :param rotation_cache: LRUCache 转向子表缓存，可选
+
+    :return: (accel_tables (N, speed, front), rotation_tables (N, left, right), valid (N,))，
+             valid 为 False 的个体与 FuzzyDriver 生成失败的情况一致
+    """
+    individuals = np.asarray(individuals, dtype=float)
+    if individuals.size == 0:
+        individuals = individuals.reshape(0, GENE_NUM)
+    accel_tables, accel_valid = _build_unique(individuals[:, :30], (speed_step, front_step),
+                                              build_accel_tables, accel_cache, chunk_size)
+    rotation_tables, rotation_valid = _build_unique(individuals[:, -15:], (left_step, right_step),
+                                                    build_rotation_tables, rotation_cache, chunk_size)
+    return accel_tables, rotation_tables, accel_valid & rotation_valid
+
+
+def build_accel_table(individual, speed_step=0.2, front_step=20):
+    """
+    生成加速度查找表，结果与 FuzzyDriver 使用 skfuzzy 生成的表一致
+    :param individual: List[float] 个体（前 30 个基因为速度与前方距离的隶属函数参数）
+
+    :return: (table, speed_points, front_points)
+    """
+    check_params(np.asarray(individual[:30], dtype=float).reshape(2, 5, 3))
+    tables, valid, speed_points, front_points = build_accel_tables([individual], speed_step, front_step)
+    if not valid[0]:
+        # 与 skfuzzy 一致：没有任何规则被激活时无法解模糊
+        raise ValueError(EMPTY_OUTPUT_MESSAGE)
+    return tables[0], speed_points, front_points
+
+
+def build_rotation_table(individual, left_step=20, right_step=20):
+    """
+    生成转向查找表，右侧距离的隶属函数与左侧相同（individual[-15:]）
+    :param individual: List[float] 个体（后 15 个基因为左右距离的隶属函数参数）
+
+    :return: (table, left_points, right_points)
+    """
+    check_params(np.asarray(individual[-15:], dtype=float).reshape(5, 3))
+    tables, valid, left_points, right_points = build_rotation_tables([individual], left_step, right_step)
+    if not valid[0]:
+        raise ValueError(EMPTY_OUTPUT_MESSAGE)
+    return tables[0], left_points, right_points
@@ -131,6 +131,102 @@ def generate_offspring(population, n_offspring, structure, bounds, fixed_indices
 
     return offspring
 
+def repair_membership_matrix(population, structure, fixed_indices):
+    """
+    repair_membership_functions 的向量化版本，一次修复整个种群，结果与逐个修复相同
+
+    参数：
+    - population: np.ndarray (N, 基因数) 种群矩阵
+    - structure: List[int]，每个变量的模糊集数量（如 [5, 5, 5]）
+    - fixed_indices: Set[int]，不允许修改的索引集合
+
+    返回：
+    - np.ndarray (N, 基因数) 修复后的种群矩阵（新数组）
+    """
+    repaired = np.array(population, dtype=float, copy=True)
+    index = 0
+    for num_sets in structure:
+        size = num_sets * 3
+        # 交换交界处参数的排列（自身即为逆排列）
+        perm = np.arange(size)
+        for i in range(2, size - 1, 3):
+            perm[i], perm[i + 1] = perm[i + 1], perm[i]
+        params = repaired[:, index:index + size][:, perm]
+
+        # 对非固定索引的值进行排序（与逐个修复相同，按交换后的位置判断是否固定）
+        sortable = [i for i in range(size) if index + i not in fixed_indices]
+        params[:, sortable] = np.sort(params[:, sortable], axis=1)
+
+        # 交换交界处回来，并保证每个模糊集 a <= b <= c
+        params = params[:, perm].reshape(-1, num_sets, 3)
+        repaired[:, index:index + size] = np.sort(params, axis=-1).reshape(-1, size)
+        index += size
+    return repaired
+
+
+def generate_offspring_matrix(population, n_offspring, structure, bounds, fixed_indices, crossover_rate=0.8,
+                              mutation_rate=0.1, mutation_scale=0.1, rng=None):
+    """
+    generate_offspring 的向量化版本：选择、两点交叉、有界变异与修复都在整个子代矩阵上完成
+
+    参数:
+    - population: np.ndarray 或 List[List[float]] (P, 基因数) 现有个体集
+    - n_offspring: int 需要生成的子代数量
+    - structure: List[int] 每个变量的模糊集数量
+    - bounds: Tuple[List[float], List[float]] 参数的最小值和最大值范围，长度可以多于基因数
+    - fixed_indices: Set[int] 不允许修改的索引集合
+    - rng: np.random.Generator 随机数生成器，默认新建一个
+
+    返回:
+    - np.ndarray (n_offspring, 基因数) 生成的子代
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    parents = np.asarray(population, dtype=float)
+    num_parents, num_genes = parents.shape
+    lower_bounds = np.asarray(bounds[0], dtype=float)[:num_genes]
+    upper_bounds = np.asarray(bounds[1], dtype=float)[:num_genes]
+    genes = np.arange(num_genes)
+
+    # 1. 随机选两个不同的父代
+    first = rng.integers(0, num_parents, n_offspring)
+    second = (first + rng.integers(1, num_parents, n_offspring)) % num_parents
+
+    # 2. 两点交叉：两个不同的交叉点，交叉段取第二个父代
+    point_a = rng.integers(0, num_genes, n_offspring)
+    point_b = (point_a + rng.integers(1, num_genes, n_offspring)) % num_genes
+    point1, point2 = np.minimum(point_a, point_b), np.maximum(point_a, point_b)
+    cross = ((rng.random(n_offspring) < crossover_rate)[:, None] &
+             (genes >= point1[:, None]) & (genes < point2[:, None]))
+    children = np.where(cross, parents[second], parents[first])
+
+    # 3. 有界变异，固定索引不变异
+    mutate = (rng.random((n_offspring, num_genes)) < mutation_rate) & ~np.isin(genes, list(fixed_indices))
+    mutation = rng.uniform(-mutation_scale, mutation_scale, (n_offspring, num_genes)) * (upper_bounds - lower_bounds)
+    children = np.where(mutate, np.clip(children + mutation, lower_bounds, upper_bounds), children)
+
+    # 4. 修复子代
+    return repair_membership_matrix(children, structure, fixed_indices)
+
+
+def matrix_to_individuals(population, fixed_indices):
+    """
+    把种群矩阵转换回个体列表，固定索引上的值（0、2、500、300 等边界）恢复为 int，
+    与 random_individual 生成的个体及 elite 文件中的格式一致
+
+    参数:
+    - population: np.ndarray (N, 基因数) 种群矩阵
+    - fixed_indices: Set[int] 不允许修改的索引集合
+
+    返回:
+    - List[List[float]] 个体列表
+    """
+    individuals = population.tolist()
+    for individual in individuals:
+        for i in fixed_indices:
+            individual[i] = int(individual[i])
+    return individuals
+
+
 if __name__ == '__main__':
     # 示例个体（8 个模糊集，每个有 3 个参数）
     individual = [
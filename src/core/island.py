@@ -0,0 +1,177 @@
+import queue
+import random
+import logging
+import multiprocessing
+import numpy as np
+from src.core.trainer import init_individuals, build_population, run_population_generation, select_elite, \
+    next_individuals
+from src.core.track_geometry import TrackGeometry
+from src.core.table_cache import TableCache
+
+# 迁移拓扑：ring 为单向环，bi_ring 为双向环，full 为全连接
+TOPOLOGIES = ["ring", "bi_ring", "full"]
+
+
+def migration_targets(topology, n_islands):
+    """
+    每个岛屿的迁出目标
+    :param topology: str 迁移拓扑，见 TOPOLOGIES
+    :param n_islands: int 岛屿数量
+
+    :return: List[List[int]] 第 i 项为岛屿 i 的精英迁往的岛屿编号
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"未知的迁移拓扑: {topology}，可选 {TOPOLOGIES}")
+    if n_islands < 2:
+        return [[] for _ in range(n_islands)]
+    if topology == "ring":
+        return [[(i + 1) % n_islands] for i in range(n_islands)]
+    if topology == "bi_ring":
+        return [sorted({(i + 1) % n_islands, (i - 1) % n_islands}) for i in range(n_islands)]
+    return [[j for j in range(n_islands) if j != i] for i in range(n_islands)]
+
+
+def _evaluate(settings, individuals, geometry, table_cache):
+    """在岛屿进程中用向量化群体仿真评估一代个体"""
+    valid, population = build_population(individuals, geometry, settings["start_pos"], settings["start_angle"],
+                                         table_cache=table_cache, stall_steps=settings["stall_steps"])
+    individuals = [individual for individual, ok in zip(individuals, valid) if ok]
+    run_population_generation(population, settings["max_steps"], settings["target_laps"])
+    return individuals, population.scores(settings["time_weight"]).tolist(), population.fitness.tolist()
+
+
+def _island_main(island_id, settings, seed, elite, n_sources, inbox, outbox):
+    """
+    岛屿进程：独立进化自己的子种群，每隔 migration_interval 代把最好的个体发给协调进程，
+    再等待来自 n_sources 个岛屿的迁入个体，这是岛屿之间唯一的同步点
+    :param seed: np.random.SeedSequence 本岛屿的随机种子
+    :param elite: List[List[float]] 初始种群中加入的精英个体
+    :param n_sources: int 有多少个岛屿向本岛屿迁入
+    :param inbox: multiprocessing.Queue 迁入个体
+    :param outbox: multiprocessing.Queue 发往协调进程的消息
+    """
+    # 每个岛屿使用不同的随机数，否则 fork 出的进程会生成相同的初始种群
+    random.seed(int(seed.generate_state(1)[0]))
+    np.random.seed(seed.generate_state(1)[0])
+    rng = np.random.default_rng(seed)
+    geometry = TrackGeometry.from_file(settings["track"], centerline=True)
+    table_cache = TableCache(*settings["table_cache"]) if settings["table_cache"] else None
+
+    individuals = init_individuals(elite, settings["cars"])
+    interval = settings["migration_interval"]
+    for generation in range(settings["generations"]):
+        individuals, fitnesses, checkpoints = _evaluate(settings, individuals, geometry, table_cache)
+        outbox.put(("generation", island_id, generation, individuals, fitnesses, checkpoints))
+        elite = select_elite(individuals, fitnesses, settings["elite_num"])
+
+        # 迁移：发出最好的个体，迁入的个体加入父代
+        if interval and (generation + 1) % interval == 0 and generation + 1 < settings["generations"]:
+            outbox.put(("migrate", island_id, generation, elite[:settings["migrants"]]))
+            for _ in range(n_sources):
+                for individual in inbox.get():
+                    if individual not in elite:
+                        elite.append(individual)
+
+        individuals = next_individuals(elite, settings["cars"], settings["crossover_rate"],
+                                       settings["mutation_rate"], settings["mutation_scale"], rng)
+    outbox.put(("done", island_id))
+
+
+class IslandTrainer:
+    def __init__(self, track_file, islands=4, topology="ring", migration_interval=5, migrants=2, cars=50,
+                 elite_num=10, generations=100, max_steps=6000, stall_steps=None, target_laps=None,
+                 start_pos=(200, 750), start_angle=0, time_weight=0, crossover_rate=0.8, mutation_rate=0.2,
+                 mutation_scale=0.1, seed=None, table_cache=None):
+        """
+        岛屿模型遗传算法：每个进程进化自己的子种群，每隔若干代沿迁移拓扑交换最好的个体。
+        岛屿之间只在迁移时同步，评估按岛屿数量并行扩展，各岛屿独立进化也有利于保持多样性
+        :param track_file: str 赛道文件路径
+        :param islands: int 岛屿（进程）数量
+        :param topology: str 迁移拓扑，见 TOPOLOGIES
+        :param migration_interval: int 每隔多少代迁移一次，0 表示不迁移
+        :param migrants: int 每次每个岛屿迁出的个体数
+        :param cars: int 每个岛屿每代的车辆数量
+        :param elite_num: int 每个岛屿每代保留的精英数量
+        :param generations: int 每个岛屿进化的代数
+        :param max_steps: int 每代最多仿真步数
+        :param stall_steps: int 连续多少步没有通过新的检查线就淘汰，None 表示不检测
+        :param target_laps: int 最好的车辆跑完多少圈后提前结束本代，None 表示不设目标
+        :param time_weight: float 到达最近一条检查线所用步数的惩罚权重
+        :param seed: int 随机种子，每个岛屿由它派生出不同的种子
+        :param table_cache: TableCache 查找表磁盘缓存，各岛屿打开同一个缓存目录
+        """
+        self.islands = islands
+        self.targets = migration_targets(topology, islands)
+        self.seed = seed
+        self.settings = {
+            "track": track_file, "cars": cars, "elite_num": elite_num, "generations": generations,
+            "migration_interval": migration_interval, "migrants": migrants, "max_steps": max_steps,
+            "stall_steps": stall_steps, "target_laps": target_laps, "start_pos": list(start_pos),
+            "start_angle": start_angle, "time_weight": time_weight, "crossover_rate": crossover_rate,
+            "mutation_rate": mutation_rate, "mutation_scale": mutation_scale,
+            "table_cache": (table_cache.directory, table_cache.max_bytes) if table_cache is not None else None,
+        }
+
+    def run(self, elite=(), on_generation=None):
+        """
+        启动所有岛屿并协调迁移，直到所有岛屿完成
+        :param elite: List[List[float]] 加入每个岛屿初始种群的精英个体
+        :param on_generation: Callable(island_id, generation, individuals, fitnesses, checkpoints)，
+                              每个岛屿每评估完一代调用一次，可用于记录名人堂或日志
+
+        :return: (List[List[float]] 所有岛屿中最好的个体，从好到差, List[float] 对应的适应度)
+        """
+        n = self.islands
+        n_sources = [sum(i in targets for targets in self.targets) for i in range(n)]
+        seeds = np.random.SeedSequence(self.seed).spawn(n)
+        outbox = multiprocessing.Queue()
+        inboxes = [multiprocessing.Queue() for _ in range(n)]
+        processes = [multiprocessing.Process(target=_island_main, daemon=True,
+                                             args=(i, self.settings, seeds[i], list(elite), n_sources[i],
+                                                   inboxes[i], outbox))
+                     for i in range(n)]
+        for process in processes:
+            process.start()
+
+        # 每个岛屿最近一代的个体与适应度，用于最终汇总
+        latest = [([], []) for _ in range(n)]
+        emigrants = {}  # 代数 -> {岛屿编号: 迁出个体}
+        done = 0
+        try:
+            while done < n:
+                try:
+                    message = outbox.get(timeout=1)
+                except queue.Empty:
+                    if any(process.exitcode not in (None, 0) for process in processes):
+                        raise RuntimeError("岛屿进程异常退出")
+                    continue
+                kind, island_id = message[:2]
+                if kind == "generation":
+                    generation, individuals, fitnesses, checkpoints = message[2:]
+                    latest[island_id] = (individuals, fitnesses)
+                    if on_generation:
+                        on_generation(island_id, generation, individuals, fitnesses, checkpoints)
+                elif kind == "migrate":
+                    generation, individuals = message[2:]
+                    emigrants.setdefault(generation, {})[island_id] = individuals
+                    # 所有岛屿都到达本次迁移后，沿拓扑转发
+                    if len(emigrants[generation]) == n:
+                        for source, targets in enumerate(self.targets):
+                            for target in targets:
+                                inboxes[target].put(emigrants[generation][source])
+                        best = [max(latest[i][1], default=0) for i in range(n)]
+                        logging.info(f"第{generation + 1}代迁移完成，各岛屿最大适应度: "
+                                     + ", ".join(f"{fitness:g}" for fitness in best))
+                        del emigrants[generation]
+                else:
+                    done += 1
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        individuals = [individual for island in latest for individual in island[0]]
+        fitnesses = [fitness for island in latest for fitness in island[1]]
+        order = sorted(range(len(individuals)), key=lambda i: fitnesses[i], reverse=True)
+        return [individuals[i] for i in order], [fitnesses[i] for i in order]
@@ -0,0 +1,157 @@
+import os
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from src.core.trainer import TABLE_STEPS, build_population, trace_population_generation, merge_traces
+from src.core.track_geometry import TrackGeometry
+from src.core.sensor_field import SensorField
+from src.core.table_cache import TableCache
+
+# 汇总各赛道适应度的方式
+AGGREGATES = {"mean": np.mean, "min": np.min}
+
+# 进程内的赛道数据与仿真参数，由 _init_worker 加载一次
+_worker_tracks = []
+_worker_sensor_fields = []
+_worker_settings = None
+_worker_table_cache = None
+
+
+def _init_worker(track_files, settings, table_cache_dir=None, table_cache_bytes=None):
+    """工作进程初始化：所有赛道只加载并预编译一次（包括中心线、传感器距离场），并打开查找表缓存"""
+    global _worker_tracks, _worker_sensor_fields, _worker_settings, _worker_table_cache
+    _worker_tracks = [TrackGeometry.from_file(track_file, centerline=settings["fitness"] == "progress")
+                      for track_file in track_files]
+    _worker_sensor_fields = [None] * len(track_files)
+    if settings["sensors"] != "exact":
+        # 主进程已烘焙并写入缓存，这里只是读取
+        _worker_sensor_fields = [SensorField.load_or_bake(track_file, geometry=geometry)
+                                 for track_file, geometry in zip(track_files, _worker_tracks)]
+    _worker_settings = settings
+    if table_cache_dir:
+        _worker_table_cache = TableCache(table_cache_dir, table_cache_bytes)
+
+
+def _evaluate_chunk(task):
+    """
+    在一条赛道上用向量化群体仿真评估一批个体
+    :param task: Tuple (赛道编号, 个体在整代中的起始位置, 个体列表)
+
+    :return: (赛道编号, 起始位置, np.ndarray (n,) bool 每个个体是否生成成功, trace_population_generation 的结果,
+              float 一圈对应的适应度)。本批中有车辆跑完目标圈数时该赛道未必结束，由主进程按整条赛道的结束步数截取
+    """
+    track_index, offset, individuals = task
+    geometry = _worker_tracks[track_index]
+    settings = _worker_settings
+    pos = geometry.start_pos if geometry.start_pos is not None else settings["start_pos"]
+    angle = geometry.start_angle if geometry.start_pos is not None else settings["start_angle"]
+    valid, population = build_population(individuals, geometry, pos, angle, table_cache=_worker_table_cache,
+                                         table_steps=settings["table_steps"],
+                                         interpolate_tables=settings["interpolate_tables"],
+                                         stall_steps=settings["stall_steps"],
+                                         sensor_field=_worker_sensor_fields[track_index],
+                                         interpolate_sensors=settings["sensors"] == "linear")
+    trace = trace_population_generation(population, settings["max_steps"], settings["target_laps"],
+                                        settings["time_weight"])
+    # 不同赛道长度不同，汇总前要换算成圈数
+    lap = geometry.centerline.length if geometry.centerline is not None else len(geometry.check_line)
+    return track_index, offset, valid, trace, lap
+
+
+class MultiTrackEvaluator:
+    def __init__(self, track_files, aggregate="mean", workers=0, max_steps=6000, stall_steps=None, target_laps=None,
+                 start_pos=(200, 750), start_angle=0, time_weight=0, table_cache=None, table_steps=TABLE_STEPS,
+                 interpolate_tables=False, fitness="progress", sensors="exact"):
+        """
+        多赛道适应度评估器：每个个体在每条赛道上分别仿真，适应度换算成圈数后再按 aggregate 汇总。
+        每条赛道上的一批个体是一个任务，(个体, 赛道) 的仿真在进程池中并行，总耗时不随赛道数量成倍增长；
+        提前结束的判断按整条赛道进行，结果与进程数无关
+        :param track_files: List[str] 赛道文件路径，每个工作进程只加载一次
+        :param aggregate: str 汇总方式，见 AGGREGATES
+        :param workers: int 工作进程数，0 表示在主进程中评估，None 表示使用全部 CPU 核
+        :param max_steps: int 每条赛道最多仿真步数
+        :param stall_steps: int 连续多少步没有通过新的检查线就淘汰，None 表示不检测
+        :param target_laps: int 最好的车辆跑完多少圈后结束该赛道的仿真，None 表示不设目标
+        :param start_pos: List[float] 赛道文件中没有记录起点时使用的车辆初始位置
+        :param start_angle: float 赛道文件中没有记录起点时使用的车辆初始朝向
+        :param time_weight: float 到达最近一条检查线所用步数的惩罚权重
+        :param table_cache: TableCache 查找表磁盘缓存，工作进程打开同一个缓存目录
+        :param table_steps: Tuple[float, float, float, float] 查找表步长 (speed, front, left, right)
+        :param interpolate_tables: bool 查表时是否双线性插值
+        :param fitness: str progress 为沿赛道中心线的连续进度，checkpoints 为通过的检查线数（每条赛道都要有检查线）
+        :param sensors: str 传感器计算方式，exact 为射线求交，nearest/linear 为查预计算的距离场
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"未知的汇总方式: {aggregate}，可选 {list(AGGREGATES)}")
+        self.track_files = list(track_files)
+        if fitness == "checkpoints":
+            for track_file in self.track_files:
+                if not len(TrackGeometry.from_file(track_file).check_line):
+                    raise ValueError(f"赛道 {track_file} 没有检查线，不能按检查线数计算适应度，请使用 progress")
+        if sensors != "exact" and workers != 0:
+            # 在主进程中烘焙一次，工作进程只读取缓存
+            for track_file in self.track_files:
+                SensorField.load_or_bake(track_file)
+        self.aggregate = aggregate
+        self.workers = os.cpu_count() if workers is None else workers
+        self.steps = 0  # 最近一次 evaluate 中各赛道实际仿真步数之和
+        self.track_results = []  # 最近一次 evaluate 中每条赛道未换算的 (适应度, 通过的检查线数)
+        settings = {"max_steps": max_steps, "stall_steps": stall_steps, "target_laps": target_laps,
+                    "start_pos": list(start_pos), "start_angle": start_angle, "time_weight": time_weight,
+                    "table_steps": tuple(table_steps), "interpolate_tables": interpolate_tables,
+                    "fitness": fitness, "sensors": sensors}
+        cache_args = (table_cache.directory, table_cache.max_bytes) if table_cache is not None else (None, None)
+        self.executor = None
+        if self.workers:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                initargs=(self.track_files, settings, *cache_args))
+        else:
+            _init_worker(self.track_files, settings, *cache_args)
+
+    def evaluate(self, individuals):
+        """
+        评估一代个体，实际仿真步数记录在 self.steps，每条赛道上的结果记录在 self.track_results
+        :param individuals: List[List[float]] 个体列表
+
+        :return: List[Tuple[float, int]] 与个体一一对应的 (汇总后的适应度, 各赛道通过的检查线总数)，
+                 车辆生成失败的个体为 None
+        """
+        n, n_tracks = len(individuals), len(self.track_files)
+        # 每条赛道切成若干批，使任务数不少于进程数
+        n_chunks = max(1, math.ceil(self.workers / n_tracks)) if self.workers else 1
+        chunk_size = max(1, math.ceil(n / n_chunks))
+        tasks = [(t, start, individuals[start:start + chunk_size])
+                 for t in range(n_tracks) for start in range(0, n, chunk_size)]
+        results = self.executor.map(_evaluate_chunk, tasks) if self.executor else map(_evaluate_chunk, tasks)
+
+        chunks = [[] for _ in range(n_tracks)]
+        for track_index, offset, valid, trace, lap in results:
+            chunks[track_index].append((offset, valid, trace, lap))
+
+        fitnesses = np.full((n_tracks, n), np.nan)
+        checkpoints = np.zeros((n_tracks, n), dtype=int)
+        self.track_results = [[None] * n for _ in range(n_tracks)]
+        self.steps = 0
+        for track_index, track_chunks in enumerate(chunks):
+            steps, rows = merge_traces([trace for _, _, trace, _ in track_chunks])
+            self.steps += steps
+            for (offset, valid, _, lap), (scores, passed) in zip(track_chunks, rows):
+                for i, score, count in zip(offset + np.flatnonzero(valid), scores.tolist(), passed.tolist()):
+                    fitnesses[track_index, i] = score / lap
+                    checkpoints[track_index, i] = count
+                    self.track_results[track_index][i] = (score, count)
+
+        aggregated = AGGREGATES[self.aggregate](fitnesses, axis=0)
+        return [None if np.isnan(fitness) else (float(fitness), int(passed))
+                for fitness, passed in zip(aggregated, checkpoints.sum(axis=0))]
+
+    def close(self):
+        """关闭进程池"""
+        if self.executor:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,121 @@
+import os
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from src.core.car import Car
+from src.core.trainer import (TABLE_STEPS, build_drivers, build_population, trace_generation,
+                              trace_population_generation, merge_traces)
+from src.core.track_geometry import TrackGeometry
+from src.core.sensor_field import SensorField
+from src.core.table_cache import TableCache
+
+# 工作进程内的赛道数据与仿真参数，由 _init_worker 加载一次
+_worker_track = None
+_worker_sensor_field = None
+_worker_settings = None
+_worker_table_cache = None
+
+
+def _init_worker(track_file, settings, table_cache_dir=None, table_cache_bytes=None):
+    """工作进程初始化：只加载并预编译一次赛道数据（及中心线、传感器距离场），并打开查找表缓存"""
+    global _worker_track, _worker_sensor_field, _worker_settings, _worker_table_cache
+    _worker_track = TrackGeometry.from_file(track_file, centerline=settings["centerline"])
+    if settings["engine"] == "population" and settings["sensors"] != "exact":
+        # 主进程已烘焙并写入缓存，这里只是读取
+        _worker_sensor_field = SensorField.load_or_bake(track_file, geometry=_worker_track)
+    _worker_settings = settings
+    if table_cache_dir:
+        _worker_table_cache = TableCache(table_cache_dir, table_cache_bytes)
+
+
+def _evaluate_chunk(task):
+    """
+    在工作进程中评估一批个体：查找表一次性批量生成，population 引擎下整批个体作为一个向量化群体仿真。
+    本批中有车辆跑完目标圈数时整代未必结束，所以返回每一步的记录，由主进程按整代的结束步数截取
+    :param task: Tuple (个体在整代中的起始位置, 个体列表)
+
+    :return: (起始位置, np.ndarray (n,) bool 每个个体是否生成成功, trace_population_generation 的结果)
+    """
+    offset, individuals = task
+    settings = _worker_settings
+    if settings["engine"] == "population":
+        valid, population = build_population(individuals, _worker_track, settings["pos"], settings["angle"],
+                                             settings["max_speed"], table_cache=_worker_table_cache,
+                                             table_steps=settings["table_steps"],
+                                             interpolate_tables=settings["interpolate_tables"],
+                                             stall_steps=settings["stall_steps"],
+                                             sensor_field=_worker_sensor_field,
+                                             interpolate_sensors=settings["sensors"] == "linear")
+        trace = trace_population_generation(population, settings["max_steps"], settings["target_laps"],
+                                            settings["time_weight"])
+    else:
+        valid, drivers = build_drivers(individuals, _worker_table_cache, settings["table_steps"],
+                                       settings["interpolate_tables"])
+        valid_individuals = [individual for individual, ok in zip(individuals, valid) if ok]
+        cars = [Car(individual=individual, pos=settings["pos"], angle=settings["angle"],
+                    max_speed=settings["max_speed"], driver=driver, stall_steps=settings["stall_steps"])
+                for individual, driver in zip(valid_individuals, drivers)]
+        trace = trace_generation(cars, _worker_track, _worker_track.check_line, settings["max_steps"],
+                                 settings["target_laps"], settings["time_weight"])
+    return offset, valid, trace
+
+
+class ParallelEvaluator:
+    def __init__(self, track_file, pos, angle=0, max_speed=2, max_steps=6000, workers=None, table_cache=None,
+                 stall_steps=None, target_laps=None, centerline=False, time_weight=0, engine="population",
+                 sensors="exact", table_steps=TABLE_STEPS, interpolate_tables=False):
+        """
+        多进程适应度评估器，将一代个体切成与进程数相同的批次并行仿真，每批与主进程中的评估方式相同，
+        提前结束的判断按整代进行，结果与进程数无关，与在主进程中评估相同
+        :param track_file: str 赛道文件路径，每个工作进程只加载一次
+        :param pos: List[float] 车辆初始位置
+        :param angle: float 车辆初始朝向
+        :param max_speed: float 最大速度
+        :param max_steps: int 每代最多仿真步数
+        :param workers: int 工作进程数，默认为 CPU 核数
+        :param table_cache: TableCache 查找表磁盘缓存，工作进程打开同一个缓存目录
+        :param stall_steps: int 连续多少步没有通过新的检查线就淘汰，None 表示不检测
+        :param target_laps: int 车辆跑完多少圈后结束仿真，None 表示不设目标
+        :param centerline: bool 是否按沿赛道中心线的连续进度计算适应度，否则为通过的检查线数
+        :param time_weight: float 到达最近一条检查线所用步数的惩罚权重（仅 centerline 时有效）
+        :param engine: str 仿真引擎，population 为向量化群体仿真，car 为逐车仿真
+        :param sensors: str 传感器计算方式，exact 为射线求交，nearest/linear 为查预计算的距离场（仅 population 引擎）
+        :param table_steps: Tuple[float, float, float, float] 查找表步长 (speed, front, left, right)
+        :param interpolate_tables: bool 查表时是否双线性插值
+        """
+        self.workers = workers or os.cpu_count()
+        self.steps = 0  # 最近一次 evaluate 中整代实际仿真的步数
+        settings = {"pos": list(pos), "angle": angle, "max_speed": max_speed, "max_steps": max_steps,
+                    "stall_steps": stall_steps, "target_laps": target_laps, "centerline": centerline,
+                    "time_weight": time_weight, "engine": engine, "sensors": sensors,
+                    "table_steps": tuple(table_steps), "interpolate_tables": interpolate_tables}
+        cache_args = (table_cache.directory, table_cache.max_bytes) if table_cache is not None else (None, None)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(track_file, settings, *cache_args))
+
+    def evaluate(self, individuals):
+        """
+        并行评估一代个体，实际仿真步数记录在 self.steps
+        :param individuals: List[List[float]] 个体列表
+
+        :return: List[Tuple[float, int]] 与个体一一对应的 (适应度, 通过的检查线数)，车辆生成失败的个体为 None
+        """
+        chunk_size = max(1, math.ceil(len(individuals) / self.workers))
+        tasks = [(start, individuals[start:start + chunk_size]) for start in range(0, len(individuals), chunk_size)]
+        chunks = list(self.executor.map(_evaluate_chunk, tasks))
+        self.steps, rows = merge_traces([trace for _, _, trace in chunks])
+        results = [None] * len(individuals)
+        for (offset, valid, _), (scores, passed) in zip(chunks, rows):
+            for i, score, checkpoints in zip(offset + np.flatnonzero(valid), scores.tolist(), passed.tolist()):
+                results[i] = (score, checkpoints)
+        return results
+
+    def close(self):
+        """关闭进程池"""
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
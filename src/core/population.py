@@ -0,0 +1,180 @@
+import numpy as np
+from src.core.fuzzy_inference import ACCEL_OPTIONS, ROTATION_OPTIONS, encode, lookup
+from src.util.profile_util import PROFILER
+
+
+class Population:
+    def __init__(self, accel_tables, rotation_tables, table_steps, geometry,
+                 pos=[0, 0], angle=0, max_speed=2, sensor_field=None, interpolate_sensors=False,
+                 interpolate_tables=False, stall_steps=None):
+        """
+        向量化的车辆群体仿真器，所有车辆的状态以 NumPy 数组保存，一次推进整代车辆
+        :param accel_tables: np.ndarray (N, speed, front) 每辆车的加速度查找表
+        :param rotation_tables: np.ndarray (N, left, right) 每辆车的转向查找表
+        :param table_steps: Tuple[float, float, float, float] 查找表步长 (speed, front, left, right)
+        :param geometry: TrackGeometry 预编译的赛道几何数据
+        :param pos: List[float] 车的初始位置坐标
+        :param angle: float 车的初始朝向角度（0° 指向右）
+        :param max_speed: float 最大速度
+        :param sensor_field: SensorField 预计算的传感器距离场，设置后用查表代替射线求交
+        :param interpolate_sensors: bool 查表时是否插值
+        :param interpolate_tables: bool 模糊控制查找表是否双线性插值，默认取最近的网格点
+        :param stall_steps: int 连续多少步没有通过新的检查线就判定为停滞并淘汰，None 表示不检测
+        """
+        # 查找表以离散选项的 int8 编号保存，查表时再还原
+        self.accel_codes = encode(np.asarray(accel_tables, dtype=float), ACCEL_OPTIONS)
+        self.rotation_codes = encode(np.asarray(rotation_tables, dtype=float), ROTATION_OPTIONS)
+        self.table_steps = table_steps
+        self.size = len(self.accel_codes)
+        self.max_speed = max_speed
+        self.geometry = geometry
+        self.sensor_field = sensor_field
+        self.interpolate_sensors = interpolate_sensors
+        self.interpolate_tables = interpolate_tables
+        self.stall_steps = stall_steps
+
+        n = self.size
+        self.pos = np.tile(np.asarray(pos, dtype=float), (n, 1))  # 位置坐标
+        self.last_pos = self.pos.copy()  # 上一时刻位置坐标
+        self.angle = np.full(n, angle, dtype=float)
+        self.speed = np.zeros(n)  # 速度
+        self.front_dist = np.zeros(n)  # 前方障碍物距离
+        self.left_dist = np.zeros(n)  # 左侧障碍物距离
+        self.right_dist = np.zeros(n)  # 右侧障碍物距离
+        self.alive = np.ones(n, dtype=bool)  # 是否存活
+        self.valid_checkpoints = np.zeros(n, dtype=int)  # 有效检查点编号
+        self.fitness = np.zeros(n, dtype=int)  # 适应度
+        self.steps_since_checkpoint = np.zeros(n, dtype=int)  # 距离上次通过检查线的步数
+        self.steps = np.zeros(n, dtype=int)  # 已仿真的步数
+        self.progress = np.zeros(n)  # 沿赛道中心线前进的距离（跨圈累计，后退为负）
+        self.centerline = geometry.centerline
+        if self.centerline is not None:
+            self.arc_pos = np.full(n, self.centerline.arc_position(pos))  # 上一步在中心线上的弧长位置
+
+    @classmethod
+    def from_drivers(cls, drivers, geometry, pos=[0, 0], angle=0, max_speed=2, **kwargs):
+        """
+        由多个 FuzzyDriver 的查找表构建群体，所有驾驶员的查表步长必须一致
+        :param drivers: List[FuzzyDriver] 模糊控制器列表
+        """
+        first = drivers[0]
+        table_steps = (first.speed_step, first.front_step, first.left_step, first.right_step)
+        accel_tables = np.stack([driver.accel_table for driver in drivers])
+        rotation_tables = np.stack([driver.rotation_table for driver in drivers])
+        return cls(accel_tables, rotation_tables, table_steps, geometry,
+                   pos=pos, angle=angle, max_speed=max_speed, **kwargs)
+
+    def _update_fitness(self, idx):
+        """
+        更新指定车辆的检查点与适应度
+        :return: np.ndarray 本步通过检查线的车辆索引
+        """
+        n_lines = len(self.geometry.check_start)
+        if n_lines == 0:
+            return idx[:0]
+        hit = self.geometry.crossed_checkpoint_batch(self.valid_checkpoints[idx], self.last_pos[idx], self.pos[idx])
+        passed = idx[hit]
+        self.valid_checkpoints[passed] = (self.valid_checkpoints[passed] + 1) % n_lines
+        self.fitness[passed] += 1
+        return passed
+
+    def scores(self, time_weight=0):
+        """
+        用于选择的适应度，与 Car.score 相同
+        :param time_weight: float 到达最近一条检查线所用步数的惩罚权重，0 表示不考虑用时
+
+        :return: np.ndarray (N,)
+        """
+        if self.centerline is None:
+            return self.fitness.astype(float)
+        return self.progress - time_weight * (self.steps - self.steps_since_checkpoint)
+
+    def predict(self, idx):
+        """批量查表得到指定车辆的加速度与转向"""
+        speed_step, front_step, left_step, right_step = self.table_steps
+        acceleration = lookup(self.accel_codes, ACCEL_OPTIONS, self.speed[idx], self.front_dist[idx],
+                              speed_step, front_step, self.interpolate_tables, rows=(idx,))
+        rotation = lookup(self.rotation_codes, ROTATION_OPTIONS, self.left_dist[idx], self.right_dist[idx],
+                          left_step, right_step, self.interpolate_tables, rows=(idx,))
+        return acceleration, rotation
+
+    def step(self):
+        """
+        推进所有存活车辆一步，逻辑与 Car.update_info_fuzzy 相同
+        :return: np.ndarray 本步开始时存活的车辆索引
+        """
+        idx = np.flatnonzero(self.alive)
+        if len(idx) == 0:
+            return idx
+        n = len(idx)
+        timed = PROFILER.enabled
+        if timed:
+            PROFILER.mark()
+
+        # 传感器
+        if self.sensor_field is not None:
+            distances = self.sensor_field.lookup(self.pos[idx], self.angle[idx], self.interpolate_sensors)
+        else:
+            distances = self.geometry.sense(self.pos[idx], self.angle[idx])
+        self.front_dist[idx], self.left_dist[idx], self.right_dist[idx] = distances.T
+        if timed:
+            PROFILER.lap("sensing", n)
+
+        # 出界检测
+        self.alive[idx[self.geometry.crossed_boundary_batch(self.last_pos[idx], self.pos[idx])]] = False
+
+        # 检测是否到检查线
+        passed = self._update_fitness(idx)
+
+        # 停滞检测：长时间没有通过新的检查线的车辆提前淘汰
+        self.steps_since_checkpoint[idx] += 1
+        self.steps_since_checkpoint[passed] = 0
+        if self.stall_steps and len(self.geometry.check_start):
+            self.alive[idx[self.steps_since_checkpoint[idx] >= self.stall_steps]] = False
+
+        # 沿赛道中心线的连续进度
+        self.steps[idx] += 1
+        if self.centerline is not None:
+            arc_pos = self.centerline.project(self.pos[idx])
+            self.progress[idx] += self.centerline.wrap(arc_pos - self.arc_pos[idx])
+            self.arc_pos[idx] = arc_pos
+
+        # 记录上一时刻的位置
+        self.last_pos[idx] = self.pos[idx]
+        if timed:
+            PROFILER.lap("collision", n)
+
+        # 模糊控制
+        acceleration, rotation = self.predict(idx)
+        if timed:
+            PROFILER.lap("inference", n)
+
+        # 判断是否搁浅
+        speed = self.speed[idx]
+        self.alive[idx[(speed == 0) & (acceleration <= 0) & (rotation == 0)]] = False
+
+        speed = np.where(acceleration > 0,
+                         np.minimum(speed + acceleration, self.max_speed),
+                         np.maximum(speed + acceleration, 0))
+        self.speed[idx] = speed
+        self.angle[idx] += rotation
+        rad = np.radians(self.angle[idx])
+
+        # 更新位置
+        self.pos[idx, 0] += np.cos(rad) * speed
+        self.pos[idx, 1] -= np.sin(rad) * speed
+        if timed:
+            PROFILER.lap("physics", n)
+        return idx
+
+    def car_points(self, idx=None):
+        """
+        计算车辆的三角形箭头坐标, 用于绘制
+        :param idx: np.ndarray 车辆索引，默认为所有存活车辆
+        :return: np.ndarray (n, 3, 2)
+        """
+        if idx is None:
+            idx = np.flatnonzero(self.alive)
+        rad = np.radians(self.angle[idx])[:, None] + np.array([0, 2.5, -2.5])
+        return np.stack([self.pos[idx, 0, None] + np.cos(rad) * 10,
+                         self.pos[idx, 1, None] - np.sin(rad) * 10], axis=-1)
@@ -0,0 +1,171 @@
+import os
+import hashlib
+import logging
+import numpy as np
+from scipy import ndimage
+from src.core.track_geometry import TrackGeometry
+
+# 传感器量程：取模糊控制器最大的输入范围（前方距离 0-500），更远的距离查表时都取边界值
+SENSOR_RANGE = 500
+# 距离场的烘焙方式版本，改变烘焙方式时递增，使旧缓存自动失效
+FIELD_VERSION = 2
+
+
+class SensorField:
+    def __init__(self, field, origin, resolution, source_hash=""):
+        """
+        预计算的传感器距离场：在量化的 位置 × 朝向 网格上保存单条射线到赛道边界的距离，
+        前方、左侧、右侧分别对应朝向 θ、θ+90°、θ-90°，因此只需存一份距离场
+        :param field: np.ndarray (朝向数, ny, nx) float16 距离
+        :param origin: Tuple[float, float] 网格左上角坐标
+        :param resolution: float 位置网格间距
+        :param source_hash: str 赛道文件的哈希，用于判断缓存是否失效
+        """
+        self.field = field
+        self.origin = np.asarray(origin, dtype=float)
+        self.resolution = float(resolution)
+        self.source_hash = source_hash
+        self.n_headings = field.shape[0]
+        self.heading_step = 360.0 / self.n_headings
+
+    @classmethod
+    def bake(cls, geometry, resolution=5, n_headings=144, source_hash=""):
+        """
+        对赛道烘焙距离场
+        :param geometry: TrackGeometry 预编译的赛道几何数据
+        :param resolution: float 位置网格间距（像素）
+        :param n_headings: int 朝向数量，必须为 4 的倍数，使左右传感器恰好落在网格上
+        """
+        if n_headings % 4:
+            raise ValueError("n_headings 必须为 4 的倍数")
+        lo = np.floor(geometry.edge_start.min(axis=0))
+        hi = np.ceil(geometry.edge_start.max(axis=0))
+        nx, ny = (np.ceil((hi - lo) / resolution).astype(int) + 1)
+        xs = lo[0] + np.arange(nx) * resolution
+        ys = lo[1] + np.arange(ny) * resolution
+        gx, gy = np.meshgrid(xs, ys)
+        positions = np.stack([gx.ravel(), gy.ravel()], axis=-1)
+
+        field = np.empty((n_headings, ny, nx), dtype=np.float16)
+        for h in range(n_headings):
+            angles = np.full(len(positions), h * 360.0 / n_headings)
+            distances = geometry.ray_distances(positions, angles)
+            # 射线未命中与精确射线求交的 inf 一样表示前方没有障碍物，记为传感器量程
+            distances[~np.isfinite(distances)] = SENSOR_RANGE
+            field[h] = distances.reshape(ny, nx)
+
+        # 赛道外的网格点上射线会穿过边界或未命中，与赛道内车辆看到的距离无关；
+        # 贴墙的车辆查表或插值时会用到它们，因此改用最近的赛道内网格点的距离
+        inside = geometry.contains(positions).reshape(ny, nx)
+        if inside.any() and not inside.all():
+            _, (iy, ix) = ndimage.distance_transform_edt(~inside, return_indices=True)
+            field = field[:, iy, ix]
+        return cls(field, lo, resolution, source_hash)
+
+    @classmethod
+    def load_or_bake(cls, track_file, resolution=5, n_headings=144, geometry=None):
+        """
+        读取赛道文件旁的缓存，缓存不存在、赛道文件或烘焙方式已修改时重新烘焙并写入缓存
+        :param track_file: str 赛道文件路径，如 src/config/track_info/train.json
+        :param geometry: TrackGeometry 已构建的几何数据，可选
+
+        :return: SensorField
+        """
+        with open(track_file, "rb") as f:
+            source_hash = f"v{FIELD_VERSION}:{hashlib.sha256(f.read()).hexdigest()}"
+        cache_path = f"{os.path.splitext(track_file)[0]}.sensor_r{resolution:g}_h{n_headings}.npz"
+
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as data:
+                if str(data["source_hash"]) == source_hash:
+                    return cls(data["field"], data["origin"], float(data["resolution"]), source_hash)
+            logging.info(f"赛道文件或烘焙方式已修改，重新烘焙传感器距离场: {cache_path}")
+
+        geometry = geometry or TrackGeometry.from_file(track_file)
+        sensor_field = cls.bake(geometry, resolution, n_headings, source_hash)
+        errors = sensor_field.error_report(geometry)
+        logging.info(f"传感器距离场烘焙完成: {cache_path}, 最近点误差 均值 {errors['nearest']['mean']:.2f} "
+                     f"95% {errors['nearest']['p95']:.2f} 最大 {errors['nearest']['max']:.2f}, "
+                     f"插值误差 均值 {errors['linear']['mean']:.2f} 95% {errors['linear']['p95']:.2f} "
+                     f"最大 {errors['linear']['max']:.2f}")
+
+        # 先写临时文件再替换，避免中断时留下损坏的缓存
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(tmp_path, field=sensor_field.field, origin=sensor_field.origin,
+                 resolution=sensor_field.resolution, source_hash=source_hash)
+        os.replace(tmp_path, cache_path)
+        return sensor_field
+
+    def _heading_lookup(self, headings, fy, fx, interpolate):
+        """在朝向 headings（网格单位）和位置 (fy, fx)（网格单位）处取距离"""
+        ny, nx = self.field.shape[1:]
+        if not interpolate:
+            h = np.round(headings).astype(np.intp) % self.n_headings
+            iy = np.clip(np.round(fy), 0, ny - 1).astype(np.intp)
+            ix = np.clip(np.round(fx), 0, nx - 1).astype(np.intp)
+            return self.field[h, iy, ix].astype(float)
+
+        # 朝向方向线性插值（首尾相接），位置方向双线性插值
+        h0 = np.floor(headings)
+        wh = headings - h0
+        h0 = h0.astype(np.intp) % self.n_headings
+        h1 = (h0 + 1) % self.n_headings
+        fy = np.clip(fy, 0, ny - 1)
+        fx = np.clip(fx, 0, nx - 1)
+        y0 = np.minimum(np.floor(fy).astype(np.intp), ny - 2)
+        x0 = np.minimum(np.floor(fx).astype(np.intp), nx - 2)
+        wy = fy - y0
+        wx = fx - x0
+        result = 0.0
+        for h, w_h in ((h0, 1 - wh), (h1, wh)):
+            for y, w_y in ((y0, 1 - wy), (y0 + 1, wy)):
+                for x, w_x in ((x0, 1 - wx), (x0 + 1, wx)):
+                    result = result + self.field[h, y, x].astype(float) * (w_h * w_y * w_x)
+        return result
+
+    def lookup(self, positions, angles, interpolate=False):
+        """
+        查表得到多辆车前方、左侧、右侧到赛道边界的距离，代替射线求交
+        :param positions: np.ndarray (n, 2) 车辆位置
+        :param angles: np.ndarray (n,) 车辆朝向角度
+        :param interpolate: bool 是否插值，默认取最近的网格点
+
+        :return: np.ndarray (n, 3) 前方、左侧、右侧距离
+        """
+        positions = np.asarray(positions, dtype=float)
+        fx = (positions[:, 0] - self.origin[0]) / self.resolution
+        fy = (positions[:, 1] - self.origin[1]) / self.resolution
+        headings = np.mod(np.asarray(angles, dtype=float), 360.0) / self.heading_step
+        quarter = self.n_headings // 4
+
+        distances = np.empty((len(positions), 3))
+        for k, offset in enumerate((0, quarter, -quarter)):
+            distances[:, k] = self._heading_lookup(headings + offset, fy, fx, interpolate)
+        return distances
+
+    def error_report(self, geometry, samples=20000, seed=0):
+        """
+        在赛道内随机采样，统计查表结果相对精确射线求交的误差。超出传感器量程的距离对控制器没有区别，
+        比较前两者都截断到 SENSOR_RANGE
+        :param geometry: TrackGeometry 预编译的赛道几何数据
+        :param samples: int 采样数量
+
+        :return: Dict[str, Dict[str, float]] 最近点与插值两种方式的误差统计
+        """
+        rng = np.random.default_rng(seed)
+        ny, nx = self.field.shape[1:]
+        extent = self.origin + (np.array([nx, ny]) - 1) * self.resolution
+        positions = rng.uniform(self.origin, extent, (samples, 2))
+        positions = positions[geometry.contains(positions)]
+        angles = rng.uniform(0, 360, len(positions))
+        exact = np.minimum(geometry.sense(positions, angles), SENSOR_RANGE)
+
+        report = {}
+        for name, interpolate in (("nearest", False), ("linear", True)):
+            error = np.abs(np.minimum(self.lookup(positions, angles, interpolate), SENSOR_RANGE) - exact).ravel()
+            report[name] = {
+                "mean": float(error.mean()) if len(error) else 0.0,
+                "p95": float(np.percentile(error, 95)) if len(error) else 0.0,
+                "max": float(error.max()) if len(error) else 0.0,
+            }
+        return report
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class EdgeGrid:
+    def __init__(self, edge_start, edge_end, cell_size=None):
+        """
+        赛道边界线段的均匀网格索引，射线与运动线段只需检测经过的网格中的边
+        :param edge_start: np.ndarray (E, 2) 边的起点
+        :param edge_end: np.ndarray (E, 2) 边的终点
+        :param cell_size: float 网格边长，默认取赛道范围较长边的 1/20
+        """
+        edge_min = np.minimum(edge_start, edge_end)
+        edge_max = np.maximum(edge_start, edge_end)
+        if cell_size is None:
+            cell_size = max(float((edge_max.max(axis=0) - edge_min.min(axis=0)).max()) / 20, 8.0)
+        self.cell_size = cell_size
+        self.origin = edge_min.min(axis=0) - cell_size
+        self.shape = (np.floor((edge_max.max(axis=0) - self.origin) / cell_size).astype(int) + 2)  # (nx, ny)
+        self.bounds_min = self.origin
+        self.bounds_max = self.origin + self.shape * cell_size
+
+        # 每条边登记到与其包围盒（略微外扩）重叠的所有网格
+        eps = 1e-6
+        lo = np.floor((edge_min - eps - self.origin) / cell_size).astype(int)
+        hi = np.floor((edge_max + eps - self.origin) / cell_size).astype(int)
+        cells, edges = [], []
+        for e in range(len(edge_start)):
+            xs = np.arange(lo[e, 0], hi[e, 0] + 1)
+            ys = np.arange(lo[e, 1], hi[e, 1] + 1)
+            gx, gy = np.meshgrid(xs, ys, indexing="ij")
+            cells.append((gx * self.shape[1] + gy).ravel())
+            edges.append(np.full(gx.size, e))
+        cells = np.concatenate(cells)
+        edges = np.concatenate(edges)
+
+        # 以 -1 补齐的 (网格数, K) 表，便于向量化地一次取出多个网格中的边
+        n_cells = int(self.shape[0] * self.shape[1])
+        counts = np.bincount(cells, minlength=n_cells)
+        order = np.argsort(cells, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        slot = np.arange(len(cells)) - offsets[cells[order]]
+        self.cell_edges = np.full((n_cells, max(1, counts.max())), -1, dtype=np.intp)
+        self.cell_edges[cells[order], slot] = edges[order]
+
+    def traverse(self, starts, ends, intersect):
+        """
+        按 DDA 方式沿线段 start -> end 逐格遍历，只检测经过的网格中的边，找到最近交点后立即停止
+        :param starts: np.ndarray (m, 2) 线段起点
+        :param ends: np.ndarray (m, 2) 线段终点
+        :param intersect: Callable(A, B, edge_idx) -> (hit, t, dist)，对候选边求交，edge_idx 中 -1 为补齐位
+
+        :return: np.ndarray (m,) 最近交点的距离，没有交点为 inf
+        """
+        m = len(starts)
+        cs = self.cell_size
+        nx, ny = self.shape
+        best_dist = np.full(m, np.inf)
+        best_t = np.full(m, np.inf)
+        d = ends - starts
+
+        # 线段与网格包围盒求交（slab 方法），得到进入与离开的参数 t
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv = 1.0 / d
+            t1 = (self.bounds_min - starts) * inv
+            t2 = (self.bounds_max - starts) * inv
+        t_lo = np.where(d == 0, -np.inf, np.minimum(t1, t2))
+        t_hi = np.where(d == 0, np.inf, np.maximum(t1, t2))
+        inside = (d != 0) | ((starts >= self.bounds_min) & (starts <= self.bounds_max))
+        t_enter = np.maximum(t_lo.max(axis=1), 0.0)
+        t_exit = np.minimum(t_hi.min(axis=1), 1.0)
+        active = inside.all(axis=1) & (t_enter <= t_exit)
+
+        # 起始网格与 DDA 步进参数
+        p = starts + t_enter[:, None] * d
+        cell = np.clip(np.floor((p - self.origin) / cs).astype(int), 0, self.shape - 1)
+        step = np.sign(d).astype(int)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boundary = self.origin + (cell + (step > 0)) * cs
+            t_max = np.where(d != 0, (boundary - starts) / d, np.inf)
+            t_delta = np.where(d != 0, cs / np.abs(d), np.inf)
+
+        rows = np.flatnonzero(active)
+        cell, t_max, step, t_delta, t_exit = cell[rows], t_max[rows], step[rows], t_delta[rows], t_exit[rows]
+        while len(rows):
+            # 检测当前网格中的边
+            candidates = self.cell_edges[cell[:, 0] * ny + cell[:, 1]]  # (r, K)
+            hit, t, dist = intersect(starts[rows], ends[rows], candidates)
+            hit &= candidates >= 0
+            dist = np.where(hit, dist, np.inf)
+            k = dist.argmin(axis=1)
+            r = np.arange(len(rows))
+            closer = dist[r, k] < best_dist[rows]
+            best_dist[rows[closer]] = dist[r, k][closer]
+            best_t[rows[closer]] = t[r, k][closer]
+
+            # 前进到下一个网格
+            cell_exit = t_max.min(axis=1)
+            axis = t_max.argmin(axis=1)
+            cell[r, axis] += step[r, axis]
+            t_max[r, axis] += t_delta[r, axis]
+
+            # 已找到的交点在当前网格内，或线段已走完、离开网格，则停止
+            keep = ((best_t[rows] > cell_exit) & (cell_exit <= t_exit) &
+                    (cell[:, 0] >= 0) & (cell[:, 0] < nx) & (cell[:, 1] >= 0) & (cell[:, 1] < ny))
+            rows, cell, t_max, step, t_delta, t_exit = (rows[keep], cell[keep], t_max[keep], step[keep],
+                                                        t_delta[keep], t_exit[keep])
+        return best_dist
@@ -0,0 +1,160 @@
+import os
+import hashlib
+import logging
+import numpy as np
+from src.core.fuzzy_inference import ACCEL_OPTIONS, ROTATION_OPTIONS, build_tables, encode, grid_points
+
+# 缓存格式版本，查找表的生成方式或编码改变时递增，使旧缓存自动失效
+CACHE_VERSION = 1
+
+
+class TableCache:
+    def __init__(self, directory="data/table_cache", max_bytes=64 * 1024 * 1024):
+        """
+        以个体内容哈希为键的查找表磁盘缓存。每个条目是一个 int8 的 .npy 文件，保存加速度表与转向表
+        在离散选项中的编号，可以直接内存映射读取；超过容量上限时按最近使用时间淘汰
+        :param directory: str 缓存目录
+        :param max_bytes: int 缓存总大小上限（字节）
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        """
+        遍历缓存目录中的所有条目。多个进程共用同一个缓存目录，遍历时条目可能已被其它进程淘汰，跳过这些条目
+        :return: Iterator[Tuple[str, int, float]] (路径, 大小, 修改时间)
+        """
+        for sub in os.scandir(self.directory):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith(".npy"):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        yield entry.path, stat.st_size, stat.st_mtime
+
+    @staticmethod
+    def key(individual, table_steps):
+        """
+        计算缓存键
+        :param individual: List[float] 个体
+        :param table_steps: Tuple[float, float, float, float] 查找表步长 (speed, front, left, right)
+
+        :return: str 十六进制哈希
+        """
+        digest = hashlib.sha1(np.asarray([CACHE_VERSION, *table_steps], dtype=float).tobytes())
+        digest.update(np.asarray(individual, dtype=float).tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".npy")
+
+    @staticmethod
+    def _shapes(table_steps):
+        """由步长计算加速度表与转向表的形状，与 FuzzyDriver 的网格一致"""
+        speed_step, front_step, left_step, right_step = table_steps
+        return ((len(grid_points(2, speed_step)), len(grid_points(500, front_step))),
+                (len(grid_points(300, left_step)), len(grid_points(300, right_step))))
+
+    def get(self, individual, table_steps):
+        """
+        读取缓存的查找表
+        :return: (accel_table, rotation_table)；个体无法生成查找表时为 (None, None)；未命中返回 None
+        """
+        path = self._path(self.key(individual, table_steps))
+        try:
+            codes = np.load(path, mmap_mode="r")
+            # 更新修改时间，用于按最近使用淘汰
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if codes.size == 0:
+            return None, None
+        accel_shape, rotation_shape = self._shapes(table_steps)
+        n_accel = accel_shape[0] * accel_shape[1]
+        accel_table = ACCEL_OPTIONS[codes[:n_accel]].reshape(accel_shape)
+        rotation_table = ROTATION_OPTIONS[codes[n_accel:]].reshape(rotation_shape)
+        return accel_table, rotation_table
+
+    def put(self, individual, table_steps, accel_table=None, rotation_table=None):
+        """
+        写入查找表，accel_table 为 None 表示该个体无法生成查找表，同样缓存以免重复计算
+        """
+        path = self._path(self.key(individual, table_steps))
+        if accel_table is None:
+            codes = np.zeros(0, dtype=np.int8)
+        else:
+            codes = np.concatenate([encode(np.ravel(accel_table), ACCEL_OPTIONS),
+                                    encode(np.ravel(rotation_table), ROTATION_OPTIONS)])
+
+        # 先写临时文件再替换，多个进程同时写入同一条目也不会留下损坏的文件
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, codes)
+        size = os.path.getsize(tmp_path)
+        try:
+            # 覆盖已有条目（如其它进程刚写入同一条目）时只计入大小之差
+            size -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.replace(tmp_path, path)
+        self.size += size
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """按最近使用时间从旧到新删除条目，直到总大小降到上限的 90% 以下"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self.size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for path, size, _ in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # 已被其它进程删除，大小也已不计入
+                self.size -= size
+                continue
+            self.size -= size
+            removed += 1
+        logging.info(f"查找表缓存超过上限，淘汰 {removed} 个条目")
+
+    def build_tables(self, individuals, speed_step=0.2, front_step=20, left_step=20, right_step=20, **kwargs):
+        """
+        与 fuzzy_inference.build_tables 相同，已缓存的个体直接读取，其余个体一次性批量生成后写入缓存
+        :param individuals: List[List[float]] 个体列表
+        :param kwargs: 传给 fuzzy_inference.build_tables 的其他参数，如子表缓存
+
+        :return: (accel_tables (N, speed, front), rotation_tables (N, left, right), valid (N,))
+        """
+        table_steps = (speed_step, front_step, left_step, right_step)
+        accel_shape, rotation_shape = self._shapes(table_steps)
+        n = len(individuals)
+        accel_tables = np.zeros((n, *accel_shape))
+        rotation_tables = np.zeros((n, *rotation_shape))
+        valid = np.zeros(n, dtype=bool)
+
+        missing = []
+        for i, individual in enumerate(individuals):
+            cached = self.get(individual, table_steps)
+            if cached is None:
+                missing.append(i)
+            elif cached[0] is not None:
+                accel_tables[i], rotation_tables[i] = cached
+                valid[i] = True
+
+        if missing:
+            built = build_tables([individuals[i] for i in missing], *table_steps, **kwargs)
+            for i, accel_table, rotation_table, ok in zip(missing, *built):
+                if ok:
+                    accel_tables[i], rotation_tables[i], valid[i] = accel_table, rotation_table, True
+                    self.put(individuals[i], table_steps, accel_table, rotation_table)
+                else:
+                    self.put(individuals[i], table_steps)
+        return accel_tables, rotation_tables, valid
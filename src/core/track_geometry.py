@@ -0,0 +1,251 @@
+import math
+import numpy as np
+from src.core.spatial_grid import EdgeGrid
+from src.core.centerline import Centerline
+from src.util.track_file_util import load_track_data, load_track_start
+
+# 传感器射线方向：前方、左侧、右侧（与 Car.find_nearest_obstacle 一致）
+SENSOR_DIRECTIONS = np.array([0, 90, -90])
+# 射线长度，x 方向取屏幕宽度，y 方向取屏幕高度
+WIDTH, HEIGHT = 1000, 800
+# 边数达到该值时自动启用网格索引，边数较少时直接暴力求交更快
+GRID_MIN_EDGES = 200
+
+
+def ccw(P, Q, R):
+    """与 Car.line_intersection 中的 ccw 相同，支持广播，最后一维为 (x, y)"""
+    return (R[..., 1] - P[..., 1]) * (Q[..., 0] - P[..., 0]) > (Q[..., 1] - P[..., 1]) * (R[..., 0] - P[..., 0])
+
+
+def segment_intersections(A, B, C, D, CD=None):
+    """
+    向量化的线段 AB 与 CD 相交测试，判定规则与 Car.line_intersection 相同
+    :param A, B: np.ndarray (..., 2) 线段 AB 的端点
+    :param C, D: np.ndarray (..., 2) 线段 CD 的端点
+    :param CD: np.ndarray (..., 2) 预先计算好的 D - C，可选
+
+    :return: (np.ndarray 相交掩码, np.ndarray 参数 t)，t 与 Car.line_intersection 的计算方式相同，
+             其符号与 AB 方向相反，交点到 A 的距离为 |t| * |AB|
+    """
+    hit = (ccw(A, C, D) != ccw(B, C, D)) & (ccw(A, B, C) != ccw(A, B, D))
+    if CD is None:
+        CD = D - C
+    dx1, dy1 = B[..., 0] - A[..., 0], B[..., 1] - A[..., 1]
+    dx2, dy2 = CD[..., 0], CD[..., 1]
+    denom = dx1 * dy2 - dy1 * dx2
+    hit &= denom != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = ((A[..., 0] - C[..., 0]) * dy2 - (A[..., 1] - C[..., 1]) * dx2) / denom
+    return hit, t
+
+
+class TrackGeometry:
+    def __init__(self, track_outer, track_inner, check_line=(), use_grid=None, cell_size=None, centerline=False,
+                 start_pos=None, start_angle=0):
+        """
+        预编译的赛道几何数据，由 load_track_data 的输出构建一次，之后的传感与碰撞检测都基于连续数组完成
+        :param track_outer: List[Tuple[float, float]] 赛道外边界顶点
+        :param track_inner: List[Tuple[float, float]] 赛道内边界顶点
+        :param check_line: List[Tuple[Tuple[float, float], Tuple[float, float]]] 检查线坐标
+        :param use_grid: bool 是否使用均匀网格索引，默认在边数不少于 GRID_MIN_EDGES 时启用
+        :param cell_size: float 网格边长，默认由 EdgeGrid 根据边长自动选择
+        :param centerline: bool 是否预计算赛道中心线，设置后车辆会记录沿赛道的连续进度
+        :param start_pos: List[float] 车辆起点，没有检查线的赛道用它确定中心线的前进方向
+        :param start_angle: float 车辆初始朝向
+        """
+        self.track_outer = track_outer
+        self.track_inner = track_inner
+        self.check_line = check_line
+        self.start_pos = start_pos
+        self.start_angle = start_angle
+
+        # 所有边界线段首尾相连存放，polygon_slices 记录每个多边形对应的区间
+        starts, ends, self.polygon_slices = [], [], []
+        offset = 0
+        for polygon in (track_outer, track_inner):
+            points = np.asarray(polygon, dtype=float).reshape(-1, 2)
+            starts.append(points)
+            ends.append(np.roll(points, -1, axis=0))
+            self.polygon_slices.append(slice(offset, offset + len(points)))
+            offset += len(points)
+        self.edge_start = np.ascontiguousarray(np.concatenate(starts))
+        self.edge_end = np.ascontiguousarray(np.concatenate(ends))
+        self.edge_dir = self.edge_end - self.edge_start  # 边的方向向量
+        self.edge_min = np.minimum(self.edge_start, self.edge_end)  # 边的包围盒
+        self.edge_max = np.maximum(self.edge_start, self.edge_end)
+
+        # 均匀网格索引，使每步的开销不随赛道顶点数增长
+        if use_grid is None:
+            use_grid = len(self.edge_start) >= GRID_MIN_EDGES
+        self.grid = EdgeGrid(self.edge_start, self.edge_end, cell_size) if use_grid and len(self.edge_start) else None
+
+        # 检查线
+        lines = np.asarray(check_line, dtype=float).reshape(-1, 2, 2)
+        self.check_start = np.ascontiguousarray(lines[:, 0])
+        self.check_end = np.ascontiguousarray(lines[:, 1])
+
+        # 赛道中心线，用于计算连续的进度适应度
+        self.centerline = None
+        if centerline:
+            self.centerline = Centerline(track_outer, track_inner, check_line, start_pos=start_pos,
+                                         start_angle=start_angle)
+
+    @classmethod
+    def from_file(cls, file_path, **kwargs):
+        """从赛道文件构建几何数据（包括文件中记录的车辆起点），kwargs 传给构造函数"""
+        start_pos, start_angle = load_track_start(file_path)
+        kwargs.setdefault("start_pos", start_pos)
+        kwargs.setdefault("start_angle", start_angle)
+        return cls(*load_track_data(file_path), **kwargs)
+
+    def contains(self, points):
+        """
+        判断点是否在赛道内（外边界之内、内边界之外），使用奇偶规则
+        :param points: np.ndarray (n, 2) 点坐标
+
+        :return: np.ndarray (n,) bool
+        """
+        points = np.asarray(points, dtype=float)
+        px, py = points[:, 0, None], points[:, 1, None]
+        inside = []
+        for polygon in self.polygon_slices:
+            (x1, y1), (x2, y2) = self.edge_start[polygon].T, self.edge_end[polygon].T
+            straddle = (y1 > py) != (y2 > py)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cross_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+            inside.append(np.count_nonzero(straddle & (px < cross_x), axis=1) % 2 == 1)
+        return inside[0] & ~inside[1]
+
+    def sense(self, positions, angles):
+        """
+        批量计算多辆车前方、左侧、右侧到赛道边界的最近距离
+        :param positions: np.ndarray (n, 2) 车辆位置
+        :param angles: np.ndarray (n,) 车辆朝向角度
+
+        :return: np.ndarray (n, 3) 前方、左侧、右侧距离，未命中为 inf
+        """
+        positions = np.asarray(positions, dtype=float)
+        rad = np.radians(np.asarray(angles, dtype=float)[:, None] + SENSOR_DIRECTIONS)  # (n, 3)
+        ends = np.stack([positions[:, 0, None] + np.cos(rad) * WIDTH,
+                         positions[:, 1, None] - np.sin(rad) * HEIGHT], axis=-1)  # (n, 3, 2)
+        return self._cast_rays(positions[:, None, :], ends)
+
+    def ray_distances(self, positions, angles):
+        """
+        批量计算沿各自方向的单条射线到赛道边界的最近距离
+        :param positions: np.ndarray (n, 2) 射线起点
+        :param angles: np.ndarray (n,) 射线方向角度
+
+        :return: np.ndarray (n,) 距离，未命中为 inf
+        """
+        positions = np.asarray(positions, dtype=float)
+        rad = np.radians(np.asarray(angles, dtype=float))
+        ends = np.stack([positions[:, 0] + np.cos(rad) * WIDTH,
+                         positions[:, 1] - np.sin(rad) * HEIGHT], axis=-1)
+        return self._cast_rays(positions[:, None, :], ends[:, None, :])[:, 0]
+
+    def sensor_distances(self, pos, angle):
+        """
+        计算单辆车前方、左侧、右侧到赛道边界的最近距离，射线终点与 Car.find_nearest_obstacle 的计算方式相同
+        :return: Tuple[float, float, float]
+        """
+        ends = []
+        for direction in (0, 90, -90):
+            rad = math.radians(angle + direction)
+            ends.append((pos[0] + math.cos(rad) * WIDTH, pos[1] - math.sin(rad) * HEIGHT))
+        start = np.array([[[pos[0], pos[1]]]], dtype=float)
+        front, left, right = self._cast_rays(start, np.array([ends]))[0]
+        return float(front), float(left), float(right)
+
+    def _cast_rays(self, starts, ends):
+        """
+        射线与赛道边界求交，返回最近交点的距离
+        :param starts: np.ndarray (n, 1, 2) 射线起点
+        :param ends: np.ndarray (n, k, 2) 射线终点
+
+        :return: np.ndarray (n, k)
+        """
+        if self.grid is not None:
+            n, k = ends.shape[:2]
+            starts = np.broadcast_to(starts, ends.shape).reshape(-1, 2)
+            return self.grid.traverse(starts, ends.reshape(-1, 2), self._intersect_edges).reshape(n, k)
+
+        A = starts[:, :, None, :]
+        B = ends[:, :, None, :]
+        hit, t = segment_intersections(A, B, self.edge_start, self.edge_end, self.edge_dir)  # (n, k, E)
+        with np.errstate(invalid="ignore"):
+            ix = A[..., 0] + t * (B[..., 0] - A[..., 0])
+            iy = A[..., 1] + t * (B[..., 1] - A[..., 1])
+            dist = np.sqrt((A[..., 0] - ix) ** 2 + (A[..., 1] - iy) ** 2)
+        return np.where(hit, dist, np.inf).min(axis=-1, initial=np.inf)
+
+    def _intersect_edges(self, A, B, edge_idx):
+        """
+        网格遍历时的求交回调：线段 AB 与 edge_idx 指定的边求交
+        :param A, B: np.ndarray (r, 2) 线段端点
+        :param edge_idx: np.ndarray (r, K) 候选边编号
+
+        :return: (相交掩码, 交点在 AB 上的参数, 交点距离)，形状均为 (r, K)
+        """
+        A = A[:, None, :]
+        B = B[:, None, :]
+        hit, t = segment_intersections(A, B, self.edge_start[edge_idx], self.edge_end[edge_idx],
+                                       self.edge_dir[edge_idx])
+        with np.errstate(invalid="ignore"):
+            ix = A[..., 0] + t * (B[..., 0] - A[..., 0])
+            iy = A[..., 1] + t * (B[..., 1] - A[..., 1])
+            dist = np.sqrt((A[..., 0] - ix) ** 2 + (A[..., 1] - iy) ** 2)
+        # segment_intersections 返回的 t 与 AB 方向相反，取负得到沿 AB 的参数
+        return hit, -t, dist
+
+    def crossed_boundary(self, last_pos, pos):
+        """
+        判断单辆车从 last_pos 移动到 pos 时是否穿过赛道边界，先用包围盒筛掉不可能相交的边
+        :return: bool
+        """
+        if self.grid is not None:
+            return bool(self.crossed_boundary_batch([last_pos], [pos])[0])
+
+        x1, y1 = last_pos
+        x2, y2 = pos
+        candidates = ((self.edge_max[:, 0] >= min(x1, x2)) & (self.edge_min[:, 0] <= max(x1, x2)) &
+                      (self.edge_max[:, 1] >= min(y1, y2)) & (self.edge_min[:, 1] <= max(y1, y2)))
+        if not candidates.any():
+            return False
+        A = np.array([x1, y1], dtype=float)
+        B = np.array([x2, y2], dtype=float)
+        hit, _ = segment_intersections(A, B, self.edge_start[candidates], self.edge_end[candidates],
+                                       self.edge_dir[candidates])
+        return bool(hit.any())
+
+    def crossed_boundary_batch(self, last_positions, positions):
+        """
+        批量判断多辆车是否穿过赛道边界
+        :param last_positions: np.ndarray (n, 2) 上一时刻位置
+        :param positions: np.ndarray (n, 2) 当前位置
+
+        :return: np.ndarray (n,) bool
+        """
+        if self.grid is not None:
+            # 只检测运动线段经过的网格
+            distances = self.grid.traverse(np.asarray(last_positions, dtype=float),
+                                           np.asarray(positions, dtype=float), self._intersect_edges)
+            return np.isfinite(distances)
+
+        A = np.asarray(last_positions, dtype=float)[:, None, :]
+        B = np.asarray(positions, dtype=float)[:, None, :]
+        hit, _ = segment_intersections(A, B, self.edge_start, self.edge_end, self.edge_dir)
+        return hit.any(axis=-1)
+
+    def crossed_checkpoint_batch(self, checkpoint_indices, last_positions, positions):
+        """
+        批量判断多辆车是否穿过各自的下一条检查线
+        :param checkpoint_indices: np.ndarray (n,) 每辆车的下一条检查线编号
+
+        :return: np.ndarray (n,) bool
+        """
+        if len(self.check_start) == 0:
+            return np.zeros(len(checkpoint_indices), dtype=bool)
+        hit, _ = segment_intersections(np.asarray(last_positions, dtype=float), np.asarray(positions, dtype=float),
+                                       self.check_start[checkpoint_indices], self.check_end[checkpoint_indices])
+        return hit
@@ -0,0 +1,288 @@
+import logging
+import numpy as np
+from src.core.car import Car
+from src.core.fuzzy import FuzzyDriver
+from src.core.population import Population
+from src.core.fuzzy_inference import LRUCache, build_tables
+from src.core.ga_fuzzy import random_individual, repair_membership_functions, generate_offspring_matrix, \
+    matrix_to_individuals
+from src.util.profile_util import PROFILER
+
+# 遗传算法参数（与 train_map.py 保持一致）
+STRUCTURE = [5, 5, 5]
+FIXED_INDICES = [0, 1, 13, 14, 15, 16, 28, 29, 30, 31, 43, 44]
+LOWER_BOUNDS = [0] * 60
+UPPER_BOUNDS = [2] * 15 + [500] * 15 + [300] * 30
+BOUNDS = (LOWER_BOUNDS, UPPER_BOUNDS)
+# 查找表步长 (speed, front, left, right)，与 FuzzyDriver 的默认值一致
+TABLE_STEPS = (0.2, 20, 20, 20)
+
+# 进程内的子表缓存：交叉后保持不变的一半基因直接复用父代的子表
+ACCEL_CACHE = LRUCache()
+ROTATION_CACHE = LRUCache()
+
+
+def init_individuals(elite, car_max_num):
+    """
+    生成第一代个体：随机个体补足数量，再加上之前保存的 elite
+    :param elite: List[List[float]] 之前保存的精英个体
+    :param car_max_num: int 每代车辆数量
+
+    :return: List[List[float]] 第一代个体
+    """
+    individuals = []
+    for _ in range(car_max_num - len(elite)):
+        individual = random_individual()
+        # 修复模糊隶属函数参数
+        individuals.append(repair_membership_functions(individual, STRUCTURE, FIXED_INDICES))
+    individuals.extend(elite)
+    return individuals
+
+
+def _build_tables(individuals, table_cache=None, table_steps=TABLE_STEPS):
+    """批量生成查找表，优先读取磁盘缓存（如果设置）与进程内的子表缓存"""
+    if table_cache is not None:
+        return table_cache.build_tables(individuals, *table_steps,
+                                        accel_cache=ACCEL_CACHE, rotation_cache=ROTATION_CACHE)
+    return build_tables(individuals, *table_steps, accel_cache=ACCEL_CACHE, rotation_cache=ROTATION_CACHE)
+
+
+def build_drivers(individuals, table_cache=None, table_steps=TABLE_STEPS, interpolate=False):
+    """
+    一次性为所有个体生成模糊控制器，生成失败的个体会被跳过
+    :param individuals: List[List[float]] 个体列表
+    :param table_cache: TableCache 查找表磁盘缓存，可选
+    :param table_steps: Tuple[float, float, float, float] 查找表步长 (speed, front, left, right)
+    :param interpolate: bool 查表时是否双线性插值
+
+    :return: (np.ndarray (N,) bool 每个个体是否生成成功, List[FuzzyDriver] 成功生成的个体对应的模糊控制器)
+    """
+    with PROFILER.phase("building", len(individuals)):
+        accel_tables, rotation_tables, valid = _build_tables(individuals, table_cache, table_steps)
+        if not valid.all():
+            logging.info(f"{int((~valid).sum())} 辆车辆生成失败: 模糊隶属函数参数不合法或无法解模糊")
+        drivers = [FuzzyDriver.from_tables(accel_table, rotation_table, *table_steps, individual=individual,
+                                           interpolate=interpolate)
+                   for individual, accel_table, rotation_table, ok
+                   in zip(individuals, accel_tables, rotation_tables, valid) if ok]
+    return valid, drivers
+
+
+def build_cars(individuals, pos, angle=0, max_speed=2, table_cache=None, table_steps=TABLE_STEPS,
+               interpolate=False, stall_steps=None):
+    """
+    根据个体生成车辆，生成失败的个体会被跳过
+    :param individuals: List[List[float]] 个体列表
+    :param pos: List[float] 车辆初始位置
+    :param angle: float 车辆初始朝向
+    :param max_speed: float 最大速度
+    :param table_cache: TableCache 查找表磁盘缓存，可选
+    :param table_steps: Tuple[float, float, float, float] 查找表步长
+    :param interpolate: bool 查表时是否双线性插值
+    :param stall_steps: int 连续多少步没有通过新的检查线就淘汰，None 表示不检测
+
+    :return: List[Car] 车辆列表
+    """
+    valid, drivers = build_drivers(individuals, table_cache, table_steps, interpolate)
+    valid_individuals = [individual for individual, ok in zip(individuals, valid) if ok]
+    return [Car(individual=individual, pos=pos, angle=angle, max_speed=max_speed, driver=driver,
+                stall_steps=stall_steps)
+            for individual, driver in zip(valid_individuals, drivers)]
+
+
+def build_population(individuals, geometry, pos, angle=0, max_speed=2, table_cache=None, table_steps=TABLE_STEPS,
+                     **kwargs):
+    """
+    根据个体生成向量化的车辆群体，所有个体的查找表一次性批量生成，生成失败的个体会被跳过
+    :param individuals: List[List[float]] 个体列表
+    :param geometry: TrackGeometry 预编译的赛道几何数据
+    :param table_cache: TableCache 查找表磁盘缓存，可选
+    :param table_steps: Tuple[float, float, float, float] 查找表步长
+    :param kwargs: 传给 Population 的其他参数，如 sensor_field、interpolate_tables、stall_steps
+
+    :return: (np.ndarray (N,) bool 每个个体是否生成成功, Population 成功生成的个体组成的车辆群体)
+    """
+    with PROFILER.phase("building", len(individuals)):
+        accel_tables, rotation_tables, valid = _build_tables(individuals, table_cache, table_steps)
+        if not valid.all():
+            logging.info(f"{int((~valid).sum())} 辆车辆生成失败: 模糊隶属函数参数不合法或无法解模糊")
+        population = Population(accel_tables[valid], rotation_tables[valid], table_steps, geometry,
+                                pos=pos, angle=angle, max_speed=max_speed, **kwargs)
+    return valid, population
+
+
+def lap_fitness(check_line, target_laps):
+    """
+    完成 target_laps 圈对应的适应度（每通过一条检查线适应度加 1）
+    :return: int 没有检查线或不设目标时为 None
+    """
+    if not target_laps or not len(check_line):
+        return None
+    return target_laps * len(check_line)
+
+
+def _run_population(population, max_steps, target_laps=None, on_step=None):
+    """
+    run_population_generation 与 trace_population_generation 共用的仿真循环
+    :param on_step: Callable() 每步之后调用，可选
+
+    :return: (int 实际执行的步数, bool 是否因最好的车辆跑完目标圈数而结束)
+    """
+    target = lap_fitness(population.geometry.check_start, target_laps)
+    progress_target = None
+    if target is None and target_laps and population.centerline is not None:
+        progress_target = target_laps * population.centerline.length
+    for step in range(max_steps):
+        population.step()
+        if on_step is not None:
+            on_step()
+        # 所有车辆都已出局，或最好的车辆已跑完目标圈数，提前结束本代
+        reached = bool(len(population.fitness) and (
+            (target and population.fitness.max() >= target) or
+            (progress_target and population.progress.max() >= progress_target)))
+        if reached or not population.alive.any():
+            return step + 1, reached
+    return max_steps, False
+
+
+def run_population_generation(population, max_steps, target_laps=None):
+    """
+    按固定步数推进向量化车辆群体的仿真
+    :param population: Population 车辆群体
+    :param max_steps: int 每代最多仿真步数
+    :param target_laps: int 最好的车辆跑完多少圈后提前结束本代，None 表示不设目标；
+                        没有检查线的赛道按沿中心线的进度判断圈数
+
+    :return: int 实际执行的步数
+    """
+    return _run_population(population, max_steps, target_laps)[0]
+
+
+def trace_population_generation(population, max_steps, target_laps=None, time_weight=0):
+    """
+    与 run_population_generation 相同地推进仿真，并记录每一步之后的适应度。
+    一代个体分批仿真时，每批只知道自己的车辆何时跑完目标圈数，整代的结束步数要等所有批次都结束后
+    由 merge_traces 确定，再按它截取每批的记录
+    :param time_weight: float 记录 scores(time_weight) 时的用时惩罚权重
+
+    :return: (np.ndarray (steps, N) 每步之后的 scores, np.ndarray (steps, N) 每步之后通过的检查线数,
+              bool 是否因跑完目标圈数而结束)
+    """
+    scores, fitness = [], []
+
+    def record():
+        scores.append(population.scores(time_weight))
+        fitness.append(population.fitness.copy())
+
+    _, reached = _run_population(population, max_steps, target_laps, record)
+    n = len(population.fitness)
+    return np.array(scores, dtype=float).reshape(-1, n), np.array(fitness, dtype=int).reshape(-1, n), reached
+
+
+def run_generation(cars, track, check_line, max_steps, target_laps=None):
+    """
+    不绘制画面，按固定步数推进一代车辆的仿真
+    :param cars: List[Car] 本代车辆
+    :param track: TrackGeometry 或 List[List[Tuple[float, float]]] 赛道坐标
+    :param check_line: List[Tuple[Tuple[float, float], Tuple[float, float]]] 检查线坐标
+    :param max_steps: int 每代最多仿真步数
+    :param target_laps: int 最好的车辆跑完多少圈后提前结束本代，None 表示不设目标
+
+    :return: int 实际执行的步数
+    """
+    return _run_cars(cars, track, check_line, max_steps, target_laps)[0]
+
+
+def _run_cars(cars, track, check_line, max_steps, target_laps=None, on_step=None):
+    """
+    run_generation 与 trace_generation 共用的仿真循环
+    :param on_step: Callable() 每步之后调用，可选
+
+    :return: (int 实际执行的步数, bool 是否因最好的车辆跑完目标圈数而结束)
+    """
+    target = lap_fitness(check_line, target_laps)
+    for step in range(max_steps):
+        alive = False
+        for car in cars:
+            if car.update_info_fuzzy(track, check_line):
+                alive = True
+        if on_step is not None:
+            on_step()
+        # 所有车辆都已出局，或最好的车辆已跑完目标圈数，提前结束本代
+        reached = bool(target and cars and max(car.fitness for car in cars) >= target)
+        if reached or not alive:
+            return step + 1, reached
+    return max_steps, False
+
+
+def trace_generation(cars, track, check_line, max_steps, target_laps=None, time_weight=0):
+    """
+    与 run_generation 相同地推进仿真，并记录每一步之后的适应度，用法见 trace_population_generation
+    :return: (np.ndarray (steps, N) 每步之后的 score, np.ndarray (steps, N) 每步之后通过的检查线数,
+              bool 是否因跑完目标圈数而结束)
+    """
+    scores, fitness = [], []
+
+    def record():
+        scores.append([car.score(time_weight) for car in cars])
+        fitness.append([car.fitness for car in cars])
+
+    _, reached = _run_cars(cars, track, check_line, max_steps, target_laps, record)
+    n = len(cars)
+    return np.array(scores, dtype=float).reshape(-1, n), np.array(fitness, dtype=int).reshape(-1, n), reached
+
+
+def merge_traces(traces):
+    """
+    按整代的结束步数截取各批的记录，结果与整代一起仿真相同：整代在最先有车辆跑完目标圈数的那一步结束，
+    没有车辆跑完时在所有批次都结束（车辆全部出局或达到最大步数）时结束；提前出局的批次状态不再变化，取最后一步
+    :param traces: List[Tuple[np.ndarray, np.ndarray, bool]] 每批的 trace_population_generation 或 trace_generation 结果
+
+    :return: (int 整代实际执行的步数, List[Tuple[np.ndarray, np.ndarray]] 每批在该步之后的 (scores, 通过的检查线数))
+    """
+    reached = [len(scores) for scores, _, ok in traces if ok]
+    steps = min(reached) if reached else max((len(scores) for scores, _, _ in traces), default=0)
+    results = []
+    for scores, fitness, _ in traces:
+        if not len(scores):
+            results.append((np.zeros(scores.shape[1:]), np.zeros(fitness.shape[1:], dtype=int)))
+            continue
+        row = min(steps, len(scores)) - 1
+        results.append((scores[row], fitness[row]))
+    return steps, results
+
+
+def select_elite(individuals, fitnesses, elite_num=10):
+    """
+    筛选适应度最高的若干个不重复个体
+    :param individuals: List[List[float]] 本代个体
+    :param fitnesses: List[float] 与个体一一对应的适应度
+    :param elite_num: int 精英数量
+
+    :return: List[List[float]] 精英个体
+    """
+    elite = []
+    order = sorted(range(len(individuals)), key=lambda i: fitnesses[i], reverse=True)
+    for i in order:
+        if len(elite) >= elite_num:
+            break
+        if individuals[i] not in elite:
+            elite.append(individuals[i])
+    return elite
+
+
+def next_individuals(elite, car_max_num, crossover_rate=0.8, mutation_rate=0.2, mutation_scale=0.1, rng=None):
+    """
+    由精英个体繁衍出下一代个体（子代 + 精英），子代在种群矩阵上一次生成
+    :param elite: List[List[float]] 精英个体
+    :param car_max_num: int 每代车辆数量
+    :param rng: np.random.Generator 随机数生成器，默认新建一个
+
+    :return: List[List[float]] 下一代个体
+    """
+    offspring = generate_offspring_matrix(population=elite, n_offspring=car_max_num - len(elite),
+                                          structure=STRUCTURE, fixed_indices=FIXED_INDICES,
+                                          bounds=BOUNDS, crossover_rate=crossover_rate,
+                                          mutation_rate=mutation_rate, mutation_scale=mutation_scale,
+                                          rng=rng if rng is not None else np.random.default_rng())
+    return matrix_to_individuals(offspring, FIXED_INDICES) + list(elite)
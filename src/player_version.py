@@ -7,7 +7,9 @@ import sys
 # 添加根目录到 sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.util.track_file_util import load_track_data
+from src.core.track_geometry import TrackGeometry
 from src.core.car import Car
+from src.ui.track_renderer import TrackRenderer
 
 # 初始化 Pygame
 pygame.init()
@@ -32,7 +34,9 @@ car = Car(pos=[200, 750], angle=0, max_speed=2)
 
 # 加载赛道数据
 track_outer, track_inner, check_line = load_track_data("src/config/track_info/player.json")
-track = [track_outer, track_inner]
+track = TrackGeometry(track_outer, track_inner, check_line)
+# 赛道与终点只绘制一次，每帧只刷新车辆所在的区域
+renderer = TrackRenderer(screen, track_outer, track_inner, check_line[:1], check_width=5)
 
 # 创建 data 文件夹
 data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data/player')
@@ -44,7 +48,7 @@ player_data = []
 
 running = True
 while running:
-    screen.fill(WHITE)
+    renderer.begin_frame()
     
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -54,7 +58,7 @@ while running:
     car_points_player = car.update_info_player(keys, track, check_line)
     if car_points_player:
         # 绘制车辆
-        pygame.draw.polygon(screen, BLUE, car_points_player)
+        renderer.draw_polygon(BLUE, car_points_player)
  
     # 碰撞检测
     if not car.alive:
@@ -75,12 +79,7 @@ while running:
     accel = "accelerate" if keys[pygame.K_SPACE] else "decelerate"
     player_data.append([car.speed, car.front_dist, car.left_dist, car.right_dist, action, accel])
     
-    # 绘制赛道和终点
-    pygame.draw.polygon(screen, BLACK, track_outer, 3)
-    pygame.draw.polygon(screen, BLACK, track_inner, 3)
-    pygame.draw.line(screen, GREEN, check_line[0][0], check_line[0][1], 5)
-    
-    pygame.display.flip()
+    renderer.present()
     pygame.time.delay(10)
     
 pygame.quit()
\ No newline at end of file
@@ -1,15 +1,30 @@
 import pygame
 import os
+import argparse
 import sys
 # 添加根目录到 sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.core.car import Car
 from src.util.track_file_util import load_track_data
+from src.core.track_geometry import TrackGeometry
+from src.core.table_cache import TableCache
 from src.util.individual_file_util import read_individual
+from src.util.hall_of_fame_util import HallOfFame
 from src.core.ga_fuzzy import random_individual, repair_membership_functions
 from src.ui.end_ui import win_ui, lose_ui
 from src.ui.init_ui import init_ui_vs
 from src.ui.state_ui import state_ui_vs
+from src.ui.track_renderer import TrackRenderer
+from src.ui.hud import clear_caches
+
+# 命令行参数
+parser = argparse.ArgumentParser(description="玩家对战模式")
+parser.add_argument("--elite-file", default="data/ga_train/elite_individual.txt", help="精英个体文件路径")
+parser.add_argument("--hall-of-fame", default=None,
+                    help="从该名人堂目录中选择这条赛道上最好的个体（没有时选择全部赛道中最好的个体），默认读取精英个体文件")
+parser.add_argument("--fitness", choices=["progress", "checkpoints"], default="progress",
+                    help="从名人堂中选择时比较哪种适应度计算方式训练出的个体")
+args = parser.parse_args()
 
 # 初始化 Pygame
 pygame.init()
@@ -33,8 +48,12 @@ while running:
     # 玩家操作的车辆参数
     player_car = Car(pos=[180, 750], angle=0, max_speed=2)
 
-    # 读取之前的elite    
-    elite = read_individual("data/ga_train/elite_individual.txt")
+    # 读取之前的elite；指定名人堂时优先选择名人堂中这条赛道上最好的个体，其次是历史最好的个体
+    best = None
+    if args.hall_of_fame:
+        hall_of_fame = HallOfFame(args.hall_of_fame)
+        best = hall_of_fame.best("vs", args.fitness) or hall_of_fame.best(kind=args.fitness)
+    elite = [best] if best else read_individual(args.elite_file)
 
     # 模糊控制操作的车辆参数
     structure = [5, 5, 5]
@@ -43,7 +62,8 @@ while running:
     upper_bounds = [2] * 15 + [500] * 15 + [300] * 30
     bounds = (lower_bounds, upper_bounds)
     if elite:
-        fuzzy_car = Car(individual=elite[0], pos=[180, 750], angle=0, max_speed=2)
+        # 查找表缓存：之前运行过的 elite 不再重新生成查找表
+        fuzzy_car = Car(individual=elite[0], pos=[180, 750], angle=0, max_speed=2, table_cache=TableCache())
     else:
         individual = random_individual()
         # 修复模糊隶属函数参数
@@ -52,10 +72,12 @@ while running:
 
     # 加载赛道数据
     track_outer, track_inner, check_line = load_track_data("src/config/track_info/vs.json")
-    track = [track_outer, track_inner]
+    track = TrackGeometry(track_outer, track_inner, check_line)
+    # 赛道与检查线只绘制一次，每帧只刷新车辆与状态栏所在的区域
+    renderer = TrackRenderer(screen, track_outer, track_inner, check_line)
 
     while True:
-        screen.fill(WHITE)
+        renderer.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -66,25 +88,17 @@ while running:
         car_points_fuzzy = fuzzy_car.update_info_fuzzy(track, check_line)
         if car_points_fuzzy:
             # 绘制车辆
-            pygame.draw.polygon(screen, RED, car_points_fuzzy)
+            renderer.draw_polygon(RED, car_points_fuzzy)
             
         # 人类部分
         keys = pygame.key.get_pressed()
         car_points_player = player_car.update_info_player(keys, track, check_line)
         if car_points_player:
             # 绘制车辆
-            pygame.draw.polygon(screen, BLUE, car_points_player)
-
-        # 绘制赛道和终点
-        pygame.draw.polygon(screen, BLACK, track_outer, 3)
-        pygame.draw.polygon(screen, BLACK, track_inner, 3)
-        
-        # 绘制检查线
-        for line in check_line:
-            pygame.draw.line(screen, GREEN, line[0], line[1], 2)
+            renderer.draw_polygon(BLUE, car_points_player)
             
         # 绘制状态信息
-        state_ui_vs(screen)
+        renderer.add_dirty(state_ui_vs(screen))
         
         # 检测是否到达终点
         if player_car.fitness >= 1:
@@ -102,7 +116,9 @@ while running:
             running = win_ui(screen, WIDTH, HEIGHT)
             break
             
-        pygame.display.flip()
+        renderer.present()
         pygame.time.delay(7)
         
-pygame.quit()
\ No newline at end of file
+# 字体与文字图像的缓存属于这个窗口，关闭前清空
+clear_caches()
+pygame.quit()
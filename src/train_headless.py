@@ -0,0 +1,221 @@
+import argparse
+import time
+import os
+import sys
+import random
+import logging
+import numpy as np
+# 添加根目录到 sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.trainer import (TABLE_STEPS, init_individuals, build_cars, build_population, run_generation,
+                              run_population_generation, select_elite, next_individuals)
+from src.core.parallel_eval import ParallelEvaluator
+from src.core.multi_track import AGGREGATES, MultiTrackEvaluator
+from src.util.individual_file_util import read_individual, save_individual
+from src.util.checkpoint_util import CheckpointWriter, load_checkpoint, load_generator, set_random_state
+from src.util.hall_of_fame_util import HallOfFame, track_name
+from src.util.profile_util import PROFILER
+from src.core.track_geometry import TrackGeometry
+from src.core.sensor_field import SensorField
+from src.core.table_cache import TableCache
+
+# 设置日志
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# 影响训练结果的参数，保存在检查点中，恢复训练时以检查点为准，保证与不中断的训练完全一致
+RESUME_PARAMS = ["track", "tracks", "aggregate", "max_steps", "stall_steps", "target_laps", "fitness", "time_weight",
+                 "cars", "elite_num", "crossover_rate", "mutation_rate", "mutation_scale", "start_pos", "start_angle",
+                 "sensors", "table_steps", "interpolate_tables"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="无界面训练模式：按仿真步数限制每一代，不依赖 pygame")
+    parser.add_argument("--track", default="src/config/track_info/train.json", help="赛道文件路径")
+    parser.add_argument("--tracks", nargs="+", default=None,
+                        help="多赛道评估：每个个体在这些赛道上分别仿真，适应度换算成圈数后按 --aggregate 汇总；"
+                             "设置后忽略 --track，起点取自赛道文件，只支持 population 引擎")
+    parser.add_argument("--aggregate", choices=list(AGGREGATES), default="mean", help="多赛道适应度的汇总方式")
+    parser.add_argument("--elite-file", default="data/ga_train/elite_individual.txt", help="精英个体文件路径")
+    parser.add_argument("--generations", type=int, default=100, help="遗传算法执行多少代")
+    parser.add_argument("--max-steps", type=int, default=6000, help="每代最多仿真多少步")
+    parser.add_argument("--stall-steps", type=int, default=1000,
+                        help="连续多少步没有通过新的检查线就淘汰该车辆，0 表示不检测")
+    parser.add_argument("--target-laps", type=int, default=3,
+                        help="最好的车辆跑完多少圈后提前结束本代，0 表示不设目标")
+    parser.add_argument("--fitness", choices=["progress", "checkpoints"], default="progress",
+                        help="选择用的适应度：progress 为沿赛道中心线的连续进度，checkpoints 为通过的检查线数")
+    parser.add_argument("--time-weight", type=float, default=0,
+                        help="到达最近一条检查线所用步数的惩罚权重（仅 progress），0 表示不考虑用时")
+    parser.add_argument("--cars", type=int, default=50, help="每代车辆数量")
+    parser.add_argument("--elite-num", type=int, default=10, help="每代保留的精英数量")
+    parser.add_argument("--crossover-rate", type=float, default=0.8, help="交叉概率")
+    parser.add_argument("--mutation-rate", type=float, default=0.2, help="每个基因的变异概率")
+    parser.add_argument("--mutation-scale", type=float, default=0.1, help="变异幅度（相对基因取值范围）")
+    parser.add_argument("--start-pos", type=float, nargs=2, default=[200, 750], help="车辆初始位置")
+    parser.add_argument("--start-angle", type=float, default=0, help="车辆初始朝向")
+    parser.add_argument("--engine", choices=["population", "car"], default="population",
+                        help="仿真引擎：population 为向量化群体仿真，car 为逐车仿真")
+    parser.add_argument("--sensors", choices=["exact", "nearest", "linear"], default="exact",
+                        help="传感器计算方式：exact 为射线求交；nearest/linear 为查预计算的距离场（仅 population 引擎），"
+                             "更快但有误差，不能代替 exact：train 赛道上 95%% 的读数误差 nearest 约 9 像素、linear 约 15 像素，"
+                             "auto_2 等窄赛道上 linear 约 50 像素，掠过边界的射线个别可达量程 500 像素；烘焙时会输出该赛道的误差")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="并行评估的进程数，0 表示在主进程中评估，-1 表示使用全部 CPU 核")
+    parser.add_argument("--table-steps", type=float, nargs=4, default=list(TABLE_STEPS),
+                        metavar=("SPEED", "FRONT", "LEFT", "RIGHT"), help="模糊控制查找表的步长")
+    parser.add_argument("--interpolate-tables", action="store_true",
+                        help="查找表双线性插值，可以配合更粗的 --table-steps 使用")
+    parser.add_argument("--table-cache", default="data/table_cache", help="查找表缓存目录，为空字符串时不使用缓存")
+    parser.add_argument("--table-cache-mb", type=float, default=64, help="查找表缓存大小上限（MB）")
+    parser.add_argument("--hall-of-fame", default="data/ga_train/hall_of_fame",
+                        help="名人堂目录，记录每个评估过的个体，为空字符串时不记录")
+    parser.add_argument("--seed", type=int, default=None, help="random、np.random 与遗传算子随机数生成器的种子，默认不设置")
+    parser.add_argument("--checkpoint", default="data/ga_train/checkpoint.npz",
+                        help="检查点文件路径，为空字符串时不保存检查点")
+    parser.add_argument("--checkpoint-every", type=int, default=1, help="每隔多少代保存一次检查点")
+    parser.add_argument("--resume", action="store_true",
+                        help="从检查点恢复训练：种群、代数、随机数状态与训练参数都取自检查点，--generations 为总代数")
+    parser.add_argument("--profile", default=None,
+                        help="按代记录各阶段（传感器、碰撞、推理、运动、车辆生成）的耗时并导出到该文件，"
+                             ".json 为 JSON，其它为 CSV；只统计主进程，需要仿真阶段的数据时使用 --workers 0")
+    args = parser.parse_args()
+    if args.tracks and args.engine != "population":
+        parser.error("--tracks 只支持 population 引擎")
+    return args
+
+
+def evaluate_locally(args, individuals, geometry, sensor_field=None, table_cache=None):
+    """
+    在主进程中生成车辆并仿真一代
+    :return: (成功生成的个体, 对应的适应度, 对应的通过检查线数, 实际仿真步数)
+    """
+    if args.engine == "population":
+        valid, population = build_population(individuals, geometry, args.start_pos, args.start_angle,
+                                             table_cache=table_cache, table_steps=tuple(args.table_steps),
+                                             interpolate_tables=args.interpolate_tables,
+                                             stall_steps=args.stall_steps, sensor_field=sensor_field,
+                                             interpolate_sensors=args.sensors == "linear")
+        steps = run_population_generation(population, args.max_steps, args.target_laps)
+        individuals = [individual for individual, ok in zip(individuals, valid) if ok]
+        return individuals, population.scores(args.time_weight).tolist(), population.fitness.tolist(), steps
+
+    cars = build_cars(individuals, args.start_pos, args.start_angle, table_cache=table_cache,
+                      table_steps=tuple(args.table_steps), interpolate=args.interpolate_tables,
+                      stall_steps=args.stall_steps)
+    steps = run_generation(cars, geometry, geometry.check_line, args.max_steps, args.target_laps)
+    return ([car.individual for car in cars], [car.score(args.time_weight) for car in cars],
+            [car.fitness for car in cars], steps)
+
+
+def main():
+    args = parse_args()
+    PROFILER.enable(bool(args.profile))
+
+    # 从检查点恢复训练参数，必须在构建赛道与评估器之前
+    checkpoint = None
+    if args.resume:
+        checkpoint = load_checkpoint(args.checkpoint)
+        for key in RESUME_PARAMS:
+            if key in checkpoint["params"]:
+                setattr(args, key, checkpoint["params"][key])
+        logging.info(f"从检查点恢复训练: {args.checkpoint}, 第{checkpoint['generation'] + 1}代")
+
+    # 加载并预编译赛道数据
+    geometry = TrackGeometry.from_file(args.track, centerline=args.fitness == "progress")
+    sensor_field = None
+    if args.sensors != "exact" and not args.tracks:
+        sensor_field = SensorField.load_or_bake(args.track, geometry=geometry)
+
+    table_cache = None
+    if args.table_cache:
+        table_cache = TableCache(args.table_cache, int(args.table_cache_mb * 1024 * 1024))
+
+    if checkpoint:
+        individuals = checkpoint["population"]
+        start_generation, history = checkpoint["generation"], checkpoint["history"]
+        set_random_state(checkpoint)
+        rng = load_generator(checkpoint) or np.random.default_rng(args.seed)
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+            np.random.seed(args.seed)
+        # 读取之前的elite
+        elite = read_individual(args.elite_file)
+        individuals = init_individuals(elite, args.cars)
+        start_generation, history = 0, []
+        # 遗传算子使用的随机数生成器
+        rng = np.random.default_rng(args.seed)
+    params = {key: getattr(args, key) for key in RESUME_PARAMS}
+    writer = CheckpointWriter(args.checkpoint) if args.checkpoint else None
+    hall_of_fame = HallOfFame(args.hall_of_fame) if args.hall_of_fame else None
+
+    evaluator = None
+    if args.tracks:
+        evaluator = MultiTrackEvaluator(args.tracks, args.aggregate, workers=None if args.workers < 0 else args.workers,
+                                        max_steps=args.max_steps, stall_steps=args.stall_steps,
+                                        target_laps=args.target_laps, start_pos=args.start_pos,
+                                        start_angle=args.start_angle, time_weight=args.time_weight,
+                                        table_cache=table_cache, table_steps=tuple(args.table_steps),
+                                        interpolate_tables=args.interpolate_tables, fitness=args.fitness,
+                                        sensors=args.sensors)
+    elif args.workers:
+        evaluator = ParallelEvaluator(args.track, args.start_pos, args.start_angle, max_steps=args.max_steps,
+                                      workers=None if args.workers < 0 else args.workers,
+                                      table_cache=table_cache, stall_steps=args.stall_steps,
+                                      target_laps=args.target_laps, centerline=args.fitness == "progress",
+                                      time_weight=args.time_weight, engine=args.engine, sensors=args.sensors,
+                                      table_steps=tuple(args.table_steps), interpolate_tables=args.interpolate_tables)
+
+    try:
+        for generation in range(start_generation, args.generations):
+            start_time = time.time()
+            if evaluator:
+                # 由评估器生成车辆并仿真（多进程或多赛道），这里只收集适应度
+                results = evaluator.evaluate(individuals)
+                individuals = [ind for ind, result in zip(individuals, results) if result is not None]
+                fitnesses = [result[0] for result in results if result is not None]
+                checkpoints = [result[1] for result in results if result is not None]
+                steps = evaluator.steps
+            else:
+                individuals, fitnesses, checkpoints, steps = evaluate_locally(args, individuals, geometry,
+                                                                              sensor_field, table_cache)
+            elapsed = time.time() - start_time
+
+            # 记录本代所有个体；多赛道训练按赛道分别记录未换算的适应度，界面脚本可以按赛道名查询
+            if hall_of_fame is not None and args.tracks:
+                for track, track_results in zip(args.tracks, evaluator.track_results):
+                    track_results = [result for result in track_results if result is not None]
+                    hall_of_fame.append(individuals, [result[0] for result in track_results],
+                                        [result[1] for result in track_results], generation, track_name(track),
+                                        args.fitness)
+            elif hall_of_fame is not None:
+                hall_of_fame.append(individuals, fitnesses, checkpoints, generation, track_name(args.track),
+                                    args.fitness)
+
+            # 筛选并保存精英个体
+            elite = select_elite(individuals, fitnesses, args.elite_num)
+            save_individual(args.elite_file, elite)
+            max_fitness = max(fitnesses, default=0)
+            history.append(max_fitness)
+            logging.info(f"第{generation + 1}代: 最大适应度 {max_fitness:g}, 仿真 {steps} 步, 用时 {elapsed:.2f}s")
+            if args.profile:
+                row = PROFILER.end_generation(generation + 1, steps=steps, max_fitness=max_fitness, seconds=elapsed)
+                logging.info(f"第{generation + 1}代各阶段耗时: {PROFILER.summary(row)}")
+                PROFILER.export(args.profile)
+
+            # 生成下一代个体
+            individuals = next_individuals(elite, args.cars, args.crossover_rate, args.mutation_rate,
+                                           args.mutation_scale, rng)
+
+            # 在后台线程写检查点，记录的是下一代个体与生成它们之后的随机数状态
+            if writer and ((generation + 1) % args.checkpoint_every == 0 or generation + 1 == args.generations):
+                writer.save(individuals, generation + 1, params, fitnesses, history, rng)
+    finally:
+        if evaluator:
+            evaluator.close()
+        if writer:
+            writer.close()
+
+
+if __name__ == "__main__":
+    main()
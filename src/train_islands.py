@@ -0,0 +1,82 @@
+import argparse
+import time
+import os
+import sys
+import logging
+# 添加根目录到 sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.core.island import TOPOLOGIES, IslandTrainer
+from src.util.individual_file_util import read_individual, save_individual
+from src.util.hall_of_fame_util import HallOfFame, track_name
+from src.core.table_cache import TableCache
+
+# 设置日志
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="岛屿模型训练：每个进程进化一个子种群，定期沿迁移拓扑交换精英")
+    parser.add_argument("--track", default="src/config/track_info/train.json", help="赛道文件路径")
+    parser.add_argument("--elite-file", default="data/ga_train/elite_individual.txt", help="精英个体文件路径")
+    parser.add_argument("--islands", type=int, default=os.cpu_count(), help="岛屿（进程）数量，默认为 CPU 核数")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="ring", help="迁移拓扑")
+    parser.add_argument("--migration-interval", type=int, default=5, help="每隔多少代迁移一次，0 表示不迁移")
+    parser.add_argument("--migrants", type=int, default=2, help="每次每个岛屿迁出的个体数")
+    parser.add_argument("--generations", type=int, default=100, help="每个岛屿进化多少代")
+    parser.add_argument("--cars", type=int, default=50, help="每个岛屿每代车辆数量")
+    parser.add_argument("--elite-num", type=int, default=10, help="每个岛屿每代保留的精英数量")
+    parser.add_argument("--max-steps", type=int, default=6000, help="每代最多仿真多少步")
+    parser.add_argument("--stall-steps", type=int, default=1000,
+                        help="连续多少步没有通过新的检查线就淘汰该车辆，0 表示不检测")
+    parser.add_argument("--target-laps", type=int, default=3,
+                        help="最好的车辆跑完多少圈后提前结束本代，0 表示不设目标")
+    parser.add_argument("--time-weight", type=float, default=0,
+                        help="到达最近一条检查线所用步数的惩罚权重，0 表示不考虑用时")
+    parser.add_argument("--start-pos", type=float, nargs=2, default=[200, 750], help="车辆初始位置")
+    parser.add_argument("--start-angle", type=float, default=0, help="车辆初始朝向")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子，每个岛屿由它派生出不同的种子")
+    parser.add_argument("--table-cache", default="data/table_cache", help="查找表缓存目录，为空字符串时不使用缓存")
+    parser.add_argument("--table-cache-mb", type=float, default=64, help="查找表缓存大小上限（MB）")
+    parser.add_argument("--hall-of-fame", default="data/ga_train/hall_of_fame",
+                        help="名人堂目录，记录每个评估过的个体，为空字符串时不记录")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    table_cache = None
+    if args.table_cache:
+        table_cache = TableCache(args.table_cache, int(args.table_cache_mb * 1024 * 1024))
+    hall_of_fame = HallOfFame(args.hall_of_fame) if args.hall_of_fame else None
+    track = track_name(args.track)
+    start_time = time.time()
+
+    def on_generation(island_id, generation, individuals, fitnesses, checkpoints):
+        """协调进程中记录名人堂与日志"""
+        if hall_of_fame is not None:
+            # 岛屿训练的适应度为沿赛道中心线的进度
+            hall_of_fame.append(individuals, fitnesses, checkpoints, generation, track, "progress")
+        logging.info(f"岛屿{island_id} 第{generation + 1}代: 最大适应度 {max(fitnesses, default=0):g}, "
+                     f"已用时 {time.time() - start_time:.1f}s")
+
+    trainer = IslandTrainer(args.track, islands=args.islands, topology=args.topology,
+                            migration_interval=args.migration_interval, migrants=args.migrants, cars=args.cars,
+                            elite_num=args.elite_num, generations=args.generations, max_steps=args.max_steps,
+                            stall_steps=args.stall_steps, target_laps=args.target_laps,
+                            start_pos=args.start_pos, start_angle=args.start_angle, time_weight=args.time_weight,
+                            seed=args.seed, table_cache=table_cache)
+    individuals, fitnesses = trainer.run(read_individual(args.elite_file), on_generation)
+
+    # 保存所有岛屿中最好的不重复个体
+    elite = []
+    for individual in individuals:
+        if len(elite) >= args.elite_num:
+            break
+        if individual not in elite:
+            elite.append(individual)
+    save_individual(args.elite_file, elite)
+    logging.info(f"训练完成: 最大适应度 {max(fitnesses, default=0):g}, 用时 {time.time() - start_time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,48 @@
 import pygame
+import argparse
 import time
 import os
 import sys
 import logging
+import numpy as np
 # 添加根目录到 sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.core.car import Car
-from src.core.ga_fuzzy import random_individual, repair_membership_functions, generate_offspring
+from src.core.trainer import build_cars, lap_fitness
+from src.core.ga_fuzzy import random_individual, repair_membership_functions, generate_offspring_matrix, \
+    matrix_to_individuals
 from src.util.individual_file_util import read_individual, save_individual
+from src.util.checkpoint_util import CheckpointWriter, load_checkpoint, load_generator, set_random_state
+from src.util.hall_of_fame_util import HallOfFame
+from src.util.profile_util import PROFILER
 from src.util.track_file_util import load_track_data
+from src.core.track_geometry import TrackGeometry
+from src.core.table_cache import TableCache
 from src.ui.init_ui import init_ui_train
 from src.ui.state_ui import state_ui_train
+from src.ui.render_loop import RenderLoop
 
-# 初始化 Pygame
-pygame.init()
-running = True
+# 命令行参数
+parser = argparse.ArgumentParser(description="可视化训练模式")
+parser.add_argument("--checkpoint", default="data/ga_train/checkpoint_map.npz", help="检查点文件路径")
+parser.add_argument("--resume", action="store_true", help="从检查点恢复种群、代数与随机数状态继续训练")
+parser.add_argument("--profile", default=None,
+                    help="按代记录各阶段（传感器、碰撞、推理、运动、绘制赛道与车辆、绘制状态栏、车辆生成）的耗时并导出到该文件，"
+                         ".json 为 JSON，其它为 CSV")
+args = parser.parse_args()
+PROFILER.enable(bool(args.profile))
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 # 屏幕设置
 WIDTH, HEIGHT = 1000, 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Pygame Racing Game - Complex Track")
-
-# 颜色定义
-WHITE = (255, 255, 255)
-RED = (255, 0, 0)
-BLACK = (0, 0, 0)
-GREEN = (0, 255, 0)
+FPS = 120  # 绘制时的帧率上限
 
 # 加载赛道数据
 track_outer, track_inner, check_line = load_track_data("src/config/track_info/train.json")
-track = [track_outer, track_inner]
+track = TrackGeometry(track_outer, track_inner, check_line, centerline=True)
+# 窗口、事件与绘制都在主线程中，仿真在仿真线程中只发布车辆位姿快照，不等待屏幕刷新
+viewer = RenderLoop(track_outer, track_inner, check_line, hud=state_ui_train, size=(WIDTH, HEIGHT), fps=FPS)
 
 # 读取之前的elite    
 elite = read_individual("data/ga_train/elite_individual.txt")
@@ -44,126 +54,152 @@ lower_bounds = [0] * 60
 upper_bounds = [2] * 15 + [500] * 15 + [300] * 30
 bounds = (lower_bounds, upper_bounds)
 car_max_num = 50
-cars = []
+stall_steps = 1000  # 连续多少步没有通过新的检查线就淘汰该车辆
+target_laps = 3     # 最好的车辆跑完多少圈后立刻结算这一代
+target_fitness = lap_fitness(check_line, target_laps)
+time_weight = 0     # 选择时到达最近一条检查线所用步数的惩罚权重，0 表示只看沿赛道的进度
+# 查找表缓存：elite 与重复出现的个体不再重新生成查找表
+table_cache = TableCache()
+# 检查点：每代结束后在后台线程写入，记录下一代个体、适应度、代数、参数与随机数状态
+params = {"car_max_num": car_max_num, "structure": structure, "fixed_indices": fixed_indices,
+          "bounds": bounds, "stall_steps": stall_steps, "target_laps": target_laps, "time_weight": time_weight,
+          "crossover_rate": 0.8, "mutation_rate": 0.2, "mutation_scale": 0.1}
+checkpoint_writer = CheckpointWriter(args.checkpoint)
+# 名人堂：记录每个评估过的个体
+hall_of_fame = HallOfFame()
 
-# 生成车辆
-for _ in range(car_max_num - len(elite)):
-    if not running:
-        break
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    # 显示已经初始化几辆车
-    init_ui_train(screen, 1, len(cars), car_max_num)
-    try:
+if args.resume:
+    # 从检查点恢复
+    checkpoint = load_checkpoint(args.checkpoint)
+    individuals = checkpoint["population"]
+    start_generation, history = checkpoint["generation"], checkpoint["history"]
+    set_random_state(checkpoint)
+    rng = load_generator(checkpoint) or np.random.default_rng()
+    logging.info(f"从检查点恢复训练: {args.checkpoint}, 第{start_generation + 1}代")
+else:
+    individuals = []
+    for _ in range(car_max_num - len(elite)):
         individual = random_individual()
         # 修复模糊隶属函数参数
-        individual = repair_membership_functions(individual, structure, fixed_indices)
-        car = Car(individual=individual, pos=[200, 750], angle=0, max_speed=2)
-        cars.append(car)
-    except Exception as e:
-        logging.info(f"车辆生成失败: {e}")
-        continue  # 继续生成下一辆车
-    
-for individual in elite:
-    if not running:
-        break
-    for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-    # 显示已经初始化几辆车
-    init_ui_train(screen, 1, len(cars), car_max_num)
-    try:
-        car = Car(individual=individual, pos=[200, 750], angle=0, max_speed=2)
-        cars.append(car)
-    except Exception as e:
-        logging.info(f"车辆生成失败: {e}")
-        continue  # 继续生成下一辆车
-    
+        individuals.append(repair_membership_functions(individual, structure, fixed_indices))
+    individuals.extend(elite)
+    start_generation, history = 0, []
+    # 遗传算子使用的随机数生成器
+    rng = np.random.default_rng()
 
 GENERATIONS = 100   # 遗传算法执行多少代
 max_time = 300     # 每代最多执行多少秒
-# 遗传算法开始
-for generation in range(GENERATIONS):
-    if not running:
-        break
-    
-    start_time = time.time()
-    
-    while time.time() - start_time < max_time and running:
-        screen.fill(WHITE)
+# 每帧仿真的步数，运行时按键切换：1 为 1 倍，2 为 10 倍，3 为 100 倍，0 为关闭绘制全速训练
+SPEED_KEYS = {pygame.K_1: 1, pygame.K_2: 10, pygame.K_3: 100, pygame.K_0: 0}
+RENDER_OFF_INTERVAL = 0.1   # 关闭绘制时每隔多少秒处理一次窗口事件并刷新状态栏
+clock = pygame.time.Clock()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                
-        # 按空格键立刻结算这一代
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_SPACE]:
+
+def train():
+    """仿真线程：生成车辆并逐代训练，窗口关闭后尽快返回"""
+    running = True
+    steps_per_frame = 1  # 每帧仿真的步数，由 SPEED_KEYS 切换
+    # 生成车辆：所有个体的查找表一次性批量生成
+    viewer.show(init_ui_train, start_generation + 1, 0, car_max_num)
+    cars = build_cars(individuals, pos=[200, 750], angle=0, max_speed=2, table_cache=table_cache,
+                      stall_steps=stall_steps)
+    viewer.show(init_ui_train, start_generation + 1, len(cars), car_max_num)
+
+    # 遗传算法开始
+    for generation in range(start_generation, GENERATIONS):
+        if not running:
             break
+    
+        start_time = time.time()
+    
+        finished = False
+        while time.time() - start_time < max_time and running and not finished:
+            # 主线程收到的窗口事件，不会阻塞
+            for command, key in viewer.poll():
+                if command == "quit":
+                    running = False
+                elif key in SPEED_KEYS:
+                    steps_per_frame = SPEED_KEYS[key]
+                elif key == pygame.K_SPACE:
+                    # 按空格键立刻结算这一代
+                    finished = True
+            if finished or not running:
+                break
         
-        # 定期处理窗口事件，防止窗口卡死
-        pygame.event.pump()
-        
-        car_num = len(cars)
-        max_fitness = 0
-        for car in cars:
-            car_points = car.update_info_fuzzy(track, check_line)
-            max_fitness = max(max_fitness, car.fitness)
-            if car_points:
-                # 绘制车辆
-                pygame.draw.polygon(screen, RED, car_points)
-            else:
-                car_num -= 1
-        
-        # 绘制赛道
-        pygame.draw.polygon(screen, BLACK, track_outer, 3)
-        pygame.draw.polygon(screen, BLACK, track_inner, 3)
-        
-        # 绘制检查线
-        for line in check_line:
-            pygame.draw.line(screen, GREEN, line[0], line[1], 2)
+            # 每帧仿真 steps_per_frame 步，关闭绘制时仿真到 RENDER_OFF_INTERVAL 秒再处理窗口事件
+            frame_start = time.time()
+            steps = 0
+            while True:
+                max_fitness = 0
+                alive = np.zeros(len(cars), dtype=bool)
+                for i, car in enumerate(cars):
+                    alive[i] = car.update_info_fuzzy(track, check_line) is not None
+                    max_fitness = max(max_fitness, car.fitness)
+                car_num = int(alive.sum())
+                steps += 1
             
-        # 在右上角打印现在第几代，以及时间还剩多久, 剩余几辆车, 最大适应度
-        state_ui_train(screen, generation + 1, start_time, max_time, car_num, max_fitness)
-        pygame.time.delay(5)
+                # 所有车辆都已出局，或最好的车辆已跑完目标圈数，立刻结算这一代
+                if car_num == 0 or (target_fitness and max_fitness >= target_fitness):
+                    finished = True
+                    break
+                if steps_per_frame and steps >= steps_per_frame:
+                    break
+                if not steps_per_frame and time.time() - frame_start >= RENDER_OFF_INTERVAL:
+                    break
+        
+            # 发布本帧最后一步的车辆位姿与状态栏信息（第几代，时间还剩多久, 剩余几辆车, 最大适应度, 仿真倍速），
+            # 绘制跟不上时该帧被丢弃；关闭绘制时只刷新状态栏
+            # 绘制本身在主线程的绘制循环中计时，这里只是放入队列
+            poses = np.array([(car.pos[0], car.pos[1], car.angle) for car in cars]) if steps_per_frame else None
+            viewer.publish(poses, alive, generation + 1, start_time, max_time, car_num, max_fitness, steps_per_frame)
+            # 按帧率限制仿真速度，便于观察；关闭绘制时不等待
+            if steps_per_frame:
+                clock.tick(FPS)
 
-    if running:
-        # 筛选适应度最高的5个存活个体,如果不足5个则全部保留
-        elite = []
-        cars.sort(key=lambda x: x.fitness, reverse=True)
-        for car in cars:
-            if len(elite) >= 10:
-                break
-            else:
-                if car.individual not in elite:
-                    elite.append(car.individual)
+        if running:
+            # 筛选适应度最高的5个存活个体,如果不足5个则全部保留
+            elite = []
+            # 按沿赛道中心线的连续进度排序，同样通过 n 条检查线的车辆也能分出好坏
+            cars.sort(key=lambda x: x.score(time_weight), reverse=True)
+            for car in cars:
+                if len(elite) >= 10:
+                    break
+                else:
+                    if car.individual not in elite:
+                        elite.append(car.individual)
                 
-        # 保存elite
-        save_individual("data/ga_train/elite_individual.txt", elite)
+            # 保存elite
+            save_individual("data/ga_train/elite_individual.txt", elite)
+            hall_of_fame.append([car.individual for car in cars], [car.score(time_weight) for car in cars],
+                                [car.fitness for car in cars], generation, "train", "progress")
 
-        # 生成下一代个体
-        cars = []
-        next_individuals = generate_offspring(population=elite, n_offspring=car_max_num - len(elite), 
-                                            structure=structure, fixed_indices=fixed_indices, 
-                                            bounds=bounds, crossover_rate=0.8, mutation_rate=0.2, 
-                                            mutation_scale=0.1)
-        next_individuals.extend(elite)
+            # 生成下一代个体：子代在种群矩阵上一次生成
+            offspring = generate_offspring_matrix(population=elite, n_offspring=car_max_num - len(elite),
+                                                  structure=structure, fixed_indices=fixed_indices,
+                                                  bounds=bounds, crossover_rate=0.8, mutation_rate=0.2,
+                                                  mutation_scale=0.1, rng=rng)
+            next_individuals = matrix_to_individuals(offspring, fixed_indices) + elite
         
-        for individual in next_individuals:
-            if not running:
-                break
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-            # 显示已经初始化几辆车
-            init_ui_train(screen, generation + 2, len(cars), car_max_num)
-            # 生成车辆
-            try:
-                car = Car(individual=individual, pos=[200, 750], angle=0, max_speed=2)
-                cars.append(car)
-            except Exception as e:
-                logging.info(f"车辆生成失败: {e}")
-                continue  # 继续生成下一辆车
+            # 保存检查点
+            history.append(cars[0].score(time_weight) if cars else 0)
+            checkpoint_writer.save(next_individuals, generation + 1, params,
+                                   [car.score(time_weight) for car in cars], history, rng)
+        
+            # 导出本代各阶段耗时（车辆生成计入下一代）
+            if args.profile:
+                row = PROFILER.end_generation(generation + 1, max_fitness=history[-1],
+                                              seconds=time.time() - start_time)
+                logging.info(f"第{generation + 1}代各阶段耗时: {PROFILER.summary(row)}")
+                PROFILER.export(args.profile)
         
-pygame.quit()
\ No newline at end of file
+            # 生成车辆
+            viewer.show(init_ui_train, generation + 2, 0, car_max_num)
+            cars = build_cars(next_individuals, pos=[200, 750], angle=0, max_speed=2, table_cache=table_cache,
+                              stall_steps=stall_steps)
+            viewer.show(init_ui_train, generation + 2, len(cars), car_max_num)
+
+
+try:
+    viewer.run(train)
+finally:
+    checkpoint_writer.close()
@@ -1,4 +1,5 @@
 import pygame
+from src.ui.hud import get_image, render_text
 
 def win_ui(screen, WIDTH, HEIGHT):
     """
@@ -13,15 +14,11 @@ def win_ui(screen, WIDTH, HEIGHT):
     WHITE = (255, 255, 255)
     BLACK = (0, 0, 0)
 
-    # 加载字体
-    font = pygame.font.Font('src/asset/font/msyh.ttc', 50)  # 默认字体，大小 50
+    # 字体、文字与图片只加载一次，之后每局直接复用
     text = "有点操作。"
-    text_surface = font.render(text, True, BLACK)
-
-    # 加载图片
+    text_surface = render_text(text, 50, BLACK)
     image_path = "src/asset/img/win.jpg"  # 替换为你的图片路径
-    image = pygame.image.load(image_path)
-    image = pygame.transform.scale(image, (500, 500))  # 调整图片大小
+    image = get_image(image_path, (500, 500))  # 调整图片大小
 
     # 计算位置
     text_rect = text_surface.get_rect(center=(WIDTH // 2, HEIGHT // 10 + 100))
@@ -62,15 +59,11 @@ def lose_ui(screen, WIDTH, HEIGHT):
     WHITE = (255, 255, 255)
     BLACK = (0, 0, 0)
 
-    # 加载字体
-    font = pygame.font.Font('src/asset/font/msyh.ttc', 50)  # 默认字体，大小 50
+    # 字体、文字与图片只加载一次，之后每局直接复用
     text = "再去练练吧。"
-    text_surface = font.render(text, True, BLACK)
-
-    # 加载图片
+    text_surface = render_text(text, 50, BLACK)
     image_path = "src/asset/img/lose.jpg"  # 替换为你的图片路径
-    image = pygame.image.load(image_path)
-    image = pygame.transform.scale(image, (500, 500))  # 调整图片大小
+    image = get_image(image_path, (500, 500))  # 调整图片大小
 
     # 计算位置
     text_rect = text_surface.get_rect(center=(WIDTH // 2, HEIGHT // 10 + 100))
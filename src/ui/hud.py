@@ -0,0 +1,61 @@
+import pygame
+from functools import lru_cache
+
+# 界面字体
+FONT_PATH = "src/asset/font/msyh.ttc"
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    """
+    每种字号只从磁盘加载一次字体
+    :param size: int 字号
+    :return: pygame.font.Font
+    """
+    return pygame.font.Font(FONT_PATH, size)
+
+
+@lru_cache(maxsize=None)
+def get_image(path, size=None):
+    """
+    每张图片只加载并缩放一次
+    :param path: str 图片路径
+    :param size: Tuple[int, int] 缩放后的大小，None 表示不缩放
+    :return: pygame.Surface
+    """
+    image = pygame.image.load(path)
+    if size is not None:
+        image = pygame.transform.scale(image, size)
+    # 转换为屏幕的像素格式，之后每次绘制不用再转换
+    return image.convert() if pygame.display.get_surface() is not None else image
+
+
+@lru_cache(maxsize=512)
+def render_text(text, size, color=(0, 0, 0)):
+    """
+    渲染一段文字，相同的文字、字号与颜色直接返回缓存的图像，只有文字变化时才重新渲染。
+    返回的图像是共享的，不要在上面绘制
+    :param text: str 文字
+    :param size: int 字号
+    :param color: Tuple[int, int, int] 颜色
+    :return: pygame.Surface
+    """
+    return get_font(size).render(text, True, color)
+
+
+def draw_text(screen, text, size, pos, color=(0, 0, 0)):
+    """
+    在 pos（左上角）绘制文字
+    :return: pygame.Rect 绘制过的区域
+    """
+    return screen.blit(render_text(text, size, color), pos)
+
+
+def clear_caches():
+    """
+    清空字体、图片与文字图像的缓存。缓存的 Font 与 Surface 属于当前的 pygame 显示，
+    关闭窗口（pygame.quit）前调用，之后重新打开窗口时按新的显示重新加载
+    """
+    render_text.cache_clear()
+    get_image.cache_clear()
+    get_font.cache_clear()
@@ -1,16 +1,15 @@
 import pygame
+from src.ui.hud import draw_text
 
 def init_ui_vs(screen):
     # 定义颜色
     WHITE = (255, 255, 255)
     BLACK = (0, 0, 0)
 
-    font = pygame.font.Font('src/asset/font/msyh.ttc', 50)  # 默认字体，大小 50
     screen.fill(WHITE)
-    text = font.render(f"正在加载初始数据", True, BLACK)
-    screen.blit(text, (300, 300))
-    text = font.render(f"请稍等！", True, BLACK)
-    screen.blit(text, (300, 350))
+    # 字体与文字图像只加载、渲染一次
+    draw_text(screen, "正在加载初始数据", 50, (300, 300), BLACK)
+    draw_text(screen, "请稍等！", 50, (300, 350), BLACK)
     # 更新屏幕
     pygame.display.flip()
     # 定期处理窗口事件，防止窗口卡死
@@ -24,14 +23,10 @@ def init_ui_train(screen, generation, car_num, car_max_num):
     WHITE = (255, 255, 255)
     BLACK = (0, 0, 0)
 
-    font = pygame.font.Font('src/asset/font/msyh.ttc', 36)  # 默认字体，大小 50
     screen.fill(WHITE)
-    text = font.render(f"正在生成第{generation}代车辆数据...", True, BLACK)
-    screen.blit(text, (300, 300))
-    text = font.render(f"请稍等！", True, BLACK)
-    screen.blit(text, (300, 350))
-    text = font.render(f"已生成：: {car_num}/{car_max_num}", True, BLACK)
-    screen.blit(text, (300, 400))
+    draw_text(screen, f"正在生成第{generation}代车辆数据...", 36, (300, 300), BLACK)
+    draw_text(screen, "请稍等！", 36, (300, 350), BLACK)
+    draw_text(screen, f"已生成：: {car_num}/{car_max_num}", 36, (300, 400), BLACK)
     pygame.display.flip()
     pygame.event.pump()
     
\ No newline at end of file
@@ -0,0 +1,169 @@
+import queue
+import threading
+from time import perf_counter
+import numpy as np
+import pygame
+from src.ui.hud import clear_caches
+from src.ui.track_renderer import TrackRenderer
+from src.util.profile_util import PROFILER
+
+# 颜色定义
+RED = (255, 0, 0)
+
+
+def car_triangles(poses):
+    """
+    由车辆位姿计算三角形箭头坐标，与 Car.update_info_fuzzy 返回的 car_points 相同
+    :param poses: np.ndarray (n, 3) 每辆车的 x, y, 朝向角度
+    :return: np.ndarray (n, 3, 2)
+    """
+    rad = np.radians(poses[:, 2])[:, None] + np.array([0, 2.5, -2.5])
+    return np.stack([poses[:, 0, None] + np.cos(rad) * 10, poses[:, 1, None] - np.sin(rad) * 10], axis=-1)
+
+
+class RenderLoop:
+    def __init__(self, track_outer, track_inner, check_line, hud, size=(1000, 800),
+                 caption="Pygame Racing Game - Complex Track", fps=60, color=RED, max_pending=2):
+        """
+        绘制循环：窗口、事件处理与屏幕刷新都在主线程中进行（macOS 只允许在主线程中使用窗口），
+        仿真在 run 启动的仿真线程中进行，只发布车辆位姿快照，从不等待 pygame.display.update 或窗口事件。
+        快照队列有界，绘制跟不上时丢弃较早的帧，每次只画队列中最新的一帧
+        :param track_outer: List[Tuple[float, float]] 赛道外边界
+        :param track_inner: List[Tuple[float, float]] 赛道内边界
+        :param check_line: List[Tuple[Tuple[float, float], Tuple[float, float]]] 检查线坐标
+        :param hud: Callable(screen, *hud_args) -> List[pygame.Rect] 绘制状态栏的函数，如 state_ui_train
+        :param size: Tuple[int, int] 窗口大小
+        :param caption: str 窗口标题
+        :param fps: int 绘制帧率上限
+        :param color: Tuple[int, int, int] 车辆颜色
+        :param max_pending: int 快照队列长度
+        """
+        self.track = (track_outer, track_inner, check_line)
+        self.hud = hud
+        self.size = size
+        self.caption = caption
+        self.fps = fps
+        self.color = color
+        self.snapshots = queue.Queue(maxsize=max_pending)
+        self.commands = queue.Queue()
+        self.dropped = 0  # 绘制跟不上而丢弃的快照数
+        self.error = None  # 仿真线程中的异常，由 run 在主线程中重新抛出
+        self._stop = threading.Event()
+
+    def run(self, simulate, *args):
+        """
+        在主线程中打开窗口并运行绘制循环，同时在仿真线程中运行 simulate(*args)，两者都结束后返回。
+        simulate 返回后关闭窗口；窗口先关闭时仿真线程从 poll 收到 ("quit", None)，应尽快返回。
+        仿真线程中的异常在这里重新抛出
+        :param simulate: Callable 仿真函数，通过 publish、show 与 poll 与绘制循环通信
+        """
+        thread = threading.Thread(target=self._simulate, args=(simulate, *args), daemon=True)
+        thread.start()
+        try:
+            self._loop()
+        finally:
+            # 无论绘制循环怎样退出，都通知仿真线程结束并关闭窗口
+            self._stop.set()
+            self.commands.put(("quit", None))
+            clear_caches()
+            pygame.quit()
+            thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def publish(self, poses, alive, *hud_args):
+        """
+        在仿真线程中发布一帧快照，队列已满时丢弃最早的一帧，不会阻塞
+        :param poses: np.ndarray (n, 3) 每辆车的 x, y, 朝向角度，None 表示不绘制车辆
+        :param alive: np.ndarray (n,) bool 需要绘制的车辆
+        :param hud_args: 传给 hud 的参数
+        """
+        self._put(("frame", poses, alive, hud_args))
+
+    def show(self, screen_ui, *args):
+        """
+        在绘制循环中调用 screen_ui(screen, *args) 显示整屏界面，如 init_ui_train 加载界面
+        """
+        self._put(("screen", screen_ui, args))
+
+    def poll(self):
+        """
+        在仿真线程中取出绘制循环收到的所有窗口事件，不会阻塞
+        :return: List[Tuple[str, int]] ("quit", None) 为关闭窗口或绘制循环已退出，("key", key) 为按键
+        """
+        events = []
+        while True:
+            try:
+                events.append(self.commands.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _put(self, message):
+        """放入队列，队列已满时丢弃最早的一帧，保证绘制循环拿到的总是最新的状态"""
+        while True:
+            try:
+                self.snapshots.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.snapshots.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _latest(self):
+        """取出队列中最新的一条消息，更早的帧直接丢弃"""
+        message = None
+        while True:
+            try:
+                message = self.snapshots.get_nowait()
+            except queue.Empty:
+                return message
+
+    def _simulate(self, simulate, *args):
+        """仿真线程：运行 simulate，正常结束或出错后都通知绘制循环退出"""
+        try:
+            simulate(*args)
+        except Exception as error:
+            self.error = error
+        finally:
+            self._stop.set()
+
+    def _loop(self):
+        """主线程中的窗口事件与绘制循环，pygame 只在这里使用"""
+        pygame.init()
+        screen = pygame.display.set_mode(self.size)
+        pygame.display.set_caption(self.caption)
+        renderer = TrackRenderer(screen, *self.track)
+        clock = pygame.time.Clock()
+        while not self._stop.is_set():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self._stop.set()
+                elif event.type == pygame.KEYDOWN:
+                    self.commands.put(("key", event.key))
+            if self._stop.is_set():
+                break
+
+            message = self._latest()
+            if message is not None and message[0] == "screen":
+                _, screen_ui, args = message
+                screen_ui(screen, *args)
+                # 整屏界面覆盖了赛道，下一帧整屏重绘
+                renderer.invalidate()
+            elif message is not None:
+                _, poses, alive, hud_args = message
+                # 绘制在主线程中进行，赛道与车辆计入 rendering，状态栏计入 hud，与仿真线程的计时一起按代汇总
+                start = perf_counter()
+                renderer.begin_frame()
+                if poses is not None:
+                    for points in car_triangles(poses[alive]):
+                        renderer.draw_polygon(self.color, points)
+                hud_start = perf_counter()
+                renderer.add_dirty(self.hud(screen, *hud_args))
+                hud_end = perf_counter()
+                renderer.present()
+                if PROFILER.enabled:
+                    PROFILER.add("rendering", hud_start - start + perf_counter() - hud_end)
+                    PROFILER.add("hud", hud_end - hud_start)
+            clock.tick(self.fps)
@@ -1,62 +1,65 @@
 import pygame
 import time
-  
-def state_ui_train(screen, generation, start_time, max_time, car_num, max_fitness):
+from src.ui.hud import render_text, draw_text
+
+def state_ui_train(screen, generation, start_time, max_time, car_num, max_fitness, steps_per_frame=None):
+    """
+    在右上角绘制训练状态，不刷新屏幕
+    :param steps_per_frame: int 每帧仿真的步数，0 表示关闭绘制，None 表示不显示
+    :return: List[pygame.Rect] 绘制过的区域，交给 TrackRenderer 刷新
+    """
     # 定义颜色
     BLACK = (0, 0, 0)
 
-    font = pygame.font.Font("src/asset/font/msyh.ttc", 26)
-    text = font.render(f"Generation: {generation}", True, BLACK)
-    screen.blit(text, (800, 50))
-    text = font.render(f"Time Left: {max_time - int(time.time() - start_time)}s", True, BLACK)
-    screen.blit(text, (800, 100))
-    text = font.render(f"Cars Left: {car_num}", True, BLACK)
-    screen.blit(text, (800, 150))
-    text = font.render(f"Max Fitness: {max_fitness}", True, BLACK)
-    screen.blit(text, (800, 200))
-
-    pygame.display.flip()
+    rects = []
+    rects.append(draw_text(screen, f"Generation: {generation}", 26, (800, 50), BLACK))
+    rects.append(draw_text(screen, f"Time Left: {max_time - int(time.time() - start_time)}s", 26, (800, 100), BLACK))
+    rects.append(draw_text(screen, f"Cars Left: {car_num}", 26, (800, 150), BLACK))
+    rects.append(draw_text(screen, f"Max Fitness: {max_fitness}", 26, (800, 200), BLACK))
+    if steps_per_frame is not None:
+        speed = f"{steps_per_frame}x" if steps_per_frame else "render off"
+        rects.append(draw_text(screen, f"Speed: {speed} (1/2/3/0)", 26, (800, 250), BLACK))
+
     pygame.event.pump()
-    
+    return rects
+
 def state_ui_auto(screen, speed, front_dist, left_dist, right_dist):
+    """
+    在右上角绘制车辆速度与障碍物距离，不刷新屏幕
+    :return: List[pygame.Rect] 绘制过的区域，交给 TrackRenderer 刷新
+    """
     # 定义颜色
     BLACK = (0, 0, 0)
 
-    font = pygame.font.Font("src/asset/font/msyh.ttc", 26)
-    speed_text = font.render("Speed: {:.2f}".format(speed), True, BLACK)
-    screen.blit(speed_text, (800, 50))
-    front_text = font.render("Front: {:.2f}".format(front_dist), True, BLACK)
-    screen.blit(front_text, (800, 100))
-    left_text = font.render("Left: {:.2f}".format(left_dist), True, BLACK)
-    screen.blit(left_text, (800, 150))
-    right_text = font.render("Right: {:.2f}".format(right_dist), True, BLACK)
-    screen.blit(right_text, (800, 200))
-
-    pygame.display.flip()
+    rects = []
+    rects.append(draw_text(screen, "Speed: {:.2f}".format(speed), 26, (800, 50), BLACK))
+    rects.append(draw_text(screen, "Front: {:.2f}".format(front_dist), 26, (800, 100), BLACK))
+    rects.append(draw_text(screen, "Left: {:.2f}".format(left_dist), 26, (800, 150), BLACK))
+    rects.append(draw_text(screen, "Right: {:.2f}".format(right_dist), 26, (800, 200), BLACK))
+
     pygame.event.pump()
-    
+    return rects
+
 def state_ui_vs(screen):
+    """
+    在右上角绘制图例，不刷新屏幕
+    :return: List[pygame.Rect] 绘制过的区域，交给 TrackRenderer 刷新
+    """
     # 定义颜色
     BLACK = (0, 0, 0)
     RED = (255, 0, 0)
     BLUE = (0, 0, 255)
-    
-    font = pygame.font.Font("src/asset/font/msyh.ttc", 26)
+
+    rects = []
     x, y = 800, 50
-    enemy_1 = font.render("▄", True, RED)
-    enemy_2 = font.render(" : Enemy", True, BLACK)
-    enemy_1_rect = enemy_1.get_rect(topleft=(x, y))
-    enemy_2_rect = enemy_2.get_rect(topleft=(x + enemy_1_rect.width, y))
-    screen.blit(enemy_1, enemy_1_rect)
-    screen.blit(enemy_2, enemy_2_rect)
-    
+    enemy_1 = render_text("▄", 26, RED)
+    rects.append(screen.blit(enemy_1, (x, y)))
+    rects.append(draw_text(screen, " : Enemy", 26, (x + enemy_1.get_width(), y), BLACK))
+
     x, y = 800, 100
-    player_1 = font.render("▄", True, BLUE)
-    player_2 = font.render(" : You", True, BLACK)
-    player_1_rect = player_1.get_rect(topleft=(x, y))
-    player_2_rect = player_2.get_rect(topleft=(x + player_1_rect.width, y))
-    screen.blit(player_1, player_1_rect)
-    screen.blit(player_2, player_2_rect)
-    
-    pygame.display.flip()
-    pygame.event.pump()
\ No newline at end of file
+    player_1 = render_text("▄", 26, BLUE)
+    rects.append(screen.blit(player_1, (x, y)))
+    rects.append(draw_text(screen, " : You", 26, (x + player_1.get_width(), y), BLACK))
+
+    pygame.event.pump()
+    return rects
@@ -0,0 +1,68 @@
+import pygame
+
+# 颜色定义
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREEN = (0, 255, 0)
+
+
+class TrackRenderer:
+    def __init__(self, screen, track_outer, track_inner, check_line=(), check_width=2, background=WHITE):
+        """
+        赛道绘制器：赛道边界与检查线只绘制一次到缓存的背景图层，
+        每帧只用背景擦除上一帧车辆与状态栏所在的区域，再用 pygame.display.update(rects) 只刷新这些区域
+        :param screen: pygame.Surface 游戏窗口
+        :param track_outer: List[Tuple[float, float]] 赛道外边界
+        :param track_inner: List[Tuple[float, float]] 赛道内边界
+        :param check_line: List[Tuple[Tuple[float, float], Tuple[float, float]]] 需要绘制的检查线
+        :param check_width: int 检查线线宽
+        :param background: Tuple[int, int, int] 背景色
+        """
+        self.screen = screen
+        self.bounds = screen.get_rect()
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(background)
+        pygame.draw.polygon(self.background, BLACK, track_outer, 3)
+        pygame.draw.polygon(self.background, BLACK, track_inner, 3)
+        for line in check_line:
+            pygame.draw.line(self.background, GREEN, line[0], line[1], check_width)
+
+        self._previous = []  # 上一帧画过的区域，本帧需要擦除
+        self._dirty = []  # 本帧画过的区域
+        self._full = True  # 下一帧是否整屏重绘
+
+    def invalidate(self):
+        """屏幕被其它界面覆盖后调用，下一帧整屏重绘"""
+        self._full = True
+
+    def begin_frame(self):
+        """开始新的一帧：用背景擦除上一帧画过的区域"""
+        if self._full:
+            self.screen.blit(self.background, (0, 0))
+            self._previous = []
+        else:
+            for rect in self._previous:
+                self.screen.blit(self.background, rect, rect)
+
+    def add_dirty(self, rects):
+        """
+        记录本帧在背景之上画过的区域，如状态栏文字
+        :param rects: List[pygame.Rect] 区域
+        """
+        for rect in rects:
+            rect = self.bounds.clip(rect)
+            if rect.width and rect.height:
+                self._dirty.append(rect)
+
+    def draw_polygon(self, color, points):
+        """绘制车辆等实心多边形并记录区域"""
+        self.add_dirty([pygame.draw.polygon(self.screen, color, points)])
+
+    def present(self):
+        """刷新屏幕：只更新上一帧与本帧画过的区域"""
+        if self._full:
+            pygame.display.flip()
+            self._full = False
+        else:
+            pygame.display.update(self._previous + self._dirty)
+        self._previous, self._dirty = self._dirty, []
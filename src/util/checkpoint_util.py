@@ -0,0 +1,142 @@
+import os
+import json
+import random
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+
+def random_state():
+    """
+    以数组形式获取 random 与 np.random 的状态，保存时不需要 pickle
+    :return: Dict[str, np.ndarray]
+    """
+    version, internal, gauss_next = random.getstate()
+    _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    return {
+        "random_version": np.asarray(version),
+        "random_internal": np.asarray(internal, dtype=np.uint32),
+        "random_gauss": np.asarray(np.nan if gauss_next is None else gauss_next),
+        "np_random_keys": np.asarray(keys, dtype=np.uint32),
+        "np_random_pos": np.asarray(pos),
+        "np_random_gauss": np.asarray([has_gauss, cached_gaussian], dtype=float),
+    }
+
+
+def set_random_state(state):
+    """恢复 random_state 得到的状态"""
+    gauss_next = float(state["random_gauss"])
+    random.setstate((int(state["random_version"]), tuple(int(x) for x in state["random_internal"]),
+                     None if np.isnan(gauss_next) else gauss_next))
+    has_gauss, cached_gaussian = state["np_random_gauss"]
+    np.random.set_state(("MT19937", state["np_random_keys"], int(state["np_random_pos"]),
+                         int(has_gauss), float(cached_gaussian)))
+
+
+def load_generator(checkpoint):
+    """
+    恢复检查点中保存的 np.random.Generator
+    :return: np.random.Generator，检查点中没有时返回 None
+    """
+    if "generator_state" not in checkpoint:
+        return None
+    state = json.loads(str(checkpoint["generator_state"]))
+    rng = np.random.Generator(getattr(np.random, state["bit_generator"])())
+    rng.bit_generator.state = state
+    return rng
+
+
+def checkpoint_arrays(individuals, generation, params, fitnesses=(), history=(), rng=None):
+    """
+    生成检查点内容，同时记录当前的随机数状态
+    :param individuals: List[List[float]] 下一代待评估的个体
+    :param generation: int 下一代的编号（从 0 开始）
+    :param params: Dict 遗传算法与仿真参数，以 JSON 保存
+    :param fitnesses: List[float] 上一代个体的适应度
+    :param history: List[float] 每一代的最大适应度
+    :param rng: np.random.Generator 遗传算子使用的随机数生成器，可选
+
+    :return: Dict[str, np.ndarray]
+    """
+    arrays = {
+        "population": np.asarray(individuals, dtype=float),
+        # 记录哪些基因是整数（如修复后的固定基因），恢复后个体与精英文件的文本表示保持不变
+        "integer_genes": np.asarray([[isinstance(gene, int) for gene in individual] for individual in individuals],
+                                    dtype=bool),
+        "fitnesses": np.asarray(fitnesses, dtype=float),
+        "generation": np.asarray(generation),
+        "history": np.asarray(history, dtype=float),
+        "params": np.asarray(json.dumps(params)),
+        **random_state(),
+    }
+    if rng is not None:
+        arrays["generator_state"] = np.asarray(json.dumps(rng.bit_generator.state))
+    return arrays
+
+
+def write_checkpoint(file_path, arrays):
+    """
+    写入检查点：先写临时文件再替换，中断时不会留下损坏的检查点
+    :param file_path: str 检查点路径（.npz）
+    :param arrays: Dict[str, np.ndarray] checkpoint_arrays 的结果
+    """
+    dir_path = os.path.dirname(file_path)
+    if dir_path and not os.path.exists(dir_path):
+        os.makedirs(dir_path)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+
+
+def load_checkpoint(file_path):
+    """
+    读取检查点
+    :param file_path: str 检查点路径
+
+    :return: Dict 包含 population (List[List[float]])、fitnesses、generation、history、params，
+             以及可以传给 set_random_state 的随机数状态
+    """
+    with np.load(file_path) as data:
+        checkpoint = {key: data[key] for key in data.files}
+    checkpoint["population"] = [[int(gene) if is_int else gene for gene, is_int in zip(individual, integer_genes)]
+                                for individual, integer_genes in zip(checkpoint["population"].tolist(),
+                                                                     checkpoint["integer_genes"])]
+    checkpoint["fitnesses"] = checkpoint["fitnesses"].tolist()
+    checkpoint["generation"] = int(checkpoint["generation"])
+    checkpoint["history"] = checkpoint["history"].tolist()
+    checkpoint["params"] = json.loads(str(checkpoint["params"]))
+    return checkpoint
+
+
+class CheckpointWriter:
+    def __init__(self, file_path):
+        """
+        后台线程写检查点，仿真循环只需在主线程中拷贝一份状态
+        :param file_path: str 检查点路径（.npz）
+        """
+        self.file_path = file_path
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def save(self, individuals, generation, params, fitnesses=(), history=(), rng=None):
+        """立即记录当前状态（包括随机数状态），在后台写入文件，参数见 checkpoint_arrays"""
+        arrays = checkpoint_arrays(individuals, generation, params, fitnesses, history, rng)
+        self.executor.submit(self._write, arrays)
+
+    def _write(self, arrays):
+        try:
+            write_checkpoint(self.file_path, arrays)
+        except OSError as e:
+            logging.warning(f"写入检查点失败: {self.file_path}, {e}")
+
+    def close(self):
+        """等待尚未完成的写入"""
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,205 @@
+import os
+import json
+import numpy as np
+
+# 记录文件头：8 字节标识 + 8 字节记录宽度（float64 个数）
+HEADER_MAGIC = b"HOFARCH2"
+HEADER_SIZE = 16
+# 每条记录的列：适应度、通过的检查线数、代数、赛道编号、适应度计算方式，之后是个体的基因
+FITNESS, CHECKPOINTS, GENERATION, TRACK, KIND = range(5)
+GENE_OFFSET = 5
+# 适应度计算方式：progress 为沿赛道中心线的进度（像素），checkpoints 为通过的检查线数，单位不同，只在同一种方式内排序
+FITNESS_KINDS = ["progress", "checkpoints"]
+
+
+def track_name(track_file):
+    """由赛道文件路径得到赛道名，如 src/config/track_info/train.json -> train"""
+    return os.path.splitext(os.path.basename(track_file))[0]
+
+
+class HallOfFame:
+    def __init__(self, directory="data/ga_train/hall_of_fame", top_k=100):
+        """
+        只追加的名人堂：保存每个评估过的个体及其适应度、代数与赛道。
+        records.bin 为定宽 float64 记录，可以直接内存映射；tracks.txt 保存赛道名；
+        index.json 按适应度计算方式分别保存历史最好的 top_k 个不重复个体与每条赛道最好的记录编号，查询时不需要扫描全部历史。
+        排序先比较通过的检查线数，再比较适应度；不同计算方式的适应度单位不同，查询时只在同一种方式的记录中排序
+        :param directory: str 名人堂目录
+        :param top_k: int 索引中保存的最好个体数量
+        """
+        self.directory = directory
+        self.top_k = top_k
+        self.record_path = os.path.join(directory, "records.bin")
+        self.track_path = os.path.join(directory, "tracks.txt")
+        self.index_path = os.path.join(directory, "index.json")
+
+        self.width = None
+        if os.path.exists(self.record_path):
+            with open(self.record_path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+            if header[:8] != HEADER_MAGIC:
+                raise ValueError(f"不是名人堂记录文件或记录格式已过时，请换一个名人堂目录: {self.record_path}")
+            self.width = int(np.frombuffer(header[8:], dtype=np.int64)[0])
+
+        self.tracks = []
+        if os.path.exists(self.track_path):
+            with open(self.track_path, "r") as f:
+                self.tracks = [line.strip() for line in f if line.strip()]
+
+        self.index = None
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+        # 追加记录后没来得及写索引（如训练被中断）时重建索引
+        if self.index is None or self.index["count"] != len(self):
+            self.index = self._build_index()
+
+    def __len__(self):
+        """完整的记录数，末尾写了一半的记录不计入"""
+        if self.width is None:
+            return 0
+        return (os.path.getsize(self.record_path) - HEADER_SIZE) // (8 * self.width)
+
+    def records(self):
+        """
+        内存映射全部记录
+        :return: np.ndarray (n, width)
+        """
+        n = len(self)
+        if n == 0:
+            return np.empty((0, self.width or GENE_OFFSET))
+        return np.memmap(self.record_path, dtype=np.float64, mode="r", offset=HEADER_SIZE, shape=(n, self.width))
+
+    def _rank(self, records, ids, k):
+        """
+        在 ids 指定的记录中按 (检查线数, 适应度) 从高到低选出 k 个基因不重复的记录
+        :return: List[int] 记录编号
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        rows = records[ids]
+        ids = ids[np.lexsort((-rows[:, FITNESS], -rows[:, CHECKPOINTS]))]
+        ranked, seen = [], set()
+        for i in ids:
+            genes = records[i, GENE_OFFSET:].tobytes()
+            if genes not in seen:
+                seen.add(genes)
+                ranked.append(int(i))
+                if len(ranked) >= k:
+                    break
+        return ranked
+
+    def _build_index(self):
+        """扫描全部记录重建索引"""
+        records = self.records()
+        top, best = {}, {}
+        for kind_id, kind in enumerate(FITNESS_KINDS):
+            same_kind = records[:, KIND] == kind_id
+            if not same_kind.any():
+                continue
+            top[kind] = self._rank(records, np.flatnonzero(same_kind), self.top_k)
+            best[kind] = {}
+            for track_id in np.unique(records[same_kind, TRACK]).astype(int):
+                best[kind][str(track_id)] = self._rank(
+                    records, np.flatnonzero(same_kind & (records[:, TRACK] == track_id)), 1)[0]
+        return {"count": len(records), "top": top, "best": best}
+
+    def _write_index(self):
+        """先写临时文件再替换，中断时不会留下损坏的索引"""
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _track_id(self, track):
+        """赛道名对应的编号，新赛道追加到 tracks.txt"""
+        if track not in self.tracks:
+            with open(self.track_path, "a") as f:
+                f.write(track + "\n")
+            self.tracks.append(track)
+        return self.tracks.index(track)
+
+    def append(self, individuals, fitnesses, checkpoints, generation, track, kind):
+        """
+        追加一代个体的评估结果
+        :param individuals: List[List[float]] 个体列表
+        :param fitnesses: List[float] 与个体一一对应的适应度
+        :param checkpoints: List[int] 与个体一一对应的通过检查线数
+        :param generation: int 代数
+        :param track: str 赛道名
+        :param kind: str 适应度计算方式，FITNESS_KINDS 之一
+        """
+        if kind not in FITNESS_KINDS:
+            raise ValueError(f"未知的适应度计算方式: {kind}")
+        if not len(individuals):
+            return
+        genes = np.asarray(individuals, dtype=float)
+        os.makedirs(self.directory, exist_ok=True)
+        if self.width is None:
+            self.width = GENE_OFFSET + genes.shape[1]
+            with open(self.record_path, "wb") as f:
+                f.write(HEADER_MAGIC + np.int64(self.width).tobytes())
+        if GENE_OFFSET + genes.shape[1] != self.width:
+            raise ValueError(f"个体基因数 {genes.shape[1]} 与名人堂记录宽度 {self.width} 不一致")
+
+        rows = np.empty((len(genes), self.width))
+        rows[:, FITNESS] = fitnesses
+        rows[:, CHECKPOINTS] = checkpoints
+        rows[:, GENERATION] = generation
+        rows[:, TRACK] = track_id = self._track_id(track)
+        rows[:, KIND] = FITNESS_KINDS.index(kind)
+        rows[:, GENE_OFFSET:] = genes
+        start = len(self)
+        with open(self.record_path, "r+b") as f:
+            # 丢弃中断时写了一半的记录，保证新记录对齐
+            f.truncate(HEADER_SIZE + start * 8 * self.width)
+            f.seek(0, os.SEEK_END)
+            f.write(rows.tobytes())
+
+        # 只需在同一种适应度计算方式的原有索引与新记录之间比较
+        records = self.records()
+        new_ids = list(range(start, start + len(rows)))
+        self.index["top"][kind] = self._rank(records, self.index["top"].get(kind, []) + new_ids, self.top_k)
+        best = self.index["best"].setdefault(kind, {})
+        previous = best.get(str(track_id))
+        best[str(track_id)] = self._rank(records, ([previous] if previous is not None else []) + new_ids, 1)[0]
+        self.index["count"] = len(records)
+        self._write_index()
+
+    def top(self, k=10, track=None, kind="progress"):
+        """
+        历史最好的 k 个不重复个体
+        :param k: int 数量
+        :param track: str 只在该赛道的记录中查询，默认不限赛道
+        :param kind: str 只在该适应度计算方式的记录中排序
+
+        :return: List[List[float]] 个体列表，从好到差
+        """
+        records = self.records()
+        same_kind = records[:, KIND] == FITNESS_KINDS.index(kind)
+        if track is None and k <= self.top_k:
+            ids = self.index["top"].get(kind, [])[:k]
+        elif track is not None and track not in self.tracks:
+            ids = []
+        elif track is None:
+            ids = self._rank(records, np.flatnonzero(same_kind), k)
+        else:
+            ids = self._rank(records, np.flatnonzero(same_kind & (records[:, TRACK] == self.tracks.index(track))), k)
+        return [records[i, GENE_OFFSET:].tolist() for i in ids]
+
+    def best(self, track=None, kind="progress"):
+        """
+        历史最好的个体
+        :param track: str 只在该赛道的记录中查询，默认不限赛道
+        :param kind: str 只在该适应度计算方式的记录中排序
+
+        :return: List[float] 个体，没有记录时返回 None
+        """
+        if track is None:
+            ids = self.index["top"].get(kind, [])[:1]
+        else:
+            best = self.index["best"].get(kind, {})
+            record = best.get(str(self.tracks.index(track))) if track in self.tracks else None
+            ids = [] if record is None else [record]
+        if not ids:
+            return None
+        return self.records()[ids[0], GENE_OFFSET:].tolist()
@@ -0,0 +1,134 @@
+import os
+import csv
+import json
+import contextlib
+import threading
+from time import perf_counter
+
+# 热点路径的阶段：传感器、出界与检查线检测、模糊推理、运动更新、绘制赛道与车辆、绘制状态栏、车辆生成
+PHASES = ["sensing", "collision", "inference", "physics", "rendering", "hud", "building"]
+
+
+class _Phase:
+    """PhaseProfiler.phase 返回的计时上下文"""
+    __slots__ = ("profiler", "name", "count", "start")
+
+    def __init__(self, profiler, name, count):
+        self.profiler = profiler
+        self.name = name
+        self.count = count
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.add(self.name, perf_counter() - self.start, self.count)
+
+
+_NULL_PHASE = contextlib.nullcontext()
+
+
+class PhaseProfiler:
+    def __init__(self, enabled=False):
+        """
+        分阶段计时器：累计每个阶段的耗时与次数，按代汇总后导出为 CSV 或 JSON。
+        热点路径中先判断 enabled 再计时，关闭时每步只多一次属性读取。
+        add、phase 与 end_generation 可以在多个线程中调用（如主线程的绘制循环与仿真线程），
+        mark 与 lap 共用一个起点，只能在一个线程中使用
+        :param enabled: bool 是否开启
+        """
+        self.enabled = enabled
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.rows = []  # 每代一行
+        self._last = perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        """开启或关闭计时，开启时清空已有记录"""
+        if enabled and not self.enabled:
+            self.reset()
+            self.rows = []
+        self.enabled = enabled
+
+    def reset(self):
+        """清空当前代的累计值"""
+        with self._lock:
+            self.seconds = dict.fromkeys(PHASES, 0.0)
+            self.counts = dict.fromkeys(PHASES, 0)
+        self._last = perf_counter()
+
+    def add(self, phase, seconds, count=1):
+        """累计某个阶段的耗时与次数"""
+        with self._lock:
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+            self.counts[phase] = self.counts.get(phase, 0) + count
+
+    def mark(self):
+        """记录当前时刻，作为下一次 lap 的起点"""
+        self._last = perf_counter()
+
+    def lap(self, phase, count=1):
+        """把上一次 mark 或 lap 到现在的时间计入 phase，并重新记录当前时刻"""
+        now = perf_counter()
+        self.add(phase, now - self._last, count)
+        self._last = now
+
+    def phase(self, name, count=1):
+        """
+        用于 with 语句的计时上下文，适合每代或每帧调用一次的阶段，关闭时返回空上下文
+        :param name: str 阶段名
+        :param count: int 本次计入的次数，如生成的车辆数
+        """
+        return _Phase(self, name, count) if self.enabled else _NULL_PHASE
+
+    def end_generation(self, generation, **extra):
+        """
+        结束一代：把当前累计值记为一行并清空
+        :param generation: int 代数
+        :param extra: 额外记录的列，如仿真步数、最大适应度
+        """
+        if not self.enabled:
+            return None
+        row = {"generation": generation, **extra}
+        with self._lock:
+            # 取出累计值与清空在同一次加锁中完成，其它线程同时计入的耗时不会丢失
+            seconds, counts = self.seconds, self.counts
+            self.seconds = dict.fromkeys(PHASES, 0.0)
+            self.counts = dict.fromkeys(PHASES, 0)
+        self._last = perf_counter()
+        for phase in seconds:
+            row[f"{phase}_seconds"] = seconds[phase]
+            row[f"{phase}_count"] = counts[phase]
+        self.rows.append(row)
+        return row
+
+    def summary(self, row):
+        """一行记录的简要文字，按耗时从多到少排列"""
+        phases = sorted(((key[:-len("_seconds")], value) for key, value in row.items() if key.endswith("_seconds")),
+                        key=lambda item: item[1], reverse=True)
+        return ", ".join(f"{phase} {seconds:.3f}s/{row[f'{phase}_count']}" for phase, seconds in phases if seconds)
+
+    def export(self, file_path):
+        """
+        导出每代的记录，按扩展名选择格式：.json 为列表，其它为 CSV
+        :param file_path: str 文件路径
+        """
+        if os.path.dirname(file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if file_path.endswith(".json"):
+            with open(file_path, "w") as f:
+                json.dump(self.rows, f, indent=4)
+            return
+        fields = []
+        for row in self.rows:
+            fields.extend(key for key in row if key not in fields)
+        with open(file_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+
+# 进程内共享的计时器，默认关闭，由训练脚本的 --profile 开启
+PROFILER = PhaseProfiler()
@@ -2,12 +2,16 @@ import os
 import ast
 import json
 
-def save_track_data(file_path, track_outer, track_inner, check_line):
+def save_track_data(file_path, track_outer, track_inner, check_line, start_pos=None, start_angle=0):
     data = {
         "track_outer": track_outer,
         "track_inner": track_inner,
         "check_line": check_line
     }
+    # 可选的车辆起点与初始朝向
+    if start_pos is not None:
+        data["start_pos"] = list(start_pos)
+        data["start_angle"] = start_angle
     
     dir_path = os.path.dirname(file_path)
     if dir_path and not os.path.exists(dir_path):
@@ -23,4 +27,17 @@ def load_track_data(file_path):
     with open(file_path, "r") as f:
         data = json.load(f)
     
-    return data.get("track_outer", []), data.get("track_inner", []), data.get("check_line", [])
\ No newline at end of file
+    return data.get("track_outer", []), data.get("track_inner", []), data.get("check_line", [])
+
+def load_track_start(file_path, default_pos=None, default_angle=0):
+    """
+    读取赛道文件中的车辆起点与初始朝向，没有记录时返回默认值
+    :return: (List[float] 起点, float 朝向)
+    """
+    if not os.path.exists(file_path):
+        return default_pos, default_angle
+    
+    with open(file_path, "r") as f:
+        data = json.load(f)
+    
+    return data.get("start_pos", default_pos), data.get("start_angle", default_angle)
\ No newline at end of file
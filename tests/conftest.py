@@ -0,0 +1,11 @@
+import os
+import sys
+
+# 添加根目录到 sys.path，与脚本相同，测试中按 src.xxx 导入
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+
+def track_file(name):
+    """赛道文件的绝对路径，测试不依赖当前目录"""
+    return os.path.join(ROOT, "src", "config", "track_info", f"{name}.json")
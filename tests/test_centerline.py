@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from conftest import track_file
+from src.core.centerline import closest_on_segments
+from src.core.track_geometry import TrackGeometry
+
+TRACKS = ["train", "auto_1", "auto_2", "vs"]
+
+
+def point_at(centerline, s):
+    """中心线上弧长 s 处的点"""
+    k = np.clip(np.searchsorted(centerline.cumulative, s, side="right") - 1, 0, len(centerline.points) - 1)
+    t = (s - centerline.cumulative[k]) / centerline.seg_length[k]
+    return centerline.points[k] + t[:, None] * centerline.seg_dir[k]
+
+
+@pytest.fixture(scope="module", params=TRACKS)
+def geometry(request):
+    return TrackGeometry.from_file(track_file(request.param), centerline=True)
+
+
+def test_vertices_project_to_their_arc_length(geometry):
+    """中心线顶点与线段中点投影到自身的弧长"""
+    centerline = geometry.centerline
+    np.testing.assert_allclose(centerline.wrap(centerline.project(centerline.points) - centerline.cumulative[:-1]), 0,
+                               atol=1e-6)
+    midpoints = centerline.points + centerline.seg_dir / 2
+    expected = centerline.cumulative[:-1] + centerline.seg_length / 2
+    np.testing.assert_allclose(centerline.wrap(centerline.project(midpoints) - expected), 0, atol=1e-6)
+
+
+def test_grid_projection_matches_brute_force(geometry):
+    """
+    赛道内的点用最近线段网格投影的结果与在全部线段上暴力求最近点一致；
+    网格只精确到格点，弯道处到两段中心线几乎等距的点可能投影到另一段，但距离之差不超过网格间距
+    """
+    centerline = geometry.centerline
+    rng = np.random.default_rng(0)
+    points = rng.uniform(geometry.edge_start.min(axis=0), geometry.edge_start.max(axis=0), size=(20000, 2))
+    points = points[geometry.contains(points)]
+
+    k, t, distance = closest_on_segments(points, centerline.points, centerline.seg_end)
+    expected = centerline.cumulative[k] + t * centerline.seg_length[k]
+    projected = centerline.project(points)
+    assert np.all((projected >= 0) & (projected <= centerline.length))
+    same = np.abs(centerline.wrap(projected - expected)) < 1e-6
+    assert same.mean() > 0.99
+    projected_distance = np.hypot(*(points - point_at(centerline, projected)).T)
+    assert np.all(projected_distance - distance <= centerline.resolution)
+
+
+def test_arc_length_increases_along_the_track(geometry):
+    """沿检查线（没有检查线时沿起点朝向）前进时弧长增加，跨过起点时 wrap 得到正的前进距离"""
+    centerline = geometry.centerline
+    lines = np.asarray(geometry.check_line, dtype=float).reshape(-1, 2, 2).mean(axis=1)
+    if len(lines) >= 2:
+        arc = centerline.project(np.concatenate([lines, lines[:1]]))
+        assert np.all(centerline.wrap(np.diff(arc)) > 0)
+    else:
+        rad = np.radians(geometry.start_angle)
+        ahead = np.array(geometry.start_pos) + np.array([np.cos(rad), -np.sin(rad)]) * 20
+        start, end = centerline.project([geometry.start_pos, ahead])
+        assert 0 < centerline.wrap(end - start) < 40
+    assert centerline.wrap(centerline.length - 1) == pytest.approx(-1)
+    assert centerline.wrap(1 - centerline.length) == pytest.approx(1)
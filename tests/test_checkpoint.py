@@ -0,0 +1,72 @@
+import os
+import random
+import subprocess
+import sys
+import numpy as np
+from conftest import ROOT
+from src.util.checkpoint_util import (CheckpointWriter, checkpoint_arrays, load_checkpoint, load_generator,
+                                      set_random_state, write_checkpoint)
+
+
+def draw(rng):
+    """从 random、np.random 与 Generator 各取几个随机数"""
+    return [random.random(), random.gauss(0, 1), *np.random.rand(2), np.random.randn(), *rng.random(2)]
+
+
+def test_round_trip(tmp_path):
+    """个体（包括整数基因的类型）、适应度、参数与全部随机数状态原样恢复"""
+    individuals = [[0, 1.5, 2], [0.25, 300, 2.75]]
+    params = {"cars": 2, "table_steps": [0.2, 20, 20, 20], "track": "src/config/track_info/train.json"}
+    random.seed(1)
+    np.random.seed(1)
+    rng = np.random.default_rng(1)
+    # gauss 与 randn 会缓存下一个值，保存时也要记录
+    random.gauss(0, 1)
+    np.random.randn()
+
+    path = str(tmp_path / "sub" / "checkpoint.npz")
+    write_checkpoint(path, checkpoint_arrays(individuals, 7, params, [1.0, 2.5], [0.5, 2.5], rng))
+    expected = draw(rng)
+
+    random.seed(2)
+    np.random.seed(2)
+    checkpoint = load_checkpoint(path)
+    set_random_state(checkpoint)
+    assert draw(load_generator(checkpoint)) == expected
+
+    assert checkpoint["population"] == individuals
+    assert [[type(gene) for gene in individual] for individual in checkpoint["population"]] == \
+           [[type(gene) for gene in individual] for individual in individuals]
+    assert checkpoint["generation"] == 7
+    assert checkpoint["fitnesses"] == [1.0, 2.5]
+    assert checkpoint["history"] == [0.5, 2.5]
+    assert checkpoint["params"] == params
+    assert os.listdir(tmp_path / "sub") == ["checkpoint.npz"]
+
+
+def test_without_generator(tmp_path):
+    """没有保存 Generator 的检查点 load_generator 返回 None"""
+    path = str(tmp_path / "checkpoint.npz")
+    with CheckpointWriter(path) as writer:
+        writer.save([[0.5]], 1, {})
+    assert load_generator(load_checkpoint(path)) is None
+
+
+def train(tmp_path, name, generations, *extra):
+    """运行无界面训练，返回精英个体文件的内容"""
+    elite_file = tmp_path / f"{name}.txt"
+    subprocess.run([sys.executable, "src/train_headless.py", "--generations", str(generations), "--cars", "8",
+                    "--elite-num", "3", "--max-steps", "200", "--seed", "5", "--workers", "0",
+                    "--elite-file", str(elite_file), "--checkpoint", str(tmp_path / f"{name}.npz"),
+                    "--table-cache", "", "--hall-of-fame", "", *extra],
+                   cwd=ROOT, check=True, capture_output=True)
+    return elite_file.read_text()
+
+
+def test_resume_matches_uninterrupted_training(tmp_path):
+    """中断后从检查点恢复的训练与不中断的训练得到相同的精英个体"""
+    uninterrupted = train(tmp_path, "full", 4)
+    train(tmp_path, "resumed", 2)
+    # 恢复时检查点中的参数优先，命令行中不同的值不影响结果
+    resumed = train(tmp_path, "resumed", 4, "--resume", "--cars", "20", "--max-steps", "50")
+    assert resumed == uninterrupted
@@ -0,0 +1,85 @@
+import random
+import numpy as np
+import pytest
+from src.core.fuzzy import FuzzyDriver
+from src.core.fuzzy_inference import (ACCEL_OPTIONS, ACCEL_RULES, FRONT_UNIVERSE, OUTPUT_PARAMS, ROTATION_OPTIONS,
+                                      ROTATION_RULES, SIDE_UNIVERSE, SPEED_UNIVERSE, input_memberships, mamdani)
+from src.core.ga_fuzzy import random_individual, repair_membership_functions
+
+STRUCTURE = [5, 5, 5]
+FIXED_INDICES = [0, 1, 13, 14, 15, 16, 28, 29, 30, 31, 43, 44]
+# 较粗的网格，skfuzzy 逐格推理约一秒；步长不是论域间距的整数倍，覆盖论域采样点之间的输入
+TABLE_STEPS = dict(speed_step=0.45, front_step=95, left_step=65, right_step=65)
+
+
+def individuals(n, seed):
+    """与训练时相同方式生成并修复的随机个体"""
+    random.seed(seed)
+    return [repair_membership_functions(random_individual(), STRUCTURE, FIXED_INDICES) for _ in range(n)]
+
+
+def skfuzzy_or_none(individual):
+    """skfuzzy 驾驶员，无法生成查找表（没有规则被激活）时返回 None"""
+    try:
+        return FuzzyDriver(individual, engine="skfuzzy", **TABLE_STEPS)
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("individual", individuals(3, seed=0))
+def test_native_tables_match_skfuzzy(individual):
+    """向量化 Mamdani 推理生成的离散查找表与 skfuzzy 逐格推理完全一致"""
+    reference = skfuzzy_or_none(individual)
+    if reference is None:
+        with pytest.raises(ValueError):
+            FuzzyDriver(individual, **TABLE_STEPS)
+        return
+    driver = FuzzyDriver(individual, **TABLE_STEPS)
+    np.testing.assert_array_equal(driver.accel_table, reference.accel_table)
+    np.testing.assert_array_equal(driver.rotation_table, reference.rotation_table)
+
+
+def test_native_crisp_output_matches_skfuzzy():
+    """离散化之前的连续输出与 skfuzzy 的解模糊结果一致，包括论域采样点之间与超出论域的输入"""
+    rng = np.random.default_rng(0)
+    for individual in individuals(3, seed=1):
+        reference = skfuzzy_or_none(individual)
+        if reference is None:
+            continue
+        params = np.asarray(individual, dtype=float)
+        speed = rng.uniform(0, 2.2, 4)
+        front = rng.uniform(0, 550, 4)
+        side = rng.uniform(0, 330, 4)
+
+        accel, accel_empty = mamdani(input_memberships(params[:15].reshape(5, 3), SPEED_UNIVERSE, speed),
+                                     input_memberships(params[15:30].reshape(5, 3), FRONT_UNIVERSE, front),
+                                     ACCEL_RULES, ACCEL_OPTIONS, np.reshape(OUTPUT_PARAMS[:15], (5, 3)))
+        mu_side = input_memberships(params[-15:].reshape(5, 3), SIDE_UNIVERSE, side)
+        rotation, rotation_empty = mamdani(mu_side, mu_side, ROTATION_RULES, ROTATION_OPTIONS,
+                                           np.reshape(OUTPUT_PARAMS[15:], (5, 3)))
+        for i in range(len(speed)):
+            for j in range(len(front)):
+                if accel_empty[i, j]:
+                    continue
+                reference._accel_sim.input["speed"] = speed[i]
+                reference._accel_sim.input["front_dist"] = front[j]
+                reference._accel_sim.compute()
+                assert accel[i, j] == pytest.approx(reference._accel_sim.output["acceleration"], abs=1e-9)
+        for i in range(len(side)):
+            for j in range(len(side)):
+                if rotation_empty[i, j]:
+                    continue
+                reference._rotate_sim.input["left_dist"] = side[i]
+                reference._rotate_sim.input["right_dist"] = side[j]
+                reference._rotate_sim.compute()
+                assert rotation[i, j] == pytest.approx(reference._rotate_sim.output["rotation"], abs=1e-9)
+
+
+def test_invalid_parameters_raise_like_skfuzzy():
+    """隶属函数参数不满足 a <= b <= c 时与 skfuzzy 一样抛出异常"""
+    individual = individuals(1, seed=2)[0]
+    individual[3], individual[5] = individual[5] + 0.5, individual[3]
+    with pytest.raises((ValueError, AssertionError)):
+        FuzzyDriver(individual, engine="skfuzzy", **TABLE_STEPS)
+    with pytest.raises(ValueError):
+        FuzzyDriver(individual, **TABLE_STEPS)
@@ -0,0 +1,57 @@
+import random
+import numpy as np
+from src.core.ga_fuzzy import (generate_offspring_matrix, matrix_to_individuals, random_individual,
+                               repair_membership_functions, repair_membership_matrix)
+
+STRUCTURE = [5, 5, 5]
+FIXED_INDICES = [0, 1, 13, 14, 15, 16, 28, 29, 30, 31, 43, 44]
+BOUNDS = ([0] * 60, [2] * 15 + [500] * 15 + [300] * 30)
+
+
+def unrepaired(n, seed):
+    """未修复的随机个体，其中一半在每个变量内打乱非固定基因，覆盖交界处与组内顺序都被打乱的情况"""
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    population = np.array([random_individual() for _ in range(n)], dtype=float)
+    for start in range(0, population.shape[1], 15):
+        free = np.setdiff1d(np.arange(start, start + 15), FIXED_INDICES)
+        for row in population[::2]:
+            row[free] = rng.permutation(row[free])
+    return population
+
+
+def test_matrix_repair_matches_scalar_repair():
+    """向量化修复与逐个修复的结果完全相同"""
+    population = unrepaired(200, seed=0)
+    expected = [repair_membership_functions(individual, STRUCTURE, FIXED_INDICES)
+                for individual in population.tolist()]
+    np.testing.assert_array_equal(repair_membership_matrix(population, STRUCTURE, FIXED_INDICES), expected)
+
+
+def test_matrix_repair_with_ties_and_fixed_values():
+    """取值重复或等于固定基因时两种修复方式依然一致，且输入矩阵不被修改"""
+    population = unrepaired(100, seed=1)
+    population[:, 2:12] = np.round(population[:, 2:12])
+    population[::3, 20:26] = 250
+    original = population.copy()
+    expected = [repair_membership_functions(individual, STRUCTURE, FIXED_INDICES)
+                for individual in population.tolist()]
+    np.testing.assert_array_equal(repair_membership_matrix(population, STRUCTURE, FIXED_INDICES), expected)
+    np.testing.assert_array_equal(population, original)
+
+
+def test_offspring_matrix_is_repaired_and_bounded():
+    """向量化子代在边界内、固定基因不变、已经修复，转换回的个体与 elite 文件格式一致"""
+    parents = repair_membership_matrix(unrepaired(10, seed=2), STRUCTURE, FIXED_INDICES)
+    offspring = generate_offspring_matrix(parents, 300, STRUCTURE, BOUNDS, FIXED_INDICES, mutation_rate=0.5,
+                                          rng=np.random.default_rng(2))
+    assert offspring.shape == (300, parents.shape[1])
+    lower, upper = np.asarray(BOUNDS[0][:45]), np.asarray(BOUNDS[1][:45])
+    assert np.all((offspring >= lower) & (offspring <= upper))
+    np.testing.assert_array_equal(offspring[:, FIXED_INDICES], np.broadcast_to(parents[0, FIXED_INDICES],
+                                                                                (300, len(FIXED_INDICES))))
+    np.testing.assert_array_equal(repair_membership_matrix(offspring, STRUCTURE, FIXED_INDICES), offspring)
+
+    individuals = matrix_to_individuals(offspring, FIXED_INDICES)
+    assert all(type(individual[i]) is int for individual in individuals for i in FIXED_INDICES)
+    assert individuals[0][:2] == [0, 0] and individuals[0][13:17] == [2, 2, 0, 0]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from conftest import track_file
+from src.core.track_geometry import TrackGeometry
+from src.util.track_file_util import load_track_data
+
+
+def random_segments(rng, geometry, n, length):
+    """赛道范围内（略微外扩）的随机线段"""
+    lo = geometry.edge_start.min(axis=0) - 50
+    hi = geometry.edge_start.max(axis=0) + 50
+    starts = rng.uniform(lo, hi, size=(n, 2))
+    angles = rng.uniform(0, 2 * np.pi, size=n)
+    ends = starts + np.stack([np.cos(angles), np.sin(angles)], axis=-1) * rng.uniform(0, length, size=(n, 1))
+    return starts, ends
+
+
+@pytest.mark.parametrize("track", ["train", "auto_1", "auto_2", "vs"])
+@pytest.mark.parametrize("cell_size", [None, 13.0])
+def test_grid_matches_brute_force(track, cell_size):
+    """网格 DDA 遍历得到的射线距离与出界判断与逐边暴力求交一致"""
+    track_data = load_track_data(track_file(track))
+    grid = TrackGeometry(*track_data, use_grid=True, cell_size=cell_size)
+    brute = TrackGeometry(*track_data, use_grid=False)
+    rng = np.random.default_rng(0)
+
+    positions, _ = random_segments(rng, brute, 500, 0)
+    angles = rng.uniform(0, 360, size=500)
+    np.testing.assert_allclose(grid.sense(positions, angles), brute.sense(positions, angles))
+    np.testing.assert_allclose(grid.ray_distances(positions, angles), brute.ray_distances(positions, angles))
+
+    starts, ends = random_segments(rng, brute, 2000, 30)
+    np.testing.assert_array_equal(grid.crossed_boundary_batch(starts, ends),
+                                  brute.crossed_boundary_batch(starts, ends))
+    for start, end in zip(starts[:100], ends[:100]):
+        assert grid.crossed_boundary(start, end) == brute.crossed_boundary(start, end)
+
+
+def test_grid_axis_aligned_and_degenerate_segments():
+    """沿坐标轴的射线与长度为 0 的线段（d 的分量为 0）与暴力求交一致"""
+    track_data = load_track_data(track_file("train"))
+    grid = TrackGeometry(*track_data, use_grid=True)
+    brute = TrackGeometry(*track_data, use_grid=False)
+    rng = np.random.default_rng(1)
+
+    positions, _ = random_segments(rng, brute, 200, 0)
+    for angle in (0, 90, 180, 270):
+        angles = np.full(len(positions), angle)
+        np.testing.assert_allclose(grid.sense(positions, angles), brute.sense(positions, angles))
+    np.testing.assert_array_equal(grid.crossed_boundary_batch(positions, positions),
+                                  brute.crossed_boundary_batch(positions, positions))
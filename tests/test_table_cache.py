@@ -0,0 +1,89 @@
+import os
+import random
+import numpy as np
+from src.core.fuzzy_inference import build_tables
+from src.core.ga_fuzzy import random_individual, repair_membership_functions
+from src.core.table_cache import TableCache
+
+STRUCTURE = [5, 5, 5]
+FIXED_INDICES = [0, 1, 13, 14, 15, 16, 28, 29, 30, 31, 43, 44]
+TABLE_STEPS = (0.2, 20, 20, 20)
+
+
+def individuals(n, seed=0):
+    random.seed(seed)
+    return [repair_membership_functions(random_individual(), STRUCTURE, FIXED_INDICES) for _ in range(n)]
+
+
+def scanned_size(cache):
+    """重新扫描缓存目录得到的总大小"""
+    return sum(size for _, size, _ in cache._entries())
+
+
+def test_round_trip(tmp_path):
+    """写入的查找表原样读回，未命中返回 None，无法生成查找表的个体读回 (None, None)"""
+    cache = TableCache(str(tmp_path))
+    good, failed = individuals(2)
+    accel_tables, rotation_tables, valid = build_tables([good], *TABLE_STEPS)
+    assert valid[0]
+
+    assert cache.get(good, TABLE_STEPS) is None
+    cache.put(good, TABLE_STEPS, accel_tables[0], rotation_tables[0])
+    cache.put(failed, TABLE_STEPS)
+    accel_table, rotation_table = cache.get(good, TABLE_STEPS)
+    np.testing.assert_array_equal(accel_table, accel_tables[0])
+    np.testing.assert_array_equal(rotation_table, rotation_tables[0])
+    assert cache.get(failed, TABLE_STEPS) == (None, None)
+    # 步长不同的查找表是不同的条目
+    assert cache.get(good, (0.4, 20, 20, 20)) is None
+    # 重新打开后大小与目录一致
+    assert TableCache(str(tmp_path)).size == cache.size == scanned_size(cache)
+
+
+def test_overwrite_does_not_double_count(tmp_path):
+    """覆盖同一条目时只计入大小之差"""
+    cache = TableCache(str(tmp_path))
+    individual = individuals(1)[0]
+    accel_tables, rotation_tables, _ = build_tables([individual], *TABLE_STEPS)
+    for _ in range(3):
+        cache.put(individual, TABLE_STEPS, accel_tables[0], rotation_tables[0])
+    assert cache.size == scanned_size(cache)
+    cache.put(individual, TABLE_STEPS)
+    assert cache.size == scanned_size(cache)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """超过上限时按最近使用时间淘汰，读取过的条目保留"""
+    population = individuals(6)
+    accel_tables, rotation_tables, valid = build_tables(population, *TABLE_STEPS)
+    assert valid.all()
+    cache = TableCache(str(tmp_path))
+    for individual, accel_table, rotation_table in zip(population[:4], accel_tables, rotation_tables):
+        cache.put(individual, TABLE_STEPS, accel_table, rotation_table)
+    entry_size = cache.size // 4
+    # 修改时间的精度可能不足以区分先后，这里直接设定：第 0 个最旧，但随后被读取
+    for age, individual in enumerate(population[:4]):
+        path = cache._path(cache.key(individual, TABLE_STEPS))
+        os.utime(path, (1000 + age, 1000 + age))
+    cache.get(population[0], TABLE_STEPS)
+
+    # 上限只够 4 个条目：写入第 5 个时淘汰到 90% 以下，删除最旧的第 1、2 个，之后第 6 个不超过上限
+    cache.max_bytes = 4 * entry_size
+    for individual, accel_table, rotation_table in zip(population[4:], accel_tables[4:], rotation_tables[4:]):
+        cache.put(individual, TABLE_STEPS, accel_table, rotation_table)
+    assert cache.size == scanned_size(cache) <= cache.max_bytes
+    assert [cache.get(individual, TABLE_STEPS) is not None for individual in population] == [
+        True, False, False, True, True, True]
+
+
+def test_build_tables_matches_uncached(tmp_path):
+    """经过缓存批量生成的查找表与直接生成的相同，第二次全部从缓存读取"""
+    cache = TableCache(str(tmp_path))
+    population = individuals(8, seed=3)
+    expected = build_tables(population, *TABLE_STEPS)
+    for _ in range(2):
+        accel_tables, rotation_tables, valid = cache.build_tables(population, *TABLE_STEPS)
+        np.testing.assert_array_equal(valid, expected[2])
+        np.testing.assert_array_equal(accel_tables[valid], expected[0][valid])
+        np.testing.assert_array_equal(rotation_tables[valid], expected[1][valid])
+    assert len(list(cache._entries())) == len(population)